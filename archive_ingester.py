@@ -0,0 +1,201 @@
+import logging
+import posixpath
+import zipfile
+
+from lxml import etree
+
+from utils import canonicalize_medium_url, extract_post_id, save_crawled_data
+
+logger = logging.getLogger(__name__)
+
+# 크롤링 큐로 보낼 export 섹션 (디렉토리명 → journal source 이름)
+LINK_SECTIONS = {
+    'bookmarks': 'export:bookmarks',
+    'lists': 'export:lists',
+}
+POSTS_SECTION = 'posts'
+
+# 본문으로 수집할 블록 요소 (crawler._extract_content와 같은 기준으로 짧은 텍스트 제외)
+_CONTENT_BLOCKS = {'p', 'h3', 'h4', 'blockquote', 'pre', 'li'}
+_MIN_BLOCK_LENGTH = 10
+
+
+def _text(element):
+  """요소의 텍스트를 공백 정리 후 반환"""
+  if element is None:
+    return None
+  text = ' '.join(''.join(element.itertext()).split())
+  return text or None
+
+
+def _first(tree, xpath):
+  """XPath 결과의 첫 번째 항목"""
+  result = tree.xpath(xpath)
+  return result[0] if result else None
+
+
+class ExportArchiveIngester:
+  """
+  Medium export 아카이브(zip)를 디스크에 풀지 않고 읽어 크롤링 파이프라인에 넣습니다.
+
+  - bookmarks/, lists/ HTML의 기사 링크 → 정규화 후 CrawlJournal에 pending으로 추가
+  - posts/ HTML (본인 글) → 브라우저 없이 article_data로 변환해 저장하고 journal에 done으로 기록
+  """
+
+  def __init__(self, journal, output_dir=None):
+    self.journal = journal
+    self.output_dir = output_dir
+    self._parser = etree.HTMLParser(encoding='utf-8', remove_comments=True)
+
+  def ingest(self, zip_path):
+    """
+    아카이브 하나를 처리합니다.
+
+    Args:
+        zip_path: Medium export zip 파일 경로
+
+    Returns:
+        처리 결과 통계 딕셔너리 {'queued': 새로 큐에 추가된 URL 수, 'posts': 저장된 본인 글 수, 'links': 발견한 링크 수}
+    """
+    stats = {'queued': 0, 'posts': 0, 'links': 0}
+    logger.info(f"Medium export 아카이브 처리 중: {zip_path}")
+
+    with zipfile.ZipFile(zip_path) as archive:
+      for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith('.html'):
+          continue
+        section = self._section_of(info.filename)
+        if section != POSTS_SECTION and section not in LINK_SECTIONS:
+          continue
+
+        try:
+          # 압축 해제 없이 멤버를 스트림으로 파싱
+          with archive.open(info) as member:
+            tree = etree.parse(member, self._parser)
+        except (etree.ParseError, OSError, zipfile.BadZipFile) as e:
+          logger.warning(f"아카이브 항목 파싱 실패 ({info.filename}): {e}")
+          continue
+        if tree.getroot() is None:
+          continue
+
+        if section == POSTS_SECTION:
+          if self._ingest_post(tree, info.filename):
+            stats['posts'] += 1
+        else:
+          entries = list(self._iter_link_entries(tree, section, info.filename))
+          stats['links'] += len(entries)
+          stats['queued'] += self.journal.enqueue_many(entries)
+
+    logger.info(
+        f"아카이브 처리 완료: 링크 {stats['links']}개 중 {stats['queued']}개 신규 대기, "
+        f"본인 글 {stats['posts']}개 저장")
+    return stats
+
+  @staticmethod
+  def _section_of(name):
+    """아카이브 내부 경로의 최상위 섹션 (루트 폴더가 하나 더 있는 경우도 처리)"""
+    parts = [p for p in posixpath.normpath(name).split('/') if p]
+    for part in parts[:-1]:
+      if part == POSTS_SECTION or part in LINK_SECTIONS:
+        return part
+    return None
+
+  def _iter_link_entries(self, tree, section, member_name):
+    """bookmarks/lists HTML에서 (url, source, metadata) 항목을 생성합니다."""
+    list_name = _text(_first(tree, '//h1'))
+    seen = set()
+
+    for anchor in tree.xpath('//li//a[@href] | //section[@data-field]//a[@href]'):
+      url = canonicalize_medium_url(anchor.get('href'))
+      if not url or url in seen:
+        continue
+      # 작성자 프로필 링크 등은 post ID 규칙으로 이미 제외됨
+      seen.add(url)
+
+      metadata = {'export_file': member_name}
+      title = _text(anchor)
+      if title:
+        metadata['title'] = title
+      if section == 'lists' and list_name:
+        metadata['list'] = list_name
+
+      item = _first(anchor, 'ancestor::li[1]')
+      if item is not None:
+        time_element = _first(item, './/time')
+        if time_element is not None:
+          metadata['saved_at'] = time_element.get('datetime') or _text(time_element)
+        author = _first(item, './/a[contains(@class, "p-author")]')
+        if author is not None:
+          metadata['author'] = _text(author)
+          metadata['author_url'] = author.get('href')
+
+      yield url, LINK_SECTIONS[section], metadata
+
+  def _ingest_post(self, tree, member_name):
+    """본인 글 HTML을 article_data로 변환해 저장합니다. 초안(canonical 링크 없음)은 건너뜁니다."""
+    canonical = _first(tree, '//a[contains(@class, "p-canonical")]/@href')
+    url = canonicalize_medium_url(canonical)
+    if not url:
+      logger.debug(f"게시되지 않은 글(초안) 건너뜀: {member_name}")
+      return False
+
+    author_link = _first(tree, '//a[contains(@class, "p-author")]')
+    published = _first(tree, '//time[contains(@class, "dt-published")]')
+    body = _first(tree, '//section[@data-field="body"]')
+
+    content_parts = []
+    seen_texts = set()
+    if body is not None:
+      for element in body.iter(*_CONTENT_BLOCKS):
+        # 중첩된 블록(li 안의 p 등)은 바깥 블록에서 이미 수집됨
+        if any(parent.tag in _CONTENT_BLOCKS for parent in element.iterancestors()):
+          continue
+        text = _text(element)
+        if text and len(text) > _MIN_BLOCK_LENGTH and text not in seen_texts:
+          content_parts.append(text)
+          seen_texts.add(text)
+
+    metadata = {'source': 'medium_export', 'post_id': extract_post_id(url)}
+    subtitle = _text(_first(tree, '//section[@data-field="subtitle"]'))
+    if subtitle:
+      metadata['subtitle'] = subtitle
+    if author_link is not None and author_link.get('href'):
+      metadata['author_url'] = author_link.get('href')
+
+    article_data = {
+        'url': url,
+        'title': _text(_first(tree, '//h1[contains(@class, "p-name")]')) or _text(_first(tree, '//title')),
+        'author': _text(author_link),
+        'published_date': published.get('datetime') if published is not None else None,
+        'tags': [],
+        'content': '\n\n'.join(content_parts) or None,
+        'metadata': metadata
+    }
+
+    saved_path = save_crawled_data(article_data, output_dir=self.output_dir)
+    self.journal.mark_done(url, output_path=saved_path, outcome='export', source='export:posts')
+    logger.debug(f"본인 글 저장: {saved_path}")
+    return True
+
+
+def ingest_export_archives(paths, journal, output_dir=None):
+  """
+  여러 다운로드 결과 중 zip 아카이브만 골라 처리합니다.
+
+  Args:
+      paths: 다운로드된 파일 경로 리스트
+      journal: CrawlJournal
+      output_dir: 본인 글 저장 디렉토리
+
+  Returns:
+      아카이브별 통계를 합산한 딕셔너리
+  """
+  ingester = ExportArchiveIngester(journal, output_dir=output_dir)
+  totals = {'queued': 0, 'posts': 0, 'links': 0}
+  for path in paths:
+    if not zipfile.is_zipfile(path):
+      logger.debug(f"zip 아카이브가 아니므로 건너뜀: {path}")
+      continue
+    for key, value in ingester.ingest(path).items():
+      totals[key] += value
+  return totals
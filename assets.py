@@ -0,0 +1,246 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import load_env
+from metrics import REGISTRY
+from utils import append_manifest, write_json_atomic
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+INDEX_FILENAME = 'index.sqlite3'
+CHUNK_SIZE = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+  url TEXT PRIMARY KEY,
+  sha256 TEXT NOT NULL,
+  path TEXT NOT NULL,
+  bytes INTEGER NOT NULL,
+  content_type TEXT
+);
+"""
+
+
+class AssetError(Exception):
+  """이미지 다운로드 실패 (크기 초과, 이미지가 아닌 응답 포함)"""
+
+
+def _extension(url, content_type):
+  if content_type:
+    extension = mimetypes.guess_extension(content_type.split(';')[0].strip())
+    if extension:
+      return '.jpg' if extension == '.jpe' else extension
+  extension = os.path.splitext(urlparse(url).path)[1].lower()
+  return extension if 1 < len(extension) <= 5 else ''
+
+
+class _ArticleAssets:
+  """기사 하나의 이미지 다운로드 진행 상황 (모두 끝나면 기사 파일을 다시 저장)"""
+
+  def __init__(self, article_data, output_path, remaining):
+    self.article_data = article_data
+    self.output_path = output_path
+    self.remaining = remaining
+    self.lock = threading.Lock()
+
+
+class AssetDownloader:
+  """
+  기사 이미지를 크롤링과 별도로 내려받아 내용 해시 기준 디렉토리(OUTPUT_DIR/assets/<sha256 앞 두 글자>/<sha256>.<확장자>)에 저장합니다.
+
+  - submit()은 기사 저장 직후 바로 반환하고, 다운로드는 keep-alive 세션을 함께 쓰는 workers개 스레드가 합니다.
+    대기 중인 다운로드가 max_pending개를 넘을 때만 submit()이 기다립니다.
+  - URL 기준 중복: 이미 받은 URL은 인덱스(assets/index.sqlite3)에서 바로 찾고, 받는 중인 URL은
+    같은 다운로드를 함께 기다립니다 (여러 기사에 반복되는 아바타, 로고).
+  - 내용 기준 중복: URL이 달라도 내용(sha256)이 같으면 파일을 하나만 둡니다.
+  - 기사의 이미지가 모두 끝나면 article_data['images'] 항목에 'asset'(OUTPUT_DIR 기준 경로), 'sha256', 'bytes'
+    (실패하면 'error')를 채우고 기사 파일을 임시 파일 + os.replace로 다시 저장합니다.
+  """
+
+  def __init__(self, output_dir=None, workers=None, max_pending=None, max_bytes=None, timeout=30):
+    """
+    Args:
+        output_dir: 출력 디렉토리 (기본값: 환경 변수에서 읽음)
+        workers: 동시 다운로드 수 (기본값: ASSETS_WORKERS 또는 8)
+        max_pending: 대기 중인 다운로드 한도 (기본값: ASSETS_MAX_PENDING 또는 500)
+        max_bytes: 이미지 하나의 최대 크기 (기본값: ASSETS_MAX_MB 또는 20MB)
+        timeout: 요청 타임아웃 (초)
+    """
+    self.output_dir = output_dir or os.getenv('OUTPUT_DIR', 'output')
+    self.asset_dir = os.path.join(self.output_dir, 'assets')
+    self.workers = int(workers or os.getenv('ASSETS_WORKERS', '8'))
+    self.max_bytes = int(max_bytes if max_bytes is not None
+                         else float(os.getenv('ASSETS_MAX_MB', '20')) * 1024 * 1024)
+    self.timeout = timeout
+    self.stats = {'articles': 0, 'downloaded': 0, 'cached': 0, 'same_content': 0, 'errors': 0}
+    Path(self.asset_dir).mkdir(parents=True, exist_ok=True)
+
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(os.path.join(self.asset_dir, INDEX_FILENAME), check_same_thread=False, timeout=30)
+    self._conn.execute('PRAGMA journal_mode=WAL')
+    with self._conn:
+      self._conn.executescript(_SCHEMA)
+    self._in_flight = {}  # URL → Future (이번 실행에서 받는 중인 다운로드)
+    self._slots = threading.BoundedSemaphore(int(max_pending or os.getenv('ASSETS_MAX_PENDING', '500')))
+    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='assets')
+
+    self.session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers, max_retries=retry)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
+    self.session.headers.update({
+        'User-Agent': os.getenv('ASSETS_USER_AGENT', DEFAULT_USER_AGENT),
+        'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
+    })
+
+  @staticmethod
+  def enabled():
+    return os.getenv('ASSETS', 'false').lower() == 'true'
+
+  def submit(self, article_data, output_path):
+    """
+    기사 이미지 다운로드를 예약합니다 (크롤링 스레드에서 호출, 기사 파일 저장 후).
+
+    Args:
+        article_data: 크롤링 결과 ('images' 사용, 다운로드가 끝나면 항목이 채워짐)
+        output_path: 기사를 저장한 파일 경로 (이미지 정보를 채워 다시 저장)
+    """
+    images = article_data.get('images') or []
+    if not images:
+      return
+    with self._lock:
+      self.stats['articles'] += 1
+    article = _ArticleAssets(article_data, output_path, len(images))
+    for image in images:
+      future = self._download_future(image['url'])
+      future.add_done_callback(lambda done, image=image: self._image_done(article, image, done))
+
+  def close(self):
+    """예약된 다운로드와 기사 재저장을 모두 마칩니다."""
+    self._executor.shutdown(wait=True)
+    self.session.close()
+    self._conn.close()
+    if self.stats['articles']:
+      logger.info(f"이미지 수집: 기사 {self.stats['articles']}개, 다운로드 {self.stats['downloaded']}개, "
+                  f"이미 받은 URL {self.stats['cached']}개, 같은 내용 {self.stats['same_content']}개, "
+                  f"오류 {self.stats['errors']}개")
+
+  def _count(self, key):
+    with self._lock:
+      self.stats[key] += 1
+    REGISTRY.inc('assets_total', result=key)
+
+  def _download_future(self, url):
+    with self._lock:
+      future = self._in_flight.get(url)
+      if future is not None:
+        return future
+    self._slots.acquire()
+    with self._lock:
+      # 자리를 기다리는 사이 다른 스레드가 같은 URL을 예약했을 수 있음
+      future = self._in_flight.get(url)
+      if future is None:
+        future = self._in_flight[url] = self._executor.submit(self._fetch, url)
+        future.add_done_callback(lambda done: self._fetch_done(url, done))
+        return future
+    self._slots.release()
+    return future
+
+  def _fetch_done(self, url, future):
+    self._slots.release()
+    # 끝난 다운로드는 인덱스에서 찾을 수 있으므로 메모리에서 뺌 (실패한 URL은 다음 기사에서 다시 시도)
+    with self._lock:
+      if self._in_flight.get(url) is future:
+        del self._in_flight[url]
+
+  def _fetch(self, url):
+    """
+    이미지 하나를 받아 내용 해시 경로에 저장합니다 (워커 스레드).
+
+    Returns:
+        {'asset', 'sha256', 'bytes'} (asset은 OUTPUT_DIR 기준 상대 경로)
+    """
+    with self._lock:
+      row = self._conn.execute('SELECT sha256, path, bytes FROM assets WHERE url = ?', (url,)).fetchone()
+    if row and os.path.exists(os.path.join(self.output_dir, row[1])):
+      self._count('cached')
+      return {'asset': row[1], 'sha256': row[0], 'bytes': row[2]}
+
+    # 출력 디렉토리를 함께 쓰는 여러 노드 프로세스와 겹치지 않도록 PID와 스레드 ID를 모두 붙임
+    tmp_path = os.path.join(self.asset_dir, f'.download.{os.getpid()}.{threading.get_ident()}.tmp')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+      with REGISTRY.timer(stage='asset_download'), \
+          self.session.get(url, stream=True, timeout=self.timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if content_type.startswith('text/'):
+          raise AssetError(f"이미지가 아닌 응답입니다: {content_type}")
+        with open(tmp_path, 'wb') as f:
+          for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_bytes:
+              raise AssetError(f"최대 크기({self.max_bytes // (1024 * 1024)}MB)를 넘었습니다")
+            digest.update(chunk)
+            f.write(chunk)
+      REGISTRY.inc('assets_bytes_total', size)
+
+      sha256 = digest.hexdigest()
+      relative = os.path.join('assets', sha256[:2], sha256 + _extension(url, content_type))
+      final_path = os.path.join(self.output_dir, relative)
+      if os.path.exists(final_path):
+        # 다른 URL로 이미 받은 같은 내용
+        os.unlink(tmp_path)
+        self._count('same_content')
+      else:
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        self._count('downloaded')
+    except BaseException:
+      try:
+        os.unlink(tmp_path)
+      except FileNotFoundError:
+        pass
+      raise
+
+    with self._lock, self._conn:
+      self._conn.execute('INSERT OR REPLACE INTO assets (url, sha256, path, bytes, content_type) VALUES (?, ?, ?, ?, ?)',
+                         (url, sha256, relative, size, content_type or None))
+    return {'asset': relative, 'sha256': sha256, 'bytes': size}
+
+  def _image_done(self, article, image, future):
+    error = future.exception()
+    if error is None:
+      image.update(future.result())
+    else:
+      self._count('errors')
+      image['error'] = str(error)
+      logger.warning(f"이미지 다운로드 실패 ({image['url']}): {error}")
+    with article.lock:
+      article.remaining -= 1
+      if article.remaining:
+        return
+      # 이미지 정보를 채운 기사를 다시 저장 (마지막 이미지를 받은 워커 스레드에서)
+      try:
+        size = write_json_atomic(article.output_path, article.article_data)
+        # 다시 저장한 파일 크기가 manifest에 반영되도록 새 기록을 덧붙임
+        append_manifest(self.output_dir, article.article_data.get('url', ''), article.output_path, size)
+      except OSError as e:
+        logger.error(f"이미지 정보 저장 실패 ({article.output_path}): {e}")
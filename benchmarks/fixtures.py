@@ -0,0 +1,276 @@
+"""
+오프라인 벤치마크용 가짜 Medium 사이트와 가짜 Gmail API 서비스
+
+브라우저 컨텍스트의 모든 요청을 가로채(context.route) medium.com 요청은 이 모듈이 만든
+고정 HTML로 응답하고, 나머지는 차단합니다. 네트워크가 없는 머신에서도 같은 결과가 나오도록
+페이지 내용은 시드로 결정됩니다.
+
+- 기사 페이지: 길이별(short/medium/long) 단락, 태그, 응답/조회수 버튼, 스크롤 시 붙는 동적 영역
+- 태그 페이지: 기사 목록 (article.meteredContent 없음)
+- 로그인 흐름: Sign in → Sign in with email → 이메일 입력 → Continue → 자리별 코드 입력 → 세션 쿠키
+  Continue를 누르면 FakeGmailService에 인증 코드 메일이 도착합니다.
+"""
+import base64
+import html
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+SENDER_EMAIL = 'noreply@medium.com'
+LOGIN_CODE = '482913'
+
+# 기사 길이별 단락 수
+ARTICLE_LENGTHS = {'short': 6, 'medium': 40, 'long': 250}
+
+_WORDS = ('crawler', 'latency', 'browser', 'python', 'queue', 'throughput', 'selector', 'network',
+          'render', 'profile', 'memory', 'thread', 'session', 'cookie', 'journal', 'export',
+          'medium', 'article', 'paragraph', 'benchmark', 'fixture', 'replay', 'trace', 'metric')
+
+_MEDIUM_URL = re.compile(r'^https?://([a-z0-9-]+\.)*medium\.com(/|$)')
+
+
+def _sentence(rng, words=14):
+  text = ' '.join(rng.choice(_WORDS) for _ in range(words))
+  return text[0].upper() + text[1:] + '.'
+
+
+def article_urls(count_per_length=1):
+  """벤치마크 대상 기사 URL 목록 (길이별로 count_per_length개)"""
+  urls = []
+  for index, length in itertools.product(range(count_per_length), ARTICLE_LENGTHS):
+    post_id = f'{(index * len(ARTICLE_LENGTHS) + list(ARTICLE_LENGTHS).index(length)) + 1:012x}'
+    urls.append(f'https://medium.com/@bench-author/{length}-benchmark-article-{index}-{post_id}')
+  return urls
+
+
+def tag_urls():
+  """벤치마크 대상 태그 페이지 URL 목록"""
+  return ['https://medium.com/tag/python', 'https://medium.com/tag/web-scraping']
+
+
+class FakeGmailService:
+  """
+  GmailChecker(service=...)에 넣어 쓰는 Gmail API 서비스 대역
+
+  users().messages().list/get/modify(...).execute()만 구현하며,
+  쿼리는 `to:` 주소와 `is:unread`만 해석합니다.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._messages = {}
+    self._ids = itertools.count(1)
+
+  def deliver_code(self, email, code=LOGIN_CODE):
+    """인증 코드 메일을 받은 편지함에 넣습니다."""
+    body = f"Your login code is {code}\n\nThis code expires in 15 minutes."
+    with self._lock:
+      message_id = f'fake{next(self._ids):08d}'
+      self._messages[message_id] = {
+          'id': message_id,
+          'internalDate': str(int(time.time() * 1000)),
+          'labelIds': ['INBOX', 'UNREAD'],
+          'payload': {
+              'mimeType': 'text/plain',
+              'headers': [{'name': 'From', 'value': f'Medium <{SENDER_EMAIL}>'},
+                          {'name': 'To', 'value': email},
+                          {'name': 'Subject', 'value': 'Your Medium login code'}],
+              'body': {'data': base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')},
+          },
+      }
+    return message_id
+
+  def users(self):
+    return self
+
+  def messages(self):
+    return self
+
+  def list(self, userId='me', q='', maxResults=100, pageToken=None):
+    to_match = re.search(r'\bto:(\S+)', q)
+    unread_only = 'is:unread' in q
+    with self._lock:
+      ids = [m['id'] for m in sorted(self._messages.values(), key=lambda m: m['internalDate'], reverse=True)
+             if (not unread_only or 'UNREAD' in m['labelIds'])
+             and (not to_match or any(h['name'] == 'To' and h['value'].lower() == to_match.group(1).lower()
+                                      for h in m['payload']['headers']))]
+    start = int(pageToken or 0)
+    page = ids[start:start + maxResults]
+    result = {'messages': [{'id': mid} for mid in page], 'resultSizeEstimate': len(ids)}
+    if start + maxResults < len(ids):
+      result['nextPageToken'] = str(start + maxResults)
+    return _Request(result)
+
+  def get(self, userId='me', id=None, format='full'):
+    with self._lock:
+      return _Request(json.loads(json.dumps(self._messages[id])))
+
+  def modify(self, userId='me', id=None, body=None):
+    with self._lock:
+      labels = self._messages[id]['labelIds']
+      for label in (body or {}).get('removeLabelIds', []):
+        if label in labels:
+          labels.remove(label)
+      return _Request({'id': id, 'labelIds': list(labels)})
+
+
+class _Request:
+  def __init__(self, result):
+    self._result = result
+
+  def execute(self):
+    return self._result
+
+
+class FixtureSite:
+  """
+  가짜 Medium 사이트. install()로 브라우저 컨텍스트에 라우트를 등록합니다.
+
+  Args:
+      gmail: 인증 코드 메일을 넣을 FakeGmailService
+      seed: 페이지 내용 생성 시드
+  """
+
+  def __init__(self, gmail=None, seed=0):
+    self.gmail = gmail or FakeGmailService()
+    self.seed = seed
+    self.requests = 0
+
+  def install(self, context):
+    """medium.com 요청은 고정 응답으로, 나머지 요청은 차단합니다 (나중에 등록한 라우트가 우선)."""
+    context.route('**/*', lambda route: route.abort('internetdisconnected'))
+    context.route(_MEDIUM_URL, self.handle)
+
+  def handle(self, route):
+    request = route.request
+    self.requests += 1
+    status, content_type, body = self.respond(request.method, request.url, request.post_data)
+    route.fulfill(status=status, content_type=content_type, body=body)
+
+  def respond(self, method, url, post_data=None):
+    """
+    요청 하나에 대한 (상태 코드, Content-Type, 본문)
+
+    브라우저 없이도 호출할 수 있어 fixture 자체를 점검할 때 사용합니다.
+    """
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    if path == '/':
+      return 200, 'text/html; charset=utf-8', self.home_page()
+    if path == '/m/signin/email' and method == 'POST':
+      email = json.loads(post_data or '{}').get('email', '')
+      self.gmail.deliver_code(email)
+      return 200, 'application/json', json.dumps({'sent': True})
+    if path == '/m/signin/verify':
+      code = parse_qs(parsed.query).get('code', [''])[0]
+      return 200, 'application/json', json.dumps({'ok': code == LOGIN_CODE})
+    if path in ('/_/api/session', '/_/graphql'):
+      return 200, 'application/json', json.dumps({'data': {}})
+    if path.startswith('/tag/'):
+      return 200, 'text/html; charset=utf-8', self.tag_page(path.split('/')[2])
+    if path.startswith('/@'):
+      for length in ARTICLE_LENGTHS:
+        if path.split('/')[-1].startswith(f'{length}-'):
+          return 200, 'text/html; charset=utf-8', self.article_page(path, length)
+    return 404, 'text/html; charset=utf-8', '<html><body><h1>404</h1><p>Out of nothing, something.</p></body></html>'
+
+  def home_page(self):
+    """로그인 흐름을 흉내 내는 홈 페이지 (crawler.login()이 쓰는 선택자와 같은 구조)"""
+    return """<!DOCTYPE html>
+<html><head><title>Medium</title></head>
+<body>
+  <nav><a href="#" id="sign-in">Sign in</a></nav>
+  <div id="modal"></div>
+  <script>
+    const modal = document.getElementById('modal');
+    document.getElementById('sign-in').addEventListener('click', (event) => {
+      event.preventDefault();
+      modal.innerHTML = '<button id="with-email">Sign in with email</button>';
+      document.getElementById('with-email').addEventListener('click', showEmailForm);
+    });
+    function showEmailForm() {
+      modal.innerHTML = '<input type="email" placeholder="Enter your email address">' +
+                        '<button id="continue" disabled>Continue</button>';
+      const input = modal.querySelector('input');
+      const button = document.getElementById('continue');
+      input.addEventListener('input', () => { button.disabled = !input.value.includes('@'); });
+      button.addEventListener('click', async () => {
+        const email = input.value;
+        await fetch('/m/signin/email', {method: 'POST', body: JSON.stringify({email})});
+        showCodeForm(email);
+      });
+    }
+    function showCodeForm(email) {
+      modal.innerHTML = Array.from({length: 6}, () => '<input inputmode="numeric" maxlength="1">').join('');
+      const inputs = Array.from(modal.querySelectorAll('input'));
+      inputs.forEach((input, index) => input.addEventListener('input', async () => {
+        if (index + 1 < inputs.length) { inputs[index + 1].focus(); return; }
+        const code = inputs.map((i) => i.value).join('');
+        const response = await fetch('/m/signin/verify?code=' + code);
+        if ((await response.json()).ok) {
+          document.cookie = 'sid=bench-session; path=/';
+          document.cookie = 'uid=bench-user; path=/';
+          await fetch('/_/api/session');
+        }
+      }));
+    }
+  </script>
+</body></html>"""
+
+  def article_page(self, path, length):
+    """기사 페이지 (article.meteredContent 구조, 스크롤하면 응답 영역이 붙음)"""
+    rng = random.Random(f'{self.seed}:{path}')
+    title = _sentence(rng, 7).rstrip('.')
+    paragraphs = []
+    for index in range(ARTICLE_LENGTHS[length]):
+      if index and index % 12 == 0:
+        paragraphs.append(f'<h3>{html.escape(_sentence(rng, 5))}</h3>')
+      if index and index % 20 == 0:
+        paragraphs.append(f'<figure><img loading="lazy" src="https://miro.medium.com/v2/resize:fit:700/'
+                          f'bench-{index}.png" alt=""></figure>')
+      paragraphs.append(f'<p>{html.escape(" ".join(_sentence(rng) for _ in range(rng.randint(2, 6))))}</p>')
+    tags = rng.sample(['Python', 'Web Scraping', 'Playwright', 'Performance', 'Automation', 'Data'], 3)
+    tag_links = ''.join(f'<a href="/tag/{t.lower().replace(" ", "-")}">{t}</a>' for t in tags)
+
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(title)} | Medium</title></head>
+<body>
+  <article class="meteredContent">
+    <h1 class="pw-post-title" data-testid="storyTitle">{html.escape(title)}</h1>
+    <div><a href="/@bench-author" data-testid="authorName">Bench Author</a>
+      <span data-testid="storyPublishDate"><time datetime="2024-05-01T09:00:00.000Z">May 1, 2024</time></span></div>
+    <section><div data-testid="storyBody">{''.join(paragraphs)}</div></section>
+    <div class="tags">{tag_links}</div>
+    <button aria-label="{rng.randint(1, 300)} responses">{rng.randint(1, 300)}</button>
+    <span data-testid="viewCount">{rng.randint(1, 90)}K views</span>
+  </article>
+  <div id="responses"></div>
+  <script>
+    // 실제 페이지처럼 로드 후 몇 번의 백그라운드 요청과, 스크롤 시 붙는 동적 영역
+    for (let i = 0; i < 3; i++) setTimeout(() => fetch('/_/graphql', {{method: 'POST', body: '{{}}'}}), 50 * i);
+    let loaded = false;
+    window.addEventListener('scroll', () => {{
+      if (loaded || window.scrollY + window.innerHeight < document.body.scrollHeight - 200) return;
+      loaded = true;
+      fetch('/_/graphql', {{method: 'POST', body: '{{"responses":true}}'}}).then(() => {{
+        document.getElementById('responses').innerHTML = '<p>Responses are shown here after scrolling.</p>';
+      }});
+    }});
+  </script>
+</body></html>"""
+
+  def tag_page(self, tag):
+    """태그 페이지 (기사 목록만 있고 article.meteredContent는 없음)"""
+    rng = random.Random(f'{self.seed}:tag:{tag}')
+    items = ''.join(
+        f'<article><h2><a href="/@bench-author/{_sentence(rng, 3).lower().rstrip(".").replace(" ", "-")}-'
+        f'{rng.getrandbits(44):011x}">{html.escape(_sentence(rng, 6))}</a></h2>'
+        f'<p>{html.escape(_sentence(rng))}</p></article>'
+        for _ in range(25))
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(tag)} – Medium</title></head>
+<body><h1>{html.escape(tag.replace('-', ' ').title())}</h1><main>{items}</main></body></html>"""
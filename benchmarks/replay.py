@@ -0,0 +1,259 @@
+"""
+crawl_article / login 오프라인 재생 벤치마크
+
+실제 medium.com 대신 benchmarks/fixtures.py의 가짜 사이트(또는 --har로 지정한 녹화 세션)를
+브라우저 컨텍스트 라우트로 재생하므로 네트워크 없이 실행됩니다. 인증 코드는 가짜 Gmail 서비스로 받습니다.
+
+시나리오:
+    login       가짜 로그인 흐름 전체 (단계별 소요 시간)
+    sequential  크롤러 하나로 기사(짧은/중간/긴 글)와 태그 페이지를 순서대로 크롤링
+                (태그 페이지는 not_article로 분류되어 이동 전에 바로 종료됨)
+    concurrent  --workers개 크롤러(스레드별 브라우저)가 같은 URL 목록을 나누어 크롤링
+
+각 시나리오의 처리량(articles/sec), 단계별 지연 시간(p50/p95/p99), 메모리를 출력하고
+--json으로 저장합니다. --baseline을 주면 이전 결과보다 처리량이 --max-regression 이상 떨어졌을 때
+종료 코드 1을 반환합니다.
+
+사용법:
+    python benchmarks/replay.py                          # 모든 시나리오
+    python benchmarks/replay.py --scenario sequential --articles 3 --json replay.json
+    python benchmarks/replay.py --baseline replay.json   # 배포 전 회귀 검사
+    python benchmarks/replay.py --har medium.har --urls urls.txt   # 녹화한 세션 재생
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# 실제 계정/설정과 섞이지 않도록 벤치마크 전용 값 사용
+os.environ.setdefault('MEDIUM_EMAIL', 'bench@example.com')
+os.environ['SENDER_EMAIL'] = 'noreply@medium.com'
+os.environ['TRACE_CAPTURE'] = 'false'
+
+from fixtures import FakeGmailService, FixtureSite, article_urls, tag_urls  # noqa: E402
+
+from crawler import MediumCrawler  # noqa: E402
+from gmail_checker import GmailChecker  # noqa: E402
+from metrics import REGISTRY  # noqa: E402
+
+
+def _rss_mb():
+  """현재 프로세스의 최대 RSS (MB, Linux는 KB 단위로 보고됨)"""
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak / 1024 if sys.platform != 'darwin' else peak / (1024 * 1024)
+
+
+class ReplayCrawler:
+  """가짜 사이트(또는 HAR)를 라우트로 연결한 MediumCrawler를 만듭니다."""
+
+  def __init__(self, har_path=None, headless=True):
+    self.har_path = har_path
+    self.headless = headless
+    self.gmail = FakeGmailService()
+    self.site = FixtureSite(self.gmail)
+
+  def create(self, email=None):
+    crawler = MediumCrawler(email=email, headless=self.headless,
+                            gmail_checker=GmailChecker(service=self.gmail))
+    crawler.start_browser()
+    if self.har_path:
+      # 녹화에 없는 요청은 차단 (네트워크로 나가지 않음)
+      crawler.context.route_from_har(self.har_path, not_found='abort')
+    else:
+      self.site.install(crawler.context)
+    return crawler
+
+
+def _js_heap_mb(crawler):
+  try:
+    used = crawler.page.evaluate('() => performance.memory ? performance.memory.usedJSHeapSize : 0')
+    return used / (1024 * 1024)
+  except Exception:
+    return None
+
+
+def _stage_stats():
+  stages = {}
+  for histogram in REGISTRY.snapshot()['histograms']:
+    if histogram['name'] == 'crawl_stage_seconds':
+      stages[histogram['labels'].get('stage')] = {
+          key: round(histogram[key], 4) for key in ('count', 'mean', 'p50', 'p95', 'p99', 'max')}
+  return stages
+
+
+def _crawl_all(crawler, urls):
+  ok = 0
+  for url in urls:
+    if 'error' not in crawler.crawl_article(url):
+      ok += 1
+  return ok
+
+
+def run_login(replay):
+  crawler = replay.create()
+  try:
+    started = time.perf_counter()
+    success = crawler.login()
+    elapsed = time.perf_counter() - started
+    return {
+        'success': success,
+        'elapsed': round(elapsed, 3),
+        'steps': {name: round(value, 4) for name, value in getattr(crawler, 'login_timings', [])},
+    }
+  finally:
+    crawler.close_browser()
+
+
+def run_sequential(replay, urls):
+  crawler = replay.create()
+  try:
+    started = time.perf_counter()
+    ok = _crawl_all(crawler, urls)
+    elapsed = time.perf_counter() - started
+    return {'pages': len(urls), 'ok': ok, 'elapsed': round(elapsed, 3),
+            'articles_per_sec': round(len(urls) / elapsed, 4), 'js_heap_mb': _js_heap_mb(crawler)}
+  finally:
+    crawler.close_browser()
+
+
+def run_concurrent(replay, urls, workers):
+  # Playwright sync API 객체는 만든 스레드에서만 쓸 수 있으므로 스레드마다 브라우저를 띄움
+  results = [0] * workers
+  ready = threading.Barrier(workers + 1)
+  errors = []
+
+  def _worker(index):
+    crawler = None
+    try:
+      crawler = replay.create()
+    except Exception as e:
+      errors.append(str(e))
+    finally:
+      ready.wait()
+    if crawler is None:
+      return
+    try:
+      results[index] = _crawl_all(crawler, urls[index::workers])
+    finally:
+      crawler.close_browser()
+
+  threads = [threading.Thread(target=_worker, args=(i,)) for i in range(workers)]
+  for thread in threads:
+    thread.start()
+  # 브라우저 시작 시간은 처리량에서 제외
+  ready.wait()
+  started = time.perf_counter()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - started
+  return {'pages': len(urls), 'ok': sum(results), 'workers': workers, 'elapsed': round(elapsed, 3),
+          'articles_per_sec': round(len(urls) / elapsed, 4), 'errors': errors}
+
+
+def run_scenario(name, replay, urls, workers):
+  REGISTRY.reset()
+  tracemalloc.start()
+  try:
+    if name == 'login':
+      result = run_login(replay)
+    elif name == 'sequential':
+      result = run_sequential(replay, urls)
+    else:
+      result = run_concurrent(replay, urls, workers)
+    _, python_peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  result['stages'] = _stage_stats()
+  result['memory'] = {'python_peak_mb': round(python_peak / (1024 * 1024), 2), 'rss_max_mb': round(_rss_mb(), 1)}
+  return result
+
+
+def check_baseline(results, baseline, max_regression):
+  """처리량 회귀 목록"""
+  violations = []
+  for name, result in results.items():
+    previous = baseline.get('results', {}).get(name, {})
+    if 'articles_per_sec' in result and previous.get('articles_per_sec'):
+      floor = previous['articles_per_sec'] * (1 - max_regression)
+      if result['articles_per_sec'] < floor:
+        violations.append(f"{name}: {result['articles_per_sec']:.3f} articles/s < "
+                          f"기준 {previous['articles_per_sec']:.3f}의 {1 - max_regression:.0%}")
+    if name == 'login' and previous.get('elapsed') and result.get('elapsed'):
+      if result['elapsed'] > previous['elapsed'] * (1 + max_regression):
+        violations.append(f"login: {result['elapsed']:.2f}s > 기준 {previous['elapsed']:.2f}s")
+  return violations
+
+
+def main():
+  parser = argparse.ArgumentParser(description='crawl_article / login 오프라인 재생 벤치마크')
+  parser.add_argument('--scenario', action='append', choices=['login', 'sequential', 'concurrent'],
+                      help='실행할 시나리오 (여러 번 지정 가능, 기본값: 전체)')
+  parser.add_argument('--articles', type=int, default=1, help='길이별 기사 수 (fixture 사용 시)')
+  parser.add_argument('--no-tags', action='store_true', help='태그 페이지 제외')
+  parser.add_argument('--workers', type=int, default=2, help='concurrent 시나리오의 브라우저 수')
+  parser.add_argument('--har', help='fixture 대신 재생할 HAR 파일 (playwright open --save-har로 녹화)')
+  parser.add_argument('--urls', help='--har 사용 시 크롤링할 URL 목록 파일')
+  parser.add_argument('--headed', action='store_true', help='브라우저 창 표시')
+  parser.add_argument('--json', dest='json_path', help='결과를 저장할 JSON 파일 경로')
+  parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+  parser.add_argument('--max-regression', type=float, default=0.2, help='허용 처리량 감소 비율 (기본값: 0.2)')
+  args = parser.parse_args()
+
+  if args.har:
+    from utils import read_urls_from_file
+    if not args.urls:
+      parser.error('--har를 사용할 때는 --urls로 재생할 URL 목록을 지정하세요.')
+    urls = read_urls_from_file(args.urls)
+    scenarios = args.scenario or ['sequential', 'concurrent']
+  else:
+    urls = article_urls(args.articles) + ([] if args.no_tags else tag_urls())
+    scenarios = args.scenario or ['login', 'sequential', 'concurrent']
+
+  replay = ReplayCrawler(har_path=args.har, headless=not args.headed)
+  results = {}
+  for name in scenarios:
+    print(f"[{name}] 실행 중...")
+    results[name] = run_scenario(name, replay, urls, args.workers)
+
+  print(f"\n{'scenario':<12} {'pages':>6} {'elapsed(s)':>11} {'articles/s':>11} {'py peak(MB)':>12} {'rss(MB)':>8}")
+  for name, result in results.items():
+    print(f"{name:<12} {result.get('pages', '-'):>6} {result['elapsed']:>11.2f} "
+          f"{result.get('articles_per_sec', 0):>11.3f} {result['memory']['python_peak_mb']:>12.2f} "
+          f"{result['memory']['rss_max_mb']:>8.1f}")
+    for stage, stats in result['stages'].items():
+      print(f"  {stage:<22} p50 {stats['p50']:7.3f}s  p95 {stats['p95']:7.3f}s  p99 {stats['p99']:7.3f}s")
+    for step, elapsed in result.get('steps', {}).items():
+      print(f"  {step:<22} {elapsed:7.3f}s")
+
+  violations = []
+  if args.baseline:
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+      violations = check_baseline(results, json.load(f), args.max_regression)
+
+  if args.json_path:
+    import playwright
+    with open(args.json_path, 'w', encoding='utf-8') as f:
+      json.dump({'python': sys.version, 'playwright': getattr(playwright, '__version__', None),
+                 'source': args.har or 'fixtures', 'urls': urls, 'results': results,
+                 'violations': violations}, f, ensure_ascii=False, indent=2)
+
+  if violations:
+    print("\n기준 대비 회귀:")
+    for violation in violations:
+      print(f"  - {violation}")
+    sys.exit(1)
+  if any(result.get('success') is False or result.get('errors') for result in results.values()):
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
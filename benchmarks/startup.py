@@ -0,0 +1,135 @@
+"""
+main.py 시작 시간 벤치마크 (`python -X importtime` 기반)
+
+각 시나리오를 새 프로세스로 여러 번 실행하여 import 시간과 전체 실행 시간을 측정하고,
+startup_budget.json의 예산(최대 import 시간, import 되면 안 되는 모듈)과 비교합니다.
+예산을 넘으면 종료 코드 1을 반환하므로 CI나 배포 전 점검에 사용할 수 있습니다.
+
+사용법:
+    python benchmarks/startup.py                 # 결과 표 출력 + 예산 검사
+    python benchmarks/startup.py --json out.json # 결과를 JSON으로도 저장
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET = Path(__file__).resolve().parent / 'startup_budget.json'
+
+# -X importtime 출력: "import time:       self [us] |  cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+# 인터프리터 시작 시 항상 로드되는 모듈 (.pth 처리 등 환경 의존적이라 예산에서 제외)
+_INTERPRETER_MODULES = {'site', 'encodings', 'encodings.utf_8', '_io', 'marshal', 'posix', 'zipimport'}
+
+
+def parse_importtime(stderr):
+  """
+  -X importtime 출력을 파싱합니다.
+
+  Returns:
+      (인터프리터 기본 모듈을 제외한 최상위 import 누적 시간 합계(ms), import 된 모듈 이름 집합, 최상위 모듈별 누적 시간(ms) 딕셔너리)
+  """
+  total_us = 0
+  modules = set()
+  top_level = {}
+  for line in stderr.splitlines():
+    match = _IMPORTTIME_LINE.match(line)
+    if not match:
+      continue
+    cumulative = int(match.group(2))
+    # 들여쓰기 1칸 = 최상위 import (하위 import는 이미 누적 시간에 포함됨)
+    depth = (len(match.group(3)) - 1) // 2
+    name = match.group(4)
+    modules.add(name)
+    if depth == 0 and name not in _INTERPRETER_MODULES:
+      total_us += cumulative
+      top_level[name] = top_level.get(name, 0) + cumulative / 1000
+  return total_us / 1000, modules, top_level
+
+
+def run_scenario(args, runs):
+  """시나리오를 runs번 실행하여 측정값을 반환합니다."""
+  import_ms = []
+  wall_ms = []
+  modules = set()
+  top_level = {}
+  env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+  for _ in range(runs):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, env=env, stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms.append((time.perf_counter() - started) * 1000)
+    total, run_modules, run_top = parse_importtime(result.stderr)
+    import_ms.append(total)
+    modules |= run_modules
+    top_level = run_top
+  return {
+      'import_ms_median': statistics.median(import_ms),
+      'import_ms_max': max(import_ms),
+      'wall_ms_median': statistics.median(wall_ms),
+      'modules': sorted(modules),
+      'slowest_imports': sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:10],
+  }
+
+
+def check_budget(name, measured, budget):
+  """예산 위반 항목 목록을 반환합니다."""
+  violations = []
+  max_import_ms = budget.get('max_import_ms')
+  if max_import_ms is not None and measured['import_ms_median'] > max_import_ms:
+    violations.append(
+        f"{name}: import 시간 {measured['import_ms_median']:.1f}ms > 예산 {max_import_ms}ms")
+  imported = set(measured['modules'])
+  for module in budget.get('forbidden_modules', []):
+    if module in imported:
+      violations.append(f"{name}: '{module}' 모듈이 import 되었습니다 (지연 import 대상)")
+  return violations
+
+
+def main():
+  parser = argparse.ArgumentParser(description='main.py 시작 시간 벤치마크')
+  parser.add_argument('--runs', type=int, default=5, help='시나리오별 실행 횟수')
+  parser.add_argument('--budget', default=str(DEFAULT_BUDGET), help='예산 파일 경로')
+  parser.add_argument('--json', dest='json_path', help='결과를 저장할 JSON 파일 경로')
+  args = parser.parse_args()
+
+  with open(args.budget, 'r', encoding='utf-8') as f:
+    scenarios = json.load(f)['scenarios']
+
+  results = {}
+  violations = []
+  for name, scenario in scenarios.items():
+    measured = run_scenario(scenario['args'], args.runs)
+    results[name] = measured
+    violations.extend(check_budget(name, measured, scenario.get('budget', {})))
+
+  print(f"{'scenario':<24} {'import(ms)':>11} {'wall(ms)':>10}  slowest imports")
+  for name, measured in results.items():
+    slowest = ', '.join(f"{module} {ms:.1f}" for module, ms in measured['slowest_imports'][:3])
+    print(f"{name:<24} {measured['import_ms_median']:>11.1f} {measured['wall_ms_median']:>10.1f}  {slowest}")
+
+  if args.json_path:
+    with open(args.json_path, 'w', encoding='utf-8') as f:
+      json.dump({'python': sys.version, 'runs': args.runs, 'results': results,
+                 'violations': violations}, f, ensure_ascii=False, indent=2)
+
+  if violations:
+    print("\n예산 초과:")
+    for violation in violations:
+      print(f"  - {violation}")
+    sys.exit(1)
+  print("\n모든 시나리오가 예산 이내입니다.")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from config import load_env
+from metrics import REGISTRY
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 크롤러가 직접 띄우는 브라우저와 같은 실행 인자 (crawler.MediumCrawler.start_browser 참고)
+_CHROMIUM_ARGS = [
+    '--enable-javascript',
+    '--js-flags=--expose-gc',
+    '--disable-blink-features=AutomationControlled',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-background-networking',
+]
+
+
+def cdp_endpoint_from_env():
+  """CDP_ENDPOINT 환경 변수 (없으면 None)"""
+  return os.getenv('CDP_ENDPOINT') or None
+
+
+def cdp_alive(endpoint, timeout=2):
+  """CDP 엔드포인트가 응답하는지 확인합니다 (/json/version)."""
+  try:
+    with urllib.request.urlopen(f"{endpoint.rstrip('/')}/json/version", timeout=timeout) as response:
+      return 'webSocketDebuggerUrl' in json.loads(response.read())
+  except (OSError, ValueError):
+    return False
+
+
+def wait_for_cdp(endpoint, timeout=30):
+  """
+  CDP 엔드포인트가 응답할 때까지 기다립니다 (런처가 브라우저를 다시 띄우는 중일 수 있음).
+
+  Returns:
+      응답하면 True, timeout 안에 응답이 없으면 False
+  """
+  deadline = time.monotonic() + timeout
+  while True:
+    if cdp_alive(endpoint):
+      return True
+    if time.monotonic() >= deadline:
+      return False
+    time.sleep(0.5)
+
+
+def connect_cdp_browser(playwright, endpoint, timeout=None):
+  """
+  실행 중인 공유 Chromium에 연결합니다.
+
+  Args:
+      playwright: sync_playwright().start() 결과
+      endpoint: 'http://127.0.0.1:9222' 형식의 CDP 주소
+      timeout: 엔드포인트가 응답할 때까지 기다릴 시간 (초, 기본값: CDP_CONNECT_TIMEOUT 또는 30)
+
+  Returns:
+      Playwright Browser (close()는 이 프로세스가 만든 컨텍스트만 닫고 연결을 끊음)
+  """
+  timeout = float(timeout if timeout is not None else os.getenv('CDP_CONNECT_TIMEOUT', '30'))
+  if not wait_for_cdp(endpoint, timeout):
+    raise RuntimeError(f"공유 브라우저에 연결할 수 없습니다: {endpoint} (python main.py --launch-browser 실행 여부 확인)")
+  return playwright.chromium.connect_over_cdp(endpoint)
+
+
+class BrowserLauncher:
+  """
+  여러 크롤러 프로세스가 connect_over_cdp로 함께 쓰는 Chromium을 띄워 두고 감시합니다 (main.py --launch-browser).
+
+  크롤러 프로세스마다 브라우저를 새로 띄우는 대신 이미 실행 중인 브라우저에 연결해 자기 컨텍스트만 만들므로
+  짧은 배치 작업도 바로 시작하고, 브라우저 프로세스 메모리를 프로세스 간에 공유합니다.
+  health_interval마다 /json/version으로 상태를 확인하고, 프로세스가 죽었거나 연속으로 응답하지 않으면 다시 띄웁니다.
+  포트가 같으므로 크롤러는 같은 CDP_ENDPOINT로 다시 연결합니다.
+  """
+
+  def __init__(self, host=None, port=None, headless=None, user_data_dir=None, executable_path=None,
+               health_interval=None, max_failures=3):
+    """
+    Args:
+        host: 원격 디버깅 바인드 주소 (기본값: CDP_HOST 또는 127.0.0.1)
+        port: 원격 디버깅 포트 (기본값: CDP_PORT 또는 9222)
+        headless: headless 여부 (기본값: CDP_HEADLESS 또는 true)
+        user_data_dir: 브라우저 프로필 디렉토리 (기본값: CDP_USER_DATA_DIR 또는 output/cdp_profile)
+        executable_path: Chromium 실행 파일 (기본값: CDP_CHROMIUM_PATH 또는 Playwright가 설치한 Chromium)
+        health_interval: 상태 확인 간격 (초, 기본값: CDP_HEALTH_INTERVAL 또는 5)
+        max_failures: 연속 응답 실패가 이 횟수에 이르면 다시 띄움
+    """
+    self.host = host or os.getenv('CDP_HOST', '127.0.0.1')
+    self.port = int(port or os.getenv('CDP_PORT', '9222'))
+    self.headless = (headless if headless is not None
+                     else os.getenv('CDP_HEADLESS', 'true').lower() != 'false')
+    self.user_data_dir = Path(user_data_dir or os.getenv('CDP_USER_DATA_DIR', os.path.join('output', 'cdp_profile')))
+    self.executable_path = executable_path or os.getenv('CDP_CHROMIUM_PATH')
+    self.health_interval = float(health_interval or os.getenv('CDP_HEALTH_INTERVAL', '5'))
+    self.max_failures = max_failures
+    self.launches = 0
+    self._process = None
+    self._stopping = threading.Event()
+
+  @property
+  def endpoint(self):
+    return f'http://{self.host}:{self.port}'
+
+  def _executable(self):
+    if not self.executable_path:
+      from playwright.sync_api import sync_playwright
+      with sync_playwright() as playwright:
+        self.executable_path = playwright.chromium.executable_path
+    return self.executable_path
+
+  def _command(self):
+    command = [
+        self._executable(),
+        f'--remote-debugging-address={self.host}',
+        f'--remote-debugging-port={self.port}',
+        f'--user-data-dir={self.user_data_dir.resolve()}',
+        *_CHROMIUM_ARGS,
+    ]
+    if self.headless:
+      command.append('--headless=new')
+    command.append('about:blank')
+    return command
+
+  def launch(self, timeout=30):
+    """브라우저를 띄우고 CDP 엔드포인트가 응답할 때까지 기다립니다."""
+    if cdp_alive(self.endpoint):
+      raise RuntimeError(f"이미 다른 브라우저가 {self.endpoint}에서 실행 중입니다.")
+    self.user_data_dir.mkdir(parents=True, exist_ok=True)
+    self._process = subprocess.Popen(self._command(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL, start_new_session=True)
+    if not wait_for_cdp(self.endpoint, timeout):
+      self._terminate()
+      raise RuntimeError(f"브라우저가 {timeout:.0f}초 안에 CDP 엔드포인트를 열지 못했습니다: {self.endpoint}")
+    self.launches += 1
+    logger.info(f"공유 브라우저 실행 (pid {self._process.pid}): {self.endpoint}")
+
+  def _terminate(self):
+    if not self._process or self._process.poll() is not None:
+      return
+    self._process.terminate()
+    try:
+      self._process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+      self._process.kill()
+      self._process.wait()
+
+  def run(self):
+    """브라우저를 띄우고 stop()이 호출될 때까지 상태를 감시하며, 죽으면 다시 띄웁니다."""
+    self.launch()
+    failures = 0
+    try:
+      while not self._stopping.wait(self.health_interval):
+        if self._process.poll() is not None:
+          logger.warning(f"공유 브라우저가 종료되었습니다 (exit {self._process.returncode}). 다시 띄웁니다.")
+        elif cdp_alive(self.endpoint):
+          failures = 0
+          continue
+        else:
+          failures += 1
+          logger.warning(f"공유 브라우저 상태 확인 실패 ({failures}/{self.max_failures})")
+          if failures < self.max_failures:
+            continue
+          logger.warning("공유 브라우저가 응답하지 않아 다시 띄웁니다.")
+        failures = 0
+        self._terminate()
+        REGISTRY.inc('crawl_retries_total', kind='cdp_relaunch')
+        try:
+          self.launch()
+        except Exception as e:
+          logger.error(f"공유 브라우저 재실행 실패, 다음 확인 때 다시 시도: {e}")
+    finally:
+      self._terminate()
+      logger.info("공유 브라우저 종료")
+
+  def stop(self):
+    self._stopping.set()
+
+
+def run_launcher():
+  """main.py --launch-browser: SIGTERM/SIGINT를 받을 때까지 공유 브라우저를 유지합니다."""
+  launcher = BrowserLauncher()
+
+  def _handle_signal(signum, frame):
+    logger.info(f"종료 신호 수신 ({signal.Signals(signum).name})")
+    launcher.stop()
+
+  signal.signal(signal.SIGTERM, _handle_signal)
+  signal.signal(signal.SIGINT, _handle_signal)
+  logger.info(f"크롤러에서 CDP_ENDPOINT={launcher.endpoint}로 설정하면 이 브라우저에 연결합니다.")
+  launcher.run()
@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from config import load_env
+
+try:
+  import fcntl
+except ImportError:  # Windows: 잠금 없이 사용 (같은 프로필을 동시에 쓰지 않도록 주의)
+  fcntl = None
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 프로필에서 캐시로만 쓰이는 디렉토리 (지워도 로그인/쿠키에는 영향 없음, 큰 것부터)
+_CACHE_DIRS = (
+    'Default/Cache',
+    'Default/Code Cache',
+    'Default/Service Worker/CacheStorage',
+    'Default/GPUCache',
+    'GrShaderCache',
+    'GraphiteDawnCache',
+    'ShaderCache',
+)
+# 비정상 종료 시 남는 Chromium 단일 인스턴스 잠금 파일
+_SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+_TEMPLATE_NAME = '_template'
+
+
+def _dir_size(path):
+  total = 0
+  for dirpath, _, filenames in os.walk(path):
+    for filename in filenames:
+      try:
+        total += os.lstat(os.path.join(dirpath, filename)).st_size
+      except OSError:
+        pass
+  return total
+
+
+def _profile_slug(name):
+  return re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('._') or 'default'
+
+
+class BrowserProfile:
+  """
+  launch_persistent_context용 브라우저 프로필 디렉토리를 관리합니다 (opt-in).
+
+  새 컨텍스트는 매번 빈 HTTP 캐시로 시작해 Medium의 JS 번들, CSS, 폰트를 다시 받고 다시 컴파일하므로,
+  프로필을 디스크에 남겨 디스크 캐시와 V8 코드 캐시를 다음 실행에서도 재사용합니다.
+
+  - 프로필은 이름(기본값: 계정 이메일)별로 root/profiles/<이름>에 두고, 파일 잠금으로 한 번에 한 브라우저만 씁니다.
+    같은 이름을 다른 워커가 쓰고 있으면 <이름>-2, <이름>-3 … 워커별 프로필을 사용합니다.
+  - 새 프로필은 템플릿(root/profiles/_template)의 캐시 디렉토리만 복사해 시작합니다 (쿠키/로그인 정보는 복사하지 않음).
+    템플릿은 브라우저를 닫을 때 캐시가 데워진 프로필로 template_ttl마다 갱신됩니다.
+  - HTTP 캐시 크기는 --disk-cache-size로 제한하고, 브라우저를 닫은 뒤 프로필이 max_bytes를 넘으면
+    캐시 디렉토리만 큰 것부터 지웁니다.
+  """
+
+  def __init__(self, root=None, max_bytes=None, template_ttl=None):
+    """
+    Args:
+        root: 프로필 루트 디렉토리 (기본값: BROWSER_PROFILE_DIR 또는 output/browser_profiles)
+        max_bytes: 프로필 하나의 최대 크기 (기본값: BROWSER_PROFILE_MAX_MB 또는 500MB)
+        template_ttl: 템플릿 캐시 갱신 간격 (초, 기본값: BROWSER_PROFILE_TEMPLATE_TTL 또는 86400)
+    """
+    self.root = Path(root or os.getenv('BROWSER_PROFILE_DIR', os.path.join('output', 'browser_profiles')))
+    self.max_bytes = int(max_bytes if max_bytes is not None
+                         else float(os.getenv('BROWSER_PROFILE_MAX_MB', '500')) * 1024 * 1024)
+    self.template_ttl = float(template_ttl if template_ttl is not None
+                              else os.getenv('BROWSER_PROFILE_TEMPLATE_TTL', '86400'))
+    self._locks = {}  # 프로필 경로 → 잠금 파일 객체
+
+  @classmethod
+  def from_env(cls):
+    """BROWSER_PROFILE=true이면 BrowserProfile을, 아니면 None을 반환합니다."""
+    if os.getenv('BROWSER_PROFILE', 'false').lower() != 'true':
+      return None
+    return cls()
+
+  @property
+  def template_dir(self):
+    return self.root / 'profiles' / _TEMPLATE_NAME
+
+  def launch_args(self):
+    """Chromium 실행 인자 (HTTP 디스크 캐시 크기 제한, 나머지 용량은 코드 캐시 등에 남김)"""
+    return [f'--disk-cache-size={self.max_bytes * 3 // 4}']
+
+  def acquire(self, name='default'):
+    """
+    사용할 프로필 디렉토리를 잠그고 반환합니다. 브라우저를 띄우기 전에 호출합니다.
+
+    Args:
+        name: 프로필 이름 (계정별로 쿠키가 분리되도록 보통 이메일 사용)
+
+    Returns:
+        프로필 디렉토리 Path
+    """
+    slug = _profile_slug(name)
+    (self.root / 'locks').mkdir(parents=True, exist_ok=True)
+    index = 1
+    while True:
+      profile_name = slug if index == 1 else f'{slug}-{index}'
+      path = self.root / 'profiles' / profile_name
+      if self._lock(path, profile_name):
+        break
+      index += 1
+
+    if not path.exists():
+      self._clone_template(path)
+    # 잠금을 얻었으므로 남아 있는 Chromium 잠금 파일은 비정상 종료의 흔적
+    for filename in _SINGLETON_FILES:
+      try:
+        os.unlink(path / filename)
+      except FileNotFoundError:
+        pass
+    logger.info(f"브라우저 프로필 사용: {path}")
+    return path
+
+  def release(self, path):
+    """
+    브라우저를 닫은 뒤 호출합니다. 용량을 정리하고 필요하면 템플릿을 갱신한 다음 잠금을 풉니다.
+
+    Args:
+        path: acquire()가 반환한 프로필 디렉토리
+    """
+    path = Path(path)
+    try:
+      self._trim(path)
+      self._refresh_template(path)
+    except OSError as e:
+      logger.warning(f"브라우저 프로필 정리 실패 ({path}): {e}")
+    finally:
+      lock_file = self._locks.pop(str(path), None)
+      if lock_file:
+        lock_file.close()
+
+  def _lock(self, path, profile_name):
+    if str(path) in self._locks:
+      return False
+    lock_file = open(self.root / 'locks' / f'{profile_name}.lock', 'a')
+    if fcntl:
+      try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+      except BlockingIOError:
+        lock_file.close()
+        return False
+    self._locks[str(path)] = lock_file
+    return True
+
+  def _clone_template(self, path):
+    """템플릿의 캐시 디렉토리만 복사해 새 프로필을 만듭니다."""
+    path.mkdir(parents=True, exist_ok=True)
+    if not self.template_dir.exists():
+      return
+    for relative in _CACHE_DIRS:
+      source = self.template_dir / relative
+      if source.is_dir():
+        shutil.copytree(source, path / relative, dirs_exist_ok=True)
+    logger.info(f"템플릿 캐시로 프로필 생성: {path}")
+
+  def _trim(self, path):
+    """프로필이 max_bytes를 넘으면 캐시 디렉토리를 큰 것부터 지웁니다."""
+    total = _dir_size(path)
+    if total <= self.max_bytes:
+      return
+    caches = sorted(((_dir_size(path / relative), relative) for relative in _CACHE_DIRS
+                     if (path / relative).is_dir()), reverse=True)
+    for size, relative in caches:
+      if total <= self.max_bytes:
+        break
+      shutil.rmtree(path / relative, ignore_errors=True)
+      total -= size
+      logger.info(f"브라우저 프로필 용량 초과로 캐시 삭제: {path / relative} ({size / (1024 * 1024):.1f}MB)")
+
+  def _refresh_template(self, path):
+    """템플릿이 없거나 template_ttl보다 오래되었으면 이 프로필의 캐시로 교체합니다."""
+    template = self.template_dir
+    if template.exists() and time.time() - template.stat().st_mtime < self.template_ttl:
+      return
+    if not self._lock(template, _TEMPLATE_NAME):
+      return  # 다른 워커가 갱신 중
+    try:
+      staging = template.with_name(f'{_TEMPLATE_NAME}.{os.getpid()}.tmp')
+      shutil.rmtree(staging, ignore_errors=True)
+      staging.mkdir(parents=True)
+      for relative in _CACHE_DIRS:
+        source = path / relative
+        if source.is_dir():
+          shutil.copytree(source, staging / relative)
+      previous = template.with_name(f'{_TEMPLATE_NAME}.{os.getpid()}.old')
+      if template.exists():
+        os.replace(template, previous)
+      os.replace(staging, template)
+      shutil.rmtree(previous, ignore_errors=True)
+      logger.info(f"브라우저 프로필 템플릿 갱신: {path} → {template}")
+    finally:
+      self._locks.pop(str(template)).close()
@@ -0,0 +1,295 @@
+import logging
+import os
+import statistics
+import threading
+import time
+
+from config import load_env
+from metrics import REGISTRY
+from page_classifier import Outcome
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+
+def host_cpu_pressure():
+  """1분 평균 부하 / CPU 수 (지원하지 않는 환경이면 None)"""
+  try:
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
+  except (AttributeError, OSError):
+    return None
+
+
+def host_memory_pressure():
+  """사용 중인 메모리 비율 (/proc/meminfo의 MemAvailable 기준, Linux 외에는 None)"""
+  try:
+    with open('/proc/meminfo', 'r', encoding='ascii') as f:
+      fields = dict(line.split(':', 1) for line in f)
+    total = int(fields['MemTotal'].split()[0])
+    available = int(fields['MemAvailable'].split()[0])
+    return 1 - available / total
+  except (OSError, KeyError, ValueError, ZeroDivisionError):
+    return None
+
+
+def is_failure(article_data):
+  """
+  동시성 조절에 반영할 실패인지 (예외, HTTP 오류, 로그인 리다이렉트)
+
+  404/삭제/멤버 전용/기사 아님은 페이지 자체의 문제이므로 실패로 보지 않습니다.
+  """
+  if 'error' not in article_data:
+    return False
+  return not Outcome(article_data.get('outcome', Outcome.ERROR.value)).permanent
+
+
+class AIMDController:
+  """
+  크롤링 동시성(동시에 여는 페이지 수)을 AIMD(additive increase, multiplicative decrease)로 조절합니다.
+
+  interval마다 그 사이에 끝난 페이지들을 보고
+  - 오류 비율이 max_error_rate를 넘거나, 지연 시간(p90)이 목표를 넘거나, 호스트 CPU/메모리 사용률이 한도를 넘으면
+    동시성을 decrease_factor배로 줄이고
+  - 그렇지 않으면 1씩 늘립니다 (min_limit~max_limit 범위).
+  target_latency를 지정하지 않으면 지금까지 관측한 가장 낮은 구간 중앙값의 latency_tolerance배를 목표로 씁니다
+  (동시성을 올려 페이지당 지연 시간이 기준보다 크게 늘어나면 사이트나 호스트가 포화된 것으로 판단).
+  """
+
+  def __init__(self, min_limit=1, max_limit=4, initial=None, target_latency=None, latency_tolerance=2.0,
+               max_error_rate=0.1, cpu_limit=0.9, memory_limit=0.9, interval=30.0, decrease_factor=0.5,
+               clock=time.monotonic):
+    self.min_limit = max(1, min_limit)
+    self.max_limit = max(self.min_limit, max_limit)
+    self.limit = min(self.max_limit, max(self.min_limit, initial or self.min_limit))
+    self.target_latency = target_latency
+    self.latency_tolerance = latency_tolerance
+    self.max_error_rate = max_error_rate
+    self.cpu_limit = cpu_limit
+    self.memory_limit = memory_limit
+    self.interval = interval
+    self.decrease_factor = decrease_factor
+    self.decisions = []
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._samples = []
+    self._baseline = None
+    self._settling = False
+    self._last_decision = clock()
+
+  @classmethod
+  def from_env(cls):
+    """CRAWL_CONCURRENCY_MAX가 2 이상이면 AIMDController를, 아니면 None을 반환합니다."""
+    max_limit = int(os.getenv('CRAWL_CONCURRENCY_MAX', '1'))
+    if max_limit <= 1:
+      return None
+    target = os.getenv('CRAWL_TARGET_LATENCY')
+    return cls(
+        min_limit=int(os.getenv('CRAWL_CONCURRENCY_MIN', '1')),
+        max_limit=max_limit,
+        initial=int(os.getenv('CRAWL_CONCURRENCY_INITIAL', '0')) or None,
+        target_latency=float(target) if target else None,
+        max_error_rate=float(os.getenv('CRAWL_MAX_ERROR_RATE', '0.1')),
+        cpu_limit=float(os.getenv('CRAWL_CPU_LIMIT', '0.9')),
+        memory_limit=float(os.getenv('CRAWL_MEMORY_LIMIT', '0.9')),
+        interval=float(os.getenv('CRAWL_CONCURRENCY_INTERVAL', '30')),
+    )
+
+  def record(self, latency, failed):
+    """
+    페이지 하나의 결과를 기록하고, 조절 시점이면 새 동시성을 정합니다.
+
+    Args:
+        latency: 페이지 처리 시간 (초)
+        failed: 실패 여부 (is_failure)
+
+    Returns:
+        현재 동시성 한도
+    """
+    with self._lock:
+      self._samples.append((latency, failed))
+      # 표본이 너무 적으면 판단을 미룸 (동시성만큼은 모여야 구간의 대표값이 됨)
+      if self._clock() - self._last_decision >= self.interval and len(self._samples) >= self.limit:
+        self._decide()
+      return self.limit
+
+  def _decide(self):
+    samples, self._samples = self._samples, []
+    self._last_decision = self._clock()
+    if self._settling:
+      # 줄이기 직전에 시작한 페이지들이 섞인 구간은 버림 (연속으로 과하게 줄이지 않도록)
+      self._settling = False
+      return
+    latencies = sorted(latency for latency, _ in samples)
+    error_rate = sum(1 for _, failed in samples if failed) / len(samples)
+    p90 = latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))]
+    median = statistics.median(latencies)
+    if error_rate <= self.max_error_rate:
+      self._baseline = median if self._baseline is None else min(self._baseline, median)
+    target = self.target_latency or (self._baseline * self.latency_tolerance if self._baseline else None)
+    cpu = host_cpu_pressure()
+    memory = host_memory_pressure()
+
+    if error_rate > self.max_error_rate:
+      reason = f"오류 비율 {error_rate:.0%} > {self.max_error_rate:.0%}"
+    elif target and p90 > target:
+      reason = f"p90 지연 {p90:.1f}s > 목표 {target:.1f}s"
+    elif cpu is not None and cpu > self.cpu_limit:
+      reason = f"CPU 부하 {cpu:.2f} > {self.cpu_limit:.2f}"
+    elif memory is not None and memory > self.memory_limit:
+      reason = f"메모리 사용률 {memory:.0%} > {self.memory_limit:.0%}"
+    else:
+      reason = None
+
+    previous = self.limit
+    if reason:
+      self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+      self._settling = self.limit != previous
+      direction = 'down'
+    else:
+      self.limit = min(self.max_limit, self.limit + 1)
+      direction = 'up'
+      reason = f"p90 {p90:.1f}s, 오류 {error_rate:.0%}"
+
+    decision = {'at': time.time(), 'from': previous, 'to': self.limit, 'reason': reason, 'pages': len(samples),
+                'p90': round(p90, 3), 'error_rate': round(error_rate, 3), 'cpu': cpu, 'memory': memory}
+    self.decisions.append(decision)
+    if self.limit != previous:
+      REGISTRY.inc('concurrency_adjustments_total', direction=direction)
+      logger.info(f"동시성 {previous} → {self.limit} ({reason})")
+    elif __debug__:
+      logger.debug(f"동시성 {self.limit} 유지 ({reason})")
+
+
+class _Limiter:
+  """한도를 바꿀 수 있는 세마포어"""
+
+  def __init__(self, limit):
+    self._limit = limit
+    self._active = 0
+    self._cond = threading.Condition()
+
+  def set_limit(self, limit):
+    with self._cond:
+      self._limit = limit
+      self._cond.notify_all()
+
+  def acquire(self):
+    with self._cond:
+      while self._active >= self._limit:
+        self._cond.wait()
+      self._active += 1
+
+  def release(self):
+    with self._cond:
+      self._active -= 1
+      self._cond.notify()
+
+
+class AdaptiveCrawlPool:
+  """
+  컨트롤러가 정한 동시성만큼 크롤러를 돌려 URL 목록을 처리합니다.
+
+  Playwright sync API 객체는 만든 스레드에서만 쓸 수 있으므로 워커 스레드마다 create_crawler()로 자기 크롤러를 만들고,
+  호출한 스레드는 이미 로그인한 primary 크롤러로 함께 처리합니다. 워커는 동시성이 올라갈 때 필요한 만큼만 띄우고,
+  한도가 줄면 남는 워커는 슬롯이 날 때까지 기다립니다.
+  """
+
+  def __init__(self, create_crawler, controller, delay=0.0):
+    """
+    Args:
+        create_crawler: 워커 스레드에서 호출해 시작된(세션이 복원된) MediumCrawler를 반환하는 함수
+        controller: AIMDController
+        delay: 워커별 페이지 사이 대기 시간 (초)
+    """
+    self.create_crawler = create_crawler
+    self.controller = controller
+    self.delay = delay
+    self._limiter = _Limiter(controller.limit)
+    self._urls = iter(())
+    self._exhausted = False
+    self._urls_lock = threading.Lock()
+    self._threads = []  # join용 (끝난 워커 포함)
+    self._live_workers = 0  # 동시성 계산용 (시작 실패하거나 끝난 워커는 빠짐)
+    self._process = None
+    self._lock = threading.Lock()
+
+  def run(self, urls, process, primary):
+    """
+    Args:
+        urls: 처리할 URL 이터러블 (필요할 때마다 하나씩 꺼내 씀)
+        process: process(crawler, url) → article_data (저장/기록까지 처리, 예외를 밖으로 던지지 않음)
+        primary: 호출한 스레드에서 쓸 크롤러 (닫지 않음)
+    """
+    self._process = process
+    self._urls = iter(urls)
+    self._grow()
+    self._work(primary)
+    while True:
+      with self._lock:
+        threads = list(self._threads)
+      for thread in threads:
+        thread.join()
+      with self._lock:
+        if len(self._threads) == len(threads):
+          break
+
+  def _grow(self):
+    """한도보다 워커가 적고 남은 URL이 있으면 워커를 더 띄웁니다 (primary 포함)."""
+    with self._lock:
+      while self._live_workers + 1 < self.controller.limit and not self._exhausted:
+        thread = threading.Thread(target=self._worker, name=f'crawl-worker-{len(self._threads) + 1}', daemon=True)
+        self._threads.append(thread)
+        self._live_workers += 1
+        thread.start()
+
+  def _next_url(self):
+    with self._urls_lock:
+      url = next(self._urls, None)
+      if url is None:
+        self._exhausted = True
+      return url
+
+  def _worker(self):
+    try:
+      while True:
+        try:
+          crawler = self.create_crawler()
+        except Exception as e:
+          logger.error(f"크롤링 워커 시작 실패: {e}")
+          return
+        try:
+          if not self._work(crawler, owned=True):
+            return
+        finally:
+          crawler.close_browser()
+        # 브라우저가 죽은 워커는 새 크롤러로 교체
+        REGISTRY.inc('crawl_retries_total', kind='browser_restart')
+    finally:
+      # 끝난 워커의 자리를 비워 이후 _grow()가 한도까지 다시 띄울 수 있게 함
+      with self._lock:
+        self._live_workers -= 1
+
+  def _work(self, crawler, owned=False):
+    """URL이 없을 때까지 처리합니다. owned 크롤러의 브라우저가 죽으면 True를 반환합니다 (재시작 필요)."""
+    first = True
+    while True:
+      if not first and self.delay:
+        time.sleep(self.delay)
+      first = False
+      self._limiter.acquire()
+      try:
+        url = self._next_url()
+        if url is None:
+          return False
+        started = time.monotonic()
+        article_data = self._process(crawler, url)
+        limit = self.controller.record(time.monotonic() - started, is_failure(article_data))
+      finally:
+        self._limiter.release()
+
+      self._limiter.set_limit(limit)
+      self._grow()
+      if owned and 'error' in article_data and not crawler.is_healthy():
+        logger.warning(f"[{threading.current_thread().name}] 브라우저 이상 감지, 다시 시작합니다.")
+        return True
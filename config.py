@@ -1,37 +1,68 @@
+import atexit
 import logging
+import os
 from datetime import datetime
-from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
 
 
-def setup_logging(debug=False):
+def load_env():
+  """.env 파일을 프로세스당 한 번만 로드합니다 (모듈마다 다시 읽지 않도록)."""
+  global _env_loaded
+  if not _env_loaded:
+    load_dotenv()
+    _env_loaded = True
+
+
+load_env()
+
+
+_listener = None
+
+
+def setup_logging(debug=False, log_format=None):
   """
   로깅 설정
 
+  로그는 큐에만 넣고(QueueHandler), 파일/콘솔 쓰기는 백그라운드 리스너 스레드가 모아서 처리하므로
+  크롤링 스레드가 디스크/콘솔 I/O를 기다리지 않습니다.
+
   Args:
       debug: 디버그 모드 활성화 여부
+      log_format: 'text' 또는 'json' (JSON lines, 기본값: LOG_FORMAT 환경 변수 또는 'text')
   """
+  # 큐/핸들러 모듈(logging.handlers, json 등)은 로깅을 설정할 때만 로드 (import config를 가볍게 유지)
+  import queue
+
+  from log_writer import (BatchedStreamHandler, BatchedTimedRotatingFileHandler, BatchingQueueListener,
+                          JsonLinesFormatter, StructuredQueueHandler)
+
+  global _listener
   log_level = logging.DEBUG if debug else logging.INFO
+  log_format = (log_format or os.getenv('LOG_FORMAT', 'text')).lower()
 
   # 로그 디렉토리 생성
   log_dir = Path('logs')
   log_dir.mkdir(exist_ok=True)
 
   # 로그 포맷 설정
-  log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+  log_format_text = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
   date_format = '%Y-%m-%d %H:%M:%S'
+  if log_format == 'json':
+    formatter = JsonLinesFormatter()
+  else:
+    formatter = logging.Formatter(log_format_text, date_format)
 
   # 로그 파일명에 날짜/시간 포함 (예: medium_crawler_2024-01-15_14-30-00.log)
   timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-  log_filename = log_dir / f'{timestamp}.log'
+  log_filename = log_dir / f"{timestamp}.{'jsonl' if log_format == 'json' else 'log'}"
 
   # 파일 핸들러 설정 (TimedRotatingFileHandler 사용)
   # 매일 자정에 rolling, 최대 30일 보관, 백업 파일명에 날짜 포함
-  file_handler = TimedRotatingFileHandler(
+  file_handler = BatchedTimedRotatingFileHandler(
       filename=str(log_filename),
       when='midnight',  # 매일 자정에 rolling
       interval=1,  # 1일마다
@@ -40,21 +71,31 @@ def setup_logging(debug=False):
       delay=False
   )
   file_handler.setLevel(log_level)
-  file_handler.setFormatter(logging.Formatter(log_format, date_format))
+  file_handler.setFormatter(formatter)
 
   # 백업 파일명에 날짜 포함하도록 suffix 설정
   file_handler.suffix = '%Y-%m-%d'
 
   # 콘솔 핸들러 설정
-  console_handler = logging.StreamHandler()
+  console_handler = BatchedStreamHandler()
   console_handler.setLevel(log_level)
-  console_handler.setFormatter(logging.Formatter(log_format, date_format))
+  console_handler.setFormatter(formatter)
 
-  # 루트 로거 설정
+  # 이전 설정이 있으면 정리 (남은 로그를 모두 쓰고 교체)
   root_logger = logging.getLogger()
+  if _listener:
+    _listener.stop()
+  for handler in list(root_logger.handlers):
+    if isinstance(handler, StructuredQueueHandler):
+      root_logger.removeHandler(handler)
+
+  # 루트 로거에는 큐 핸들러만 연결하고, 실제 쓰기는 리스너 스레드에서
+  log_queue = queue.SimpleQueue()
   root_logger.setLevel(log_level)
-  root_logger.addHandler(file_handler)
-  root_logger.addHandler(console_handler)
+  root_logger.addHandler(StructuredQueueHandler(log_queue))
+  _listener = BatchingQueueListener(log_queue, file_handler, console_handler)
+  _listener.start()
+  atexit.register(shutdown_logging)
 
   # 외부 라이브러리 로그 레벨 조정
   logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -64,6 +105,16 @@ def setup_logging(debug=False):
   return root_logger
 
 
+def shutdown_logging():
+  """큐에 남은 로그를 모두 쓰고 리스너를 멈춥니다 (종료 시 자동 호출)."""
+  global _listener
+  if _listener:
+    _listener.stop()
+    for handler in _listener.handlers:
+      handler.close()
+    _listener = None
+
+
 def get_logger(name):
   """로거 인스턴스 반환"""
   return logging.getLogger(name)
@@ -1,67 +1,312 @@
+import logging
 import os
+import re
+import threading
 import time
+from contextlib import contextmanager
 
-from dotenv import load_dotenv
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+from browser_launcher import cdp_endpoint_from_env, connect_cdp_browser
+from browser_profile import BrowserProfile
+from config import load_env
 from gmail_checker import GmailChecker
+from lazy_loader import load_lazy_content
+from metrics import REGISTRY
+from page_classifier import Outcome, classify_page, classify_url
+from selector_stats import LAYOUT_MEDIUM, SelectorStats, page_layout
+from trace_capture import TraceCapture
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 필드별 선택자 단계 (앞 단계가 기사 범위의 정확한 선택자, 뒤 단계가 페이지 전체 대체 선택자).
+# SelectorStats는 단계 안에서만 적중률 순으로 바꾸므로, 페이지 전체 선택자가 더 자주 "적중"해도 기사 범위 선택자보다 먼저 시도되지 않음
+_TITLE_SELECTORS = (
+    ['article.meteredContent h1'],
+    ['h1', '[data-testid="storyTitle"]', 'h1.pw-post-title', 'article h1'],
+)
+_AUTHOR_SELECTORS = (
+    ['article.meteredContent a[href*="/@"]',
+     'article.meteredContent [data-testid="authorName"]',
+     'article.meteredContent a[data-action="show-user-card"]'],
+    ['[data-testid="authorName"]', 'a[data-action="show-user-card"]', '.author-name', 'article a[href*="/@"]'],
+)
+_DATE_SELECTORS = (
+    ['time', '[data-testid="storyPublishDate"]', 'time[datetime]', '.published-date'],
+)
+_TAG_SELECTORS = (
+    ['article.meteredContent a[href*="/tag/"]',
+     'article.meteredContent [data-testid="tag"]',
+     'article.meteredContent .tag'],
+    ['a[href*="/tag/"]', '[data-testid="tag"]', '.tag'],
+)
+_CONTENT_SELECTORS = (
+    ['article.meteredContent p',
+     'article.meteredContent [data-testid="storyBody"] p',
+     'article.meteredContent .postArticle-content p',
+     'article.meteredContent section p'],
+)
+_IMAGE_SELECTORS = (
+    ['article.meteredContent figure img', 'article.meteredContent img'],
+    ['article img'],
+)
+# 이미지 요소들에서 (srcset의 가장 큰 후보 기준) 절대 URL과 alt를 모음 (선택자당 한 번의 evaluate)
+_IMAGES_JS = """
+(images) => {
+  const result = [];
+  const seen = new Set();
+  for (const img of images) {
+    let url = img.currentSrc || img.src;
+    const srcset = img.getAttribute('srcset')
+        || img.closest('picture')?.querySelector('source[srcset]')?.getAttribute('srcset');
+    if (srcset) {
+      let best = -1;
+      for (const candidate of srcset.split(',')) {
+        const [candidateUrl, descriptor] = candidate.trim().split(/\\s+/);
+        const width = parseInt(descriptor, 10) || 0;
+        if (candidateUrl && width >= best) {
+          best = width;
+          url = candidateUrl;
+        }
+      }
+    }
+    if (!url || url.startsWith('data:')) continue;
+    url = new URL(url, location.href).href;
+    if (seen.has(url)) continue;
+    seen.add(url);
+    result.push({url, alt: img.alt || null});
+  }
+  return result;
+}
+"""
+_COMMENT_SELECTORS = (
+    ['[data-testid="commentCount"]',
+     'button[aria-label*="response" i]',
+     'button[aria-label*="comment" i]',
+     'button:has-text("responses")',
+     'button:has-text("comments")',
+     'button:has-text("response")'],
+)
+_VIEW_SELECTORS = (
+    ['[data-testid="viewCount"]', 'span:has-text("views")', 'span:has-text("view")'],
+)
+# 본문에서 제외할 광고/구독 유도 문구
+_CONTENT_EXCLUDES = ('sign up', 'subscribe', 'follow', 'member-only')
+
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def _parse_count(text):
+  """'12 responses', '3K views' 같은 문자열의 첫 숫자 (K/M은 0을 붙여 변환)"""
+  numbers = _NUMBER_PATTERN.findall(text.replace(',', '').replace('K', '000').replace('M', '000000'))
+  return int(numbers[0]) if numbers else None
+
+
+class _StepTimer:
+  """단계별 소요 시간을 기록합니다 (time.monotonic 기준)."""
+
+  def __init__(self):
+    self.steps = []
+
+  @contextmanager
+  def step(self, name):
+    started = time.monotonic()
+    try:
+      yield
+    finally:
+      self.steps.append((name, time.monotonic() - started))
 
-load_dotenv()
+  def report(self, title):
+    lines = [f"{title}:"]
+    for name, elapsed in self.steps:
+      lines.append(f"  {name:<20} {elapsed:7.3f}s")
+    lines.append(f"  {'total':<20} {sum(elapsed for _, elapsed in self.steps):7.3f}s")
+    return '\n'.join(lines)
 
 
 class MediumCrawler:
-  def __init__(self, email=None, headless=False):
+  # 선택자 통계를 파일에 저장하는 간격 (기사 수)
+  SELECTOR_STATS_SAVE_INTERVAL = 25
+
+  def __init__(self, email=None, headless=False, gmail_checker=None, code_dispatcher=None, trace_capture=None,
+               selector_stats=None, browser_profile=None, profile_name=None, cdp_endpoint=None):
+    """
+    Args:
+        email: Medium 로그인 이메일
+        headless: 브라우저 headless 여부
+        gmail_checker: 인증 코드를 조회할 GmailChecker (기본값: 새로 생성)
+        code_dispatcher: 여러 계정이 함께 쓰는 VerificationCodeDispatcher
+                         (지정하면 계정별 폴링 대신 디스패처에서 코드를 받음)
+        trace_capture: 느린/실패한 페이지의 trace를 남길 TraceCapture
+                       (기본값: TRACE_CAPTURE=true이면 새로 생성)
+        selector_stats: 선택자 적중 통계 SelectorStats (기본값: 프로세스 공유 인스턴스)
+        browser_profile: 디스크 캐시를 유지할 BrowserProfile
+                         (기본값: BROWSER_PROFILE=true이면 새로 생성)
+        profile_name: 프로필 이름 (기본값: 이메일)
+        cdp_endpoint: 연결할 공유 브라우저의 CDP 주소 (기본값: CDP_ENDPOINT, 지정하면 browser_profile은 사용 안 함)
+    """
     self.email = email or os.getenv('MEDIUM_EMAIL')
     self.sender_email = os.getenv('SENDER_EMAIL')
     self.headless = headless
     self.browser = None
+    self.context = None
     self.page = None
-    self.gmail_checker = GmailChecker()
+    self.cdp_endpoint = cdp_endpoint or cdp_endpoint_from_env()
+    self.browser_profile = None if self.cdp_endpoint else (browser_profile or BrowserProfile.from_env())
+    self.profile_name = profile_name
+    self._profile_dir = None
+    self.code_dispatcher = code_dispatcher
+    self.gmail_checker = gmail_checker or (None if code_dispatcher else GmailChecker())
+    self.trace_capture = trace_capture or TraceCapture.from_env()
+    self.selector_stats = selector_stats or SelectorStats.shared()
+    self._layout = LAYOUT_MEDIUM
+    self._pages_since_stats_save = 0
 
     if not self.email:
       raise ValueError("이메일 주소가 제공되지 않았습니다. MEDIUM_EMAIL 환경 변수를 설정하세요.")
 
-  def start_browser(self):
-    """Playwright 브라우저 시작"""
+  def start_browser(self, storage_state=None):
+    """
+    Playwright 브라우저 시작 (browser_profile이 있으면 프로필 디렉토리를 쓰는 persistent context)
+
+    Args:
+        storage_state: 다른 크롤러의 context.storage_state() 결과 (쿠키를 복원해 로그인 없이 세션 공유)
+    """
     self.playwright = sync_playwright().start()
     # JavaScript 활성화 및 실제 브라우저처럼 보이도록 설정
     # Chromium은 기본적으로 JavaScript가 활성화되어 있지만, 명시적으로 설정
-    self.browser = self.playwright.chromium.launch(
-        headless=self.headless,
-        args=[
-            '--enable-javascript',
-            '--js-flags=--expose-gc',
-            '--disable-blink-features=AutomationControlled'  # 자동화 감지 방지
-        ]
-    )
+    args = [
+        '--enable-javascript',
+        '--js-flags=--expose-gc',
+        '--disable-blink-features=AutomationControlled'  # 자동화 감지 방지
+    ]
     # 실제 브라우저처럼 보이도록 최신 Chrome User-Agent 사용
-    self.context = self.browser.new_context(
+    context_options = dict(
         viewport={'width': 1920, 'height': 1080},
         user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
         locale='en-US',
         timezone_id='America/New_York',
         permissions=['geolocation', 'notifications']
     )
-    self.page = self.context.new_page()
+    if self.cdp_endpoint:
+      # 이미 떠 있는 공유 브라우저에 연결해 이 프로세스 전용 컨텍스트만 만듦 (close는 연결만 끊음)
+      self.browser = connect_cdp_browser(self.playwright, self.cdp_endpoint)
+      self.context = self.browser.new_context(**context_options)
+      self.page = self.context.new_page()
+    elif self.browser_profile:
+      # 디스크 캐시/코드 캐시를 실행 간에 유지 (persistent context에는 별도 Browser 객체가 없음)
+      self._profile_dir = self.browser_profile.acquire(self.profile_name or self.email)
+      try:
+        self.context = self.playwright.chromium.launch_persistent_context(
+            str(self._profile_dir), headless=self.headless, args=args + self.browser_profile.launch_args(),
+            **context_options)
+      except Exception:
+        self.browser_profile.release(self._profile_dir)
+        self._profile_dir = None
+        raise
+      self._context_closed = False
+      self.context.on('close', lambda _: setattr(self, '_context_closed', True))
+      self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+    else:
+      self.browser = self.playwright.chromium.launch(headless=self.headless, args=args)
+      self.context = self.browser.new_context(**context_options)
+      self.page = self.context.new_page()
+    if storage_state:
+      self.context.add_cookies(storage_state.get('cookies', []))
+    self._page_crashed = False
+    self.page.on('crash', lambda _: setattr(self, '_page_crashed', True))
+    self.context.on('response', self._count_response_bytes)
+    if self.trace_capture:
+      self.trace_capture.attach(self.context)
 
     # JavaScript가 활성화되어 있는지 확인
     try:
       js_enabled = self.page.evaluate(
           '() => typeof window !== "undefined" && typeof document !== "undefined" && typeof window.navigator !== "undefined"')
       if js_enabled:
-        print("✓ JavaScript 활성화 확인됨")
+        logger.debug("JavaScript 활성화 확인됨")
       else:
-        print("경고: JavaScript가 활성화되지 않은 것 같습니다.")
+        logger.warning("JavaScript가 활성화되지 않은 것 같습니다.")
     except Exception as e:
-      print(f"경고: JavaScript 확인 중 오류: {e}")
+      logger.warning(f"JavaScript 확인 중 오류: {e}")
 
   def close_browser(self):
-    """브라우저 종료"""
+    """브라우저 종료 (이미 죽은 브라우저여도 예외 없이 정리)"""
+    self._save_selector_stats()
+    if self.trace_capture:
+      self.trace_capture.detach()
+    if self.cdp_endpoint and self.context:
+      # 공유 브라우저에서는 자기 컨텍스트만 정리
+      try:
+        self.context.close()
+      except Exception as e:
+        logger.warning(f"브라우저 컨텍스트 종료 중 오류: {e}")
     if self.browser:
-      self.browser.close()
+      try:
+        self.browser.close()
+      except Exception as e:
+        logger.warning(f"브라우저 종료 중 오류: {e}")
+    elif self._profile_dir and self.context:
+      try:
+        self.context.close()
+      except Exception as e:
+        logger.warning(f"브라우저 종료 중 오류: {e}")
     if hasattr(self, 'playwright'):
-      self.playwright.stop()
+      try:
+        self.playwright.stop()
+      except Exception as e:
+        logger.warning(f"Playwright 종료 중 오류: {e}")
+    if self._profile_dir:
+      # 브라우저가 완전히 닫힌 뒤에 프로필 용량 정리/템플릿 갱신
+      self.browser_profile.release(self._profile_dir)
+      self._profile_dir = None
+    self.browser = None
+    self.context = None
+    self.page = None
+    self._page_crashed = False
+
+  def restart_browser(self, storage_state=None):
+    """
+    브라우저를 다시 시작하고 로그인 쿠키를 복원합니다 (공유 브라우저면 다시 연결, 예: --launch-browser가 Chromium을 다시 띄운 경우).
+
+    Args:
+        storage_state: 복원할 세션 (기본값: 닫기 전 현재 컨텍스트에서 가져옴, 브라우저가 이미 죽었으면 쿠키 없이 시작)
+    """
+    if storage_state is None and self.context:
+      try:
+        storage_state = self.context.storage_state()
+      except Exception as e:
+        logger.warning(f"세션 쿠키를 가져올 수 없습니다: {e}")
+    self.close_browser()
+    self.start_browser(storage_state=storage_state)
+    REGISTRY.inc('crawl_retries_total', kind='browser_restart')
+
+  @staticmethod
+  def _count_response_bytes(response):
+    """응답 크기를 지표로 누적합니다 (Content-Length가 없는 응답은 제외)."""
+    length = response.headers.get('content-length')
+    if length and length.isdigit():
+      REGISTRY.inc('crawl_bytes_total', int(length))
+
+  def _save_selector_stats(self):
+    try:
+      self.selector_stats.save()
+    except OSError as e:
+      logger.warning(f"선택자 통계 저장 실패: {e}")
+    self._pages_since_stats_save = 0
+
+  def is_healthy(self):
+    """브라우저와 페이지가 살아 있는지 확인합니다 (서비스 모드에서 재시작 판단용)."""
+    if not self.page:
+      return False
+    if self._profile_dir:
+      connected = not self._context_closed
+    else:
+      connected = bool(self.browser) and self.browser.is_connected()
+    return connected and not self.page.is_closed() and not self._page_crashed
 
   def _robust_click(self, locator, description="", timeout=10000, click_type='auto'):
     """
@@ -88,77 +333,68 @@ def _robust_click(self, locator, description="", timeout=10000, click_type='auto
 
       # 스크롤하여 보이도록 함
       locator.scroll_into_view_if_needed()
-      time.sleep(0.3)
 
       # 특정 클릭 타입이 지정된 경우 해당 방법만 시도
       if click_type == 'js':
         locator.evaluate('element => { element.scrollIntoView(); element.click(); }')
-        print(f"✓ {description} 클릭 성공 (JavaScript 클릭)")
-        time.sleep(0.5)
+        logger.debug(f"{description} 클릭 성공 (JavaScript 클릭)")
         return True
       elif click_type == 'coordinate':
         box = locator.bounding_box()
         if box:
           self.page.mouse.click(box['x'] + box['width'] / 2, box['y'] + box['height'] / 2)
-          print(f"✓ {description} 클릭 성공 (좌표 클릭)")
-          time.sleep(0.5)
+          logger.debug(f"{description} 클릭 성공 (좌표 클릭)")
           return True
         else:
           raise Exception("요소의 bounding box를 가져올 수 없습니다.")
       elif click_type == 'force':
         locator.click(force=True, timeout=3000)
-        print(f"✓ {description} 클릭 성공 (force 클릭)")
-        time.sleep(0.5)
+        logger.debug(f"{description} 클릭 성공 (force 클릭)")
         return True
       elif click_type == 'normal':
         locator.click(timeout=3000)
-        print(f"✓ {description} 클릭 성공 (일반 클릭)")
-        time.sleep(0.5)
+        logger.debug(f"{description} 클릭 성공 (일반 클릭)")
         return True
 
       # 'auto' 모드: 모든 방법을 순차적으로 시도 (일반 클릭은 건너뛰고 시작)
       # 방법 1: JavaScript로 직접 클릭 (일반 클릭이 실패하므로 먼저 시도)
       try:
         locator.evaluate('element => { element.scrollIntoView(); element.click(); }')
-        print(f"✓ {description} 클릭 성공 (JavaScript 클릭)")
-        time.sleep(0.5)
+        logger.debug(f"{description} 클릭 성공 (JavaScript 클릭)")
         return True
       except Exception as e1:
-        print(f"  JavaScript 클릭 실패: {e1}, 좌표 클릭 시도...")
+        logger.debug(f"JavaScript 클릭 실패: {e1}, 좌표 클릭 시도...")
 
         # 방법 2: 좌표로 클릭
         try:
           box = locator.bounding_box()
           if box:
             self.page.mouse.click(box['x'] + box['width'] / 2, box['y'] + box['height'] / 2)
-            print(f"✓ {description} 클릭 성공 (좌표 클릭)")
-            time.sleep(0.5)
+            logger.debug(f"{description} 클릭 성공 (좌표 클릭)")
             return True
           else:
             raise Exception("요소의 bounding box를 가져올 수 없습니다.")
         except Exception as e2:
-          print(f"  좌표 클릭 실패: {e2}, force 클릭 시도...")
+          logger.debug(f"좌표 클릭 실패: {e2}, force 클릭 시도...")
 
           # 방법 3: force 옵션으로 클릭
           try:
             locator.click(force=True, timeout=3000)
-            print(f"✓ {description} 클릭 성공 (force 클릭)")
-            time.sleep(0.5)
+            logger.debug(f"{description} 클릭 성공 (force 클릭)")
             return True
           except Exception as e3:
-            print(f"  force 클릭 실패: {e3}, 일반 클릭 시도...")
+            logger.debug(f"force 클릭 실패: {e3}, 일반 클릭 시도...")
 
             # 방법 4: 일반 클릭 (마지막 시도)
             try:
               locator.click(timeout=3000)
-              print(f"✓ {description} 클릭 성공 (일반 클릭)")
-              time.sleep(0.5)
+              logger.debug(f"{description} 클릭 성공 (일반 클릭)")
               return True
             except Exception as e4:
-              print(f"  모든 클릭 방법 실패: {e4}")
+              logger.warning(f"모든 클릭 방법 실패: {e4}")
               return False
     except Exception as e:
-      print(f"  {description} 클릭 중 오류: {e}")
+      logger.warning(f"{description} 클릭 중 오류: {e}")
       return False
 
   def _wait_and_click(self, selectors, timeout=10000, description=""):
@@ -181,14 +417,46 @@ def _wait_and_click(self, selectors, timeout=10000, description=""):
       except PlaywrightTimeoutError:
         continue
       except Exception as e:
-        print(f"  선택자 {selector} 시도 중 오류: {e}")
+        logger.debug(f"선택자 {selector} 시도 중 오류: {e}")
         continue
     return False
 
+  def _is_authenticated(self):
+    """
+    세션 쿠키로 로그인 여부를 확인합니다.
+
+    로그인된 Medium 세션은 `sid` 쿠키를 가지며, `uid`가 비로그인용 `lo_` 접두사가 아닙니다.
+    """
+    cookies = {c['name']: c['value'] for c in self.context.cookies('https://medium.com')}
+    return bool(cookies.get('sid')) and bool(cookies.get('uid')) and not cookies['uid'].startswith('lo_')
+
+  def _wait_for_session(self, timeout=30000):
+    """
+    세션 쿠키가 생길 때까지 대기합니다.
+
+    쿠키는 응답으로만 설정되므로 고정 대기 대신 요청이 끝날 때마다 확인합니다.
+
+    Returns:
+        로그인 여부
+    """
+    deadline = time.monotonic() + timeout / 1000
+    while not self._is_authenticated():
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        return False
+      try:
+        self.context.wait_for_event('requestfinished', timeout=remaining * 1000)
+      except PlaywrightTimeoutError:
+        return self._is_authenticated()
+    return True
+
   def login(self, max_retries=3):
     """
     Medium에 로그인합니다.
 
+    고정 대기 없이 요소 상태와 네트워크 이벤트를 기다리며, 로그인 성공 여부는 세션 쿠키로 판단합니다.
+    단계별 소요 시간은 `self.login_timings`에 기록됩니다.
+
     Args:
         max_retries: 최대 재시도 횟수
 
@@ -198,171 +466,114 @@ def login(self, max_retries=3):
     if not self.page:
       self.start_browser()
 
+    timer = _StepTimer()
+    self.login_timings = timer.steps
+
     try:
-      # Medium 로그인 페이지로 이동
-      print("Medium 로그인 페이지로 이동 중...")
-      self.page.goto('https://medium.com', wait_until='load', timeout=30000)
-      time.sleep(1)
+      # Medium 로그인 페이지로 이동 (이후 단계는 요소가 나타날 때까지 자동 대기하므로 DOM 준비까지만 대기)
+      logger.info("Medium 로그인 페이지로 이동 중...")
+      with timer.step('navigate'):
+        self.page.goto('https://medium.com', wait_until='domcontentloaded', timeout=30000)
+
+      if self._is_authenticated():
+        logger.info("이미 로그인된 세션입니다.")
+        return True
 
       # 'Sign in' 링크 클릭 (a 태그) - JavaScript 클릭 사용
-      print("'Sign in' 링크 찾는 중...")
-      sign_in_link = self.page.locator('a:has-text("Sign in")').first
-      try:
+      logger.info("'Sign in' 링크 찾는 중...")
+      with timer.step('sign_in_link'):
+        sign_in_link = self.page.locator('a:has-text("Sign in")').first
         if not self._robust_click(sign_in_link, "'Sign in' 링크", click_type='js'):
           self.page.screenshot(path='debug_sign_in_link_not_found.png')
           raise Exception("'Sign in' 링크를 클릭할 수 없습니다. 스크린샷: debug_sign_in_link_not_found.png")
-        time.sleep(1)
-      except PlaywrightTimeoutError:
-        self.page.screenshot(path='debug_sign_in_link_not_found.png')
-        raise Exception("'Sign in' 링크를 찾을 수 없습니다. 스크린샷: debug_sign_in_link_not_found.png")
 
       # 'Sign in with email' 버튼 찾기 (button 요소 중 하위에 'Sign in with email' 텍스트가 있는 것) - JavaScript 클릭 사용
-      print("'Sign in with email' 버튼 찾는 중...")
-      email_button = self.page.locator('button:has-text("Sign in with email")').first
-      try:
+      logger.info("'Sign in with email' 버튼 찾는 중...")
+      with timer.step('email_button'):
+        email_button = self.page.locator('button:has-text("Sign in with email")').first
         if not self._robust_click(email_button, "'Sign in with email' 버튼", click_type='js'):
           self.page.screenshot(path='debug_email_button_not_found.png')
           raise Exception(
               "'Sign in with email' 버튼을 클릭할 수 없습니다. 스크린샷: debug_email_button_not_found.png")
-        time.sleep(1)
-      except PlaywrightTimeoutError:
-        self.page.screenshot(path='debug_email_button_not_found.png')
-        raise Exception(
-            "'Sign in with email' 버튼을 찾을 수 없습니다. 스크린샷: debug_email_button_not_found.png")
 
       # 이메일 입력 필드 찾기 (placeholder가 'Enter your email address'인 input)
-      print("이메일 입력 필드 찾는 중...")
-      email_input = self.page.locator('input[placeholder="Enter your email address"]').first
-      try:
-        email_input.wait_for(state='visible', timeout=10000)
-        email_input.scroll_into_view_if_needed()
-        time.sleep(0.5)
-      except PlaywrightTimeoutError:
-        self.page.screenshot(path='debug_email_input_not_found.png')
-        raise Exception("이메일 입력 필드를 찾을 수 없습니다. 스크린샷: debug_email_input_not_found.png")
-
-      # 이메일 입력
-      print(f"이메일 입력 중: {self.email}")
-      email_input.click()
-      email_input.fill('')  # 기존 내용 지우기
-      email_input.fill(self.email)
-      time.sleep(0.5)
-
-      # Continue 버튼 찾기 및 클릭
-      print("Continue 버튼 찾는 중...")
-      continue_button = self.page.locator('button:has-text("Continue")').first
-      try:
-        # 버튼이 비활성화되어 있지 않은지 확인
+      logger.info(f"이메일 입력 중: {self.email}")
+      with timer.step('email_input'):
+        email_input = self.page.locator('input[placeholder="Enter your email address"]').first
         try:
-          is_disabled = continue_button.get_attribute('disabled')
-          if is_disabled:
-            print("버튼이 비활성화되어 있습니다. 활성화될 때까지 대기...")
-            # 버튼이 활성화될 때까지 최대 5초 대기
-            for _ in range(10):
-              time.sleep(0.5)
-              is_disabled = continue_button.get_attribute('disabled')
-              if not is_disabled:
-                break
-        except Exception as e:
-          print(f"버튼 비활성화 확인 중 오류: {e}")
-          pass  # disabled 속성이 없을 수도 있음
-
+          email_input.wait_for(state='visible', timeout=10000)
+        except PlaywrightTimeoutError:
+          self.page.screenshot(path='debug_email_input_not_found.png')
+          raise Exception("이메일 입력 필드를 찾을 수 없습니다. 스크린샷: debug_email_input_not_found.png")
+        # fill()은 기존 내용을 지우고 입력 이벤트를 발생시킴
+        email_input.fill(self.email)
+
+      # Continue 버튼 클릭 (:enabled 선택자로 버튼이 활성화될 때까지 대기)
+      logger.info("Continue 버튼 찾는 중...")
+      with timer.step('continue'):
+        continue_button = self.page.locator('button:has-text("Continue"):enabled').first
+        # 이 시각 이후에 도착한 인증 메일만 이번 로그인의 코드로 인정
+        code_requested_at = time.time()
         if not self._robust_click(continue_button, "Continue 버튼", click_type='auto'):
           self.page.screenshot(path='debug_continue_button_not_found.png')
           raise Exception("Continue 버튼을 클릭할 수 없습니다. 스크린샷: debug_continue_button_not_found.png")
 
-        time.sleep(2)
-
-      except PlaywrightTimeoutError:
-        self.page.screenshot(path='debug_continue_button_not_found.png')
-        raise Exception("Continue 버튼을 찾을 수 없습니다. 스크린샷: debug_continue_button_not_found.png")
-
       # 인증 코드 입력 대기 및 코드 가져오기
-      print("Gmail에서 인증 코드 가져오는 중...")
-      code = self.gmail_checker.get_medium_verification_code(
-          self.email, self.sender_email, max_retries=5, retry_interval=5)
+      logger.info("Gmail에서 인증 코드 가져오는 중...")
+      with timer.step('verification_code'):
+        if self.code_dispatcher:
+          code = self.code_dispatcher.wait_for_code(self.email, since=code_requested_at, timeout=60)
+        else:
+          code = self.gmail_checker.get_medium_verification_code(
+              self.email, self.sender_email, max_retries=5, retry_interval=5)
 
       if not code:
         raise Exception("인증 코드를 받을 수 없습니다. 이메일을 확인하세요.")
 
-      print(f"인증 코드 받음: {code}")
-
-      # 인증 코드 입력 필드 대기 (6개의 입력 필드)
-      print("인증 코드 입력 필드 대기 중...")
-      code_input_selector = 'input[inputmode="numeric"]'
-
-      # 6개의 입력 필드가 모두 나타날 때까지 대기
-      code_inputs = self.page.locator(code_input_selector)
-      try:
-        code_inputs.first.wait_for(state='visible', timeout=10000)
-        time.sleep(0.5)
-      except PlaywrightTimeoutError:
-        self.page.screenshot(path='debug_code_input_not_found.png')
-        raise Exception("인증 코드 입력 필드를 찾을 수 없습니다. 스크린샷: debug_code_input_not_found.png")
-
-      # 입력 필드 개수 확인
-      input_count = code_inputs.count()
-      print(f"  입력 필드 {input_count}개 발견")
-
-      if input_count < len(code):
-        print(f"  경고: 입력 필드 수({input_count})가 코드 길이({len(code)})보다 적습니다.")
-
-      # 각 입력 필드에 코드의 각 자리를 하나씩 입력
-      print(f"인증 코드 입력 중: {code}")
-      for i, digit in enumerate(code):
-        if i >= input_count:
-          print(f"  경고: 입력 필드가 부족합니다. ({i+1}번째 자리 입력 불가)")
-          break
+      logger.debug(f"인증 코드 받음: {code}")
 
+      # 인증 코드 입력 필드 대기 (자리별 입력 필드)
+      with timer.step('code_input'):
+        code_inputs = self.page.locator('input[inputmode="numeric"]')
         try:
-          input_field = code_inputs.nth(i)
-          input_field.scroll_into_view_if_needed()
-          time.sleep(0.1)
-          input_field.click()
-          time.sleep(0.1)
-          input_field.fill(digit)
-          time.sleep(0.1)
-          print(f"  {i+1}번째 자리 입력: {digit}")
-        except Exception as e:
-          print(f"  {i+1}번째 자리 입력 실패: {e}")
-          # 다음 필드로 자동 이동할 수 있으므로 계속 진행
-          continue
-
-      time.sleep(0.5)
-
-      # Submit 또는 Continue 버튼 클릭
-      print("인증 코드 제출 중...")
-      submit_selectors = [
-          'button:has-text("Continue")',
-          'button:has-text("Submit")',
-          'button:has-text("Verify")',
-          'button[type="submit"]',
-          'button[aria-label*="Continue" i]',
-          'button[aria-label*="Verify" i]'
-      ]
-
-      if not self._wait_and_click(submit_selectors, timeout=1000, description="Submit 버튼"):
-        print("Submit 버튼을 찾을 수 없습니다. Enter 키로 제출했을 수 있습니다.")
-
-      # 로그인 완료 대기
-      print("로그인 완료 대기 중...")
-      time.sleep(5)
-
-      # 로그인 성공 확인 (URL 변경 또는 특정 요소 확인)
-      current_url = self.page.url
-      if 'signin' not in current_url.lower() or self.page.locator('text=Home').count() > 0:
-        print("로그인 성공!")
-        return True
+          code_inputs.first.wait_for(state='visible', timeout=10000)
+        except PlaywrightTimeoutError:
+          self.page.screenshot(path='debug_code_input_not_found.png')
+          raise Exception("인증 코드 입력 필드를 찾을 수 없습니다. 스크린샷: debug_code_input_not_found.png")
+
+        # 첫 칸에 포커스 후 한 번에 입력 (입력 필드가 다음 칸으로 포커스를 자동 이동)
+        logger.debug(f"인증 코드 입력 중: {code}")
+        code_inputs.first.click()
+        self.page.keyboard.type(code)
+
+      # 코드가 모두 입력되면 보통 자동 제출됨. 세션이 곧바로 생기지 않으면 제출 버튼 클릭
+      logger.info("로그인 완료 대기 중...")
+      with timer.step('session'):
+        if not self._wait_for_session(timeout=3000):
+          submit_selectors = [
+              'button:has-text("Continue"):enabled',
+              'button:has-text("Submit"):enabled',
+              'button:has-text("Verify"):enabled',
+              'button[type="submit"]:enabled'
+          ]
+          if not self._wait_and_click(submit_selectors, timeout=1000, description="Submit 버튼"):
+            logger.warning("Submit 버튼을 찾을 수 없습니다. 자동 제출을 기다립니다.")
+        logged_in = self._wait_for_session(timeout=30000)
+
+      if logged_in:
+        logger.info("로그인 성공!")
       else:
-        print("로그인 상태 확인 중...")
-        # 추가 대기 후 재확인
-        time.sleep(1)
-        return 'signin' not in self.page.url.lower()
+        self.page.screenshot(path='debug_login_session_not_found.png')
+        logger.error("로그인 실패: 세션 쿠키가 설정되지 않았습니다. 스크린샷: debug_login_session_not_found.png")
+      return logged_in
 
     except Exception as e:
-      print(f"로그인 중 오류 발생: {e}")
+      logger.error(f"로그인 중 오류 발생: {e}")
       return False
 
+    finally:
+      logger.info(timer.report("로그인 단계별 소요 시간"))
+
   def crawl_article(self, url):
     """
     단일 Medium 기사를 크롤링합니다.
@@ -376,350 +587,207 @@ def crawl_article(self, url):
     if not self.page:
       raise Exception("브라우저가 시작되지 않았습니다. 먼저 login()을 호출하세요.")
 
+    started = time.monotonic()
+    article_data = None
+    if self.trace_capture:
+      self.trace_capture.begin(url)
     try:
-      print(f"기사 크롤링 중: {url}")
+      if __debug__:
+        logger.debug(f"기사 크롤링 중: {url}")
+      # post ID가 없는 URL은 이동하지 않고 바로 종료
+      classified = classify_url(url)
+      if classified:
+        article_data = self._classified_result(url, *classified)
+        return article_data
+
       # load를 사용하여 기본 페이지 로드 완료 대기
-      self.page.goto(url, wait_until='load', timeout=60000)
-      time.sleep(3)  # 초기 렌더링 대기
+      with REGISTRY.timer(stage='goto'):
+        response = self.page.goto(url, wait_until='load', timeout=60000)
+
+      # 404, 삭제, 멤버 전용, 로그인 리다이렉트 등은 본문 대기/스크롤 없이 바로 종료
+      with REGISTRY.timer(stage='classify'):
+        outcome, detail = classify_page(self.page, response, url)
+      if outcome is not Outcome.OK:
+        article_data = self._classified_result(url, outcome, detail)
+        return article_data
 
       # article.meteredContent가 나타날 때까지 대기
-      print("  article.meteredContent 로드 대기 중...")
-      try:
-        self.page.wait_for_selector('article.meteredContent', state='visible', timeout=15000)
-        print("  ✓ article.meteredContent 로드 완료")
-      except PlaywrightTimeoutError:
-        print("  경고: article.meteredContent를 찾을 수 없습니다. 일반 article로 진행...")
+      if __debug__:
+        logger.debug("article.meteredContent 로드 대기 중...")
+      with REGISTRY.timer(stage='metered_content'):
+        try:
+          self.page.wait_for_selector('article.meteredContent', state='visible', timeout=15000)
+          if __debug__:
+            logger.debug("article.meteredContent 로드 완료")
+        except PlaywrightTimeoutError:
+          REGISTRY.inc('selector_fallbacks_total', field='article')
+          logger.warning("article.meteredContent를 찾을 수 없습니다. 일반 article로 진행...")
 
       # 페이지가 완전히 로드될 때까지 대기
-      self.page.wait_for_load_state('networkidle', timeout=10000)
-      time.sleep(2)
-
-      # 여러 번 스크롤하여 모든 동적 콘텐츠 로드
-      for i in range(3):
-        self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(1)
-
-      # 천천히 위로 스크롤하여 모든 콘텐츠가 렌더링되도록 함
-      self.page.evaluate("""
-        (() => {
-          const scrollHeight = document.body.scrollHeight;
-          const scrollStep = scrollHeight / 10;
-          let currentPos = scrollHeight;
-          const scrollInterval = setInterval(() => {
-            currentPos -= scrollStep;
-            window.scrollTo(0, currentPos);
-            if (currentPos <= 0) {
-              clearInterval(scrollInterval);
-              window.scrollTo(0, 0);
-            }
-          }, 100);
-        })();
-      """)
-      time.sleep(2)
-
-      # 다시 맨 위로
-      self.page.evaluate("window.scrollTo(0, 0)")
-      time.sleep(1)
-
-      article_data = {
-          'url': url,
-          'title': self._extract_title(),
-          'author': self._extract_author(),
-          'published_date': self._extract_published_date(),
-          'tags': self._extract_tags(),
-          'content': self._extract_content(),
-          'metadata': self._extract_metadata()
-      }
-
+      with REGISTRY.timer(stage='networkidle'):
+        self.page.wait_for_load_state('networkidle', timeout=10000)
+
+      # 기사 길이만큼 스크롤하며 지연 로딩 콘텐츠를 불러옴 (DOM이 멈추면 종료)
+      with REGISTRY.timer(stage='scroll'):
+        load_lazy_content(self.page)
+
+      # 커스텀 도메인 퍼블리케이션은 DOM 구조가 달라 선택자 통계를 따로 관리
+      self._layout = page_layout(self.page.url)
+      article_data = {'url': url}
+      for field, extract in (('title', self._extract_title),
+                             ('author', self._extract_author),
+                             ('published_date', self._extract_published_date),
+                             ('tags', self._extract_tags),
+                             ('content', self._extract_content),
+                             ('images', self._extract_images),
+                             ('metadata', self._extract_metadata)):
+        with REGISTRY.timer(stage=f'extract_{field}'):
+          article_data[field] = extract()
+
+      article_data['outcome'] = Outcome.OK.value
+      REGISTRY.inc('crawl_articles_total', result='ok')
       return article_data
 
     except Exception as e:
-      print(f"기사 크롤링 중 오류 발생 ({url}): {e}")
-      return {
+      REGISTRY.inc('crawl_articles_total', result='error')
+      logger.error(f"기사 크롤링 중 오류 발생 ({url}): {e}")
+      article_data = {
           'url': url,
+          'outcome': Outcome.ERROR.value,
           'error': str(e)
       }
+      return article_data
+    finally:
+      REGISTRY.observe('crawl_stage_seconds', time.monotonic() - started, stage='article_total')
+      if self.trace_capture and article_data is not None:
+        self.trace_capture.end(article_data)
+      self._pages_since_stats_save += 1
+      if self._pages_since_stats_save >= self.SELECTOR_STATS_SAVE_INTERVAL:
+        self._save_selector_stats()
+
+  def _classified_result(self, url, outcome, detail):
+    """분류 단계에서 중단한 기사의 결과 (error 키가 있어 기존 실패 처리 경로를 그대로 탐)"""
+    REGISTRY.inc('crawl_articles_total', result=outcome.value)
+    logger.warning(f"기사 크롤링 건너뜀 [{outcome.value}] ({url}): {detail}")
+    return {
+        'url': url,
+        'outcome': outcome.value,
+        'error': detail
+    }
+
+  def _first_hit(self, field, tiers, extract):
+    """
+    선택자를 단계 순서대로, 단계 안에서는 적중률 순으로 시도해 처음으로 값을 얻은 결과를 반환합니다.
 
-  def _extract_title(self):
-    """제목 추출"""
-    # article.meteredContent 내에서 제목 찾기
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        h1 = article.query_selector('h1')
-        if h1:
-          return h1.inner_text().strip()
-    except Exception as e:
-      print(f"제목 추출 중 오류: {e}")
-      pass
-
-    # 대체 방법
-    selectors = [
-        'article.meteredContent h1',
-        'h1',
-        '[data-testid="storyTitle"]',
-        'h1.pw-post-title',
-        'article h1'
-    ]
+    Args:
+        field: 필드 이름 (선택자 통계 키)
+        tiers: 선택자 단계 목록 (첫 단계의 첫 선택자가 기본 경로, 뒤 단계일수록 범위가 넓은 대체 선택자)
+        extract: 선택자를 받아 값을 반환하는 함수 (못 찾으면 None 또는 빈 값)
 
-    for selector in selectors:
+    Returns:
+        추출한 값, 모든 선택자가 실패하면 None
+    """
+    for selector in self.selector_stats.order(field, self._layout, tiers):
       try:
-        element = self.page.query_selector(selector)
-        if element:
-          return element.inner_text().strip()
+        value = extract(selector)
       except Exception as e:
-        print(f"제목 추출 중 오류: {e}")
-        continue
-
+        if __debug__:
+          logger.debug(f"{field} 추출 중 오류 ({selector}): {e}")
+        value = None
+      found = value not in (None, '', [])
+      self.selector_stats.record(field, self._layout, selector, found)
+      if found:
+        if selector != tiers[0][0]:
+          REGISTRY.inc('selector_fallbacks_total', field=field)
+        return value
     return None
 
-  def _extract_author(self):
-    """작성자 추출"""
-    # article.meteredContent 내에서 작성자 찾기
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        author_link = article.query_selector('a[href*="/@"]')
-        if author_link:
-          return author_link.inner_text().strip()
-    except Exception as e:
-      print(f"작성자 추출 중 오류: {e}")
-      pass
+  def _text_of(self, selector):
+    element = self.page.query_selector(selector)
+    return element.inner_text().strip() if element else None
 
-    # 대체 방법
-    selectors = [
-        'article.meteredContent [data-testid="authorName"]',
-        'article.meteredContent a[data-action="show-user-card"]',
-        '[data-testid="authorName"]',
-        'a[data-action="show-user-card"]',
-        '.author-name',
-        'article a[href*="/@"]'
-    ]
-
-    for selector in selectors:
-      try:
-        element = self.page.query_selector(selector)
-        if element:
-          return element.inner_text().strip()
-      except Exception as e:
-        print(f"작성자 추출 중 오류: {e}")
-        continue
+  def _extract_title(self):
+    """제목 추출"""
+    return self._first_hit('title', _TITLE_SELECTORS, self._text_of)
 
-    return None
+  def _extract_author(self):
+    """작성자 추출"""
+    return self._first_hit('author', _AUTHOR_SELECTORS, self._text_of)
 
   def _extract_published_date(self):
     """발행일 추출"""
-    selectors = [
-        'time',
-        '[data-testid="storyPublishDate"]',
-        'time[datetime]',
-        '.published-date'
-    ]
+    def _date(selector):
+      element = self.page.query_selector(selector)
+      if element:
+        return element.get_attribute('datetime') or element.inner_text().strip()
+      return None
 
-    for selector in selectors:
-      try:
-        element = self.page.query_selector(selector)
-        if element:
-          date_text = element.inner_text().strip()
-          datetime_attr = element.get_attribute('datetime')
-          return datetime_attr or date_text
-      except Exception as e:
-        print(f"발행일 추출 중 오류: {e}")
-        continue
-
-    return None
+    return self._first_hit('published_date', _DATE_SELECTORS, _date)
 
   def _extract_tags(self):
-    """태그 추출 - article.meteredContent 내에서만"""
-    tags = []
-
-    # article.meteredContent 내에서 태그 찾기
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        tag_links = article.query_selector_all('a[href*="/tag/"]')
-        for link in tag_links:
-          tag_text = link.inner_text().strip()
-          if tag_text and tag_text not in tags:
-            tags.append(tag_text)
-    except Exception as e:
-      print(f"태그 추출 중 오류: {e}")
-      pass
-
-    if tags:
+    """태그 추출 - article.meteredContent 내에서 우선"""
+    def _tags(selector):
+      tags = []
+      for element in self.page.query_selector_all(selector):
+        tag_text = element.inner_text().strip()
+        if tag_text and tag_text not in tags:
+          tags.append(tag_text)
       return tags
 
-    # 대체 방법
-    selectors = [
-        'article.meteredContent [data-testid="tag"]',
-        'article.meteredContent .tag',
-        'a[href*="/tag/"]',
-        '[data-testid="tag"]',
-        '.tag'
-    ]
-
-    for selector in selectors:
-      try:
-        elements = self.page.query_selector_all(selector)
-        for element in elements:
-          tag_text = element.inner_text().strip()
-          if tag_text and tag_text not in tags:
-            tags.append(tag_text)
-        if tags:
-          break
-      except Exception as e:
-        print(f"태그 추출 중 오류: {e}")
-        continue
-
-    return tags
+    return self._first_hit('tags', _TAG_SELECTORS, _tags) or []
 
   def _extract_content(self):
     """본문 내용 추출 - article.meteredContent만 수집"""
-    content_parts = []
-
-    # 방법 1: article.meteredContent 내의 모든 p 태그 수집 (가장 정확)
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        # article.meteredContent 내의 모든 p 태그
-        paragraphs = article.query_selector_all('p')
-        seen_texts = set()  # 중복 제거
-
-        for p in paragraphs:
-          text = p.inner_text().strip()
-          # 너무 짧은 텍스트나 중복 제외
-          if text and len(text) > 10 and text not in seen_texts:
-            # 광고나 관련 기사 추천 등 제외
-            if not any(exclude in text.lower() for exclude in ['sign up', 'subscribe', 'follow', 'member-only']):
-              content_parts.append(text)
-              seen_texts.add(text)
-    except Exception as e:
-      print(f"  단락 수집 중 오류: {e}")
-
-    if content_parts:
-      return '\n\n'.join(content_parts)
-
-    # 방법 2: article.meteredContent 내의 storyBody에서 추출
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        story_body = article.query_selector('[data-testid="storyBody"]')
-        if story_body:
-          paragraphs = story_body.query_selector_all('p')
-          for p in paragraphs:
-            text = p.inner_text().strip()
-            if text and len(text) > 10:
-              content_parts.append(text)
-          if content_parts:
-            return '\n\n'.join(content_parts)
-    except Exception as e:
-      print(f"본문 내용 추출 중 오류: {e}")
-      pass
+    def _paragraphs(selector):
+      content_parts = []
+      seen_texts = set()  # 중복 제거
+      for p in self.page.query_selector_all(selector):
+        text = p.inner_text().strip()
+        # 너무 짧은 텍스트 제외
+        if not text or len(text) <= 10:
+          continue
+        if selector == _CONTENT_SELECTORS[0][0]:
+          # article 전체의 p를 모으는 경우: 중복과 광고/관련 기사 추천 등 제외
+          if text in seen_texts or any(exclude in text.lower() for exclude in _CONTENT_EXCLUDES):
+            continue
+          seen_texts.add(text)
+        content_parts.append(text)
+      return '\n\n'.join(content_parts) if content_parts else None
 
-    # 방법 3: article.meteredContent 내의 postArticle-content에서 추출
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        post_content = article.query_selector('.postArticle-content')
-        if post_content:
-          paragraphs = post_content.query_selector_all('p')
-          for p in paragraphs:
-            text = p.inner_text().strip()
-            if text and len(text) > 10:
-              content_parts.append(text)
-          if content_parts:
-            return '\n\n'.join(content_parts)
-    except Exception as e:
-      print(f"본문 내용 추출 중 오류: {e}")
-      pass
+    return self._first_hit('content', _CONTENT_SELECTORS, _paragraphs)
 
-    # 방법 4: article.meteredContent 내의 section에서 추출
-    try:
-      article = self.page.query_selector('article.meteredContent')
-      if article:
-        article_section = article.query_selector('section')
-        if article_section:
-          paragraphs = article_section.query_selector_all('p')
-          for p in paragraphs:
-            text = p.inner_text().strip()
-            if text and len(text) > 10:
-              content_parts.append(text)
-          if content_parts:
-            return '\n\n'.join(content_parts)
-    except Exception as e:
-      print(f"본문 내용 추출 중 오류: {e}")
-      pass
+  def _extract_images(self):
+    """본문 이미지 URL 추출 - 다운로드는 assets.AssetDownloader가 크롤링과 별도로 처리"""
+    def _images(selector):
+      return self.page.eval_on_selector_all(selector, _IMAGES_JS)
 
-    return None
+    return self._first_hit('images', _IMAGE_SELECTORS, _images) or []
 
   def _extract_metadata(self):
     """추가 메타데이터 추출"""
-    import re
     metadata = {}
 
-    # 댓글/응답 수
-    try:
-      comment_selectors = [
-          '[data-testid="commentCount"]',
-          'button[aria-label*="response" i]',
-          'button[aria-label*="comment" i]',
-          'button:has-text("responses")',
-          'button:has-text("comments")',
-          'button:has-text("response")'
-      ]
-      for selector in comment_selectors:
-        try:
-          elements = self.page.query_selector_all(selector)
-          for element in elements:
-            comment_text = element.inner_text().strip()
-            if comment_text:
-              numbers = re.findall(r'\d+', comment_text.replace(',',
-                                   '').replace('K', '000').replace('M', '000000'))
-              if numbers:
-                metadata['comments'] = int(numbers[0])
-                break
-
-            # aria-label에서도 시도
-            aria_label = element.get_attribute('aria-label') or ''
-            if aria_label:
-              numbers = re.findall(r'\d+', aria_label.replace(',',
-                                   '').replace('K', '000').replace('M', '000000'))
-              if numbers:
-                metadata['comments'] = int(numbers[0])
-                break
-
-          if 'comments' in metadata:
-            break
-        except Exception as e:
-          print(f"댓글/응답 수 추출 중 오류: {e}")
-          continue
-    except Exception as e:
-      print(f"댓글/응답 수 추출 중 오류: {e}")
-      pass
+    # 댓글/응답 수 (텍스트에 숫자가 없으면 aria-label에서도 시도)
+    def _comment_count(selector):
+      for element in self.page.query_selector_all(selector):
+        for text in (element.inner_text().strip(), element.get_attribute('aria-label') or ''):
+          count = _parse_count(text)
+          if count is not None:
+            return count
+      return None
+
+    comments = self._first_hit('comments', _COMMENT_SELECTORS, _comment_count)
+    if comments is not None:
+      metadata['comments'] = comments
 
     # 조회수 (views) - 있는 경우
-    try:
-      view_selectors = [
-          '[data-testid="viewCount"]',
-          'span:has-text("views")',
-          'span:has-text("view")'
-      ]
-      for selector in view_selectors:
-        try:
-          element = self.page.query_selector(selector)
-          if element:
-            view_text = element.inner_text().strip()
-            numbers = re.findall(r'\d+', view_text.replace(',',
-                                 '').replace('K', '000').replace('M', '000000'))
-            if numbers:
-              metadata['views'] = int(numbers[0])
-              break
-        except Exception as e:
-          print(f"조회수 추출 중 오류: {e}")
-          continue
-    except Exception as e:
-      print(f"조회수 추출 중 오류: {e}")
-      pass
+    def _view_count(selector):
+      element = self.page.query_selector(selector)
+      return _parse_count(element.inner_text().strip()) if element else None
+
+    views = self._first_hit('views', _VIEW_SELECTORS, _view_count)
+    if views is not None:
+      metadata['views'] = views
 
     # 작성자 프로필 링크
     try:
@@ -729,7 +797,48 @@ def _extract_metadata(self):
         if author_url:
           metadata['author_url'] = author_url
     except Exception as e:
-      print(f"작성자 프로필 링크 추출 중 오류: {e}")
+      if __debug__:
+        logger.debug(f"작성자 프로필 링크 추출 중 오류: {e}")
       pass
 
     return metadata
+
+
+def login_accounts_concurrently(emails, code_dispatcher, headless=False, on_login=None):
+  """
+  여러 Medium 계정을 동시에 로그인합니다. 인증 코드는 하나의 디스패처 폴링 루프로 받습니다.
+
+  Playwright sync API 객체는 생성한 스레드에서만 사용할 수 있으므로, 로그인 후 작업은
+  on_login 콜백으로 같은 스레드에서 실행하고 브라우저도 그 스레드에서 닫습니다.
+
+  Args:
+      emails: 로그인할 이메일 리스트
+      code_dispatcher: VerificationCodeDispatcher
+      headless: 브라우저 headless 여부
+      on_login: 로그인 성공 시 crawler를 인자로 호출할 함수
+
+  Returns:
+      {이메일: 로그인 성공 여부}
+  """
+  results = {}
+
+  def _run(email):
+    crawler = None
+    try:
+      crawler = MediumCrawler(email=email, headless=headless, code_dispatcher=code_dispatcher)
+      results[email] = crawler.login()
+      if results[email] and on_login:
+        on_login(crawler)
+    except Exception as e:
+      logger.error(f"[{email}] 로그인 중 오류 발생: {e}")
+      results[email] = False
+    finally:
+      if crawler:
+        crawler.close_browser()
+
+  threads = [threading.Thread(target=_run, args=(email,), name=f'login-{email}') for email in emails]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return results
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from config import load_env
+from metrics import REGISTRY
+from utils import extract_post_id
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+INDEX_FILENAME = 'dedup_index.sqlite3'
+
+_WORD_PATTERN = re.compile(r'\w+')
+# 바이트 값 → k번째 비트 (k = 0~7)
+_BIT_TABLES = [bytes((value >> k) & 1 for value in range(256)) for k in range(8)]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+  key TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  simhash INTEGER NOT NULL,
+  output_path TEXT,
+  duplicate_of TEXT
+);
+CREATE TABLE IF NOT EXISTS bands (
+  band INTEGER NOT NULL,
+  value INTEGER NOT NULL,
+  key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bands_value ON bands (band, value);
+CREATE INDEX IF NOT EXISTS idx_bands_key ON bands (key);
+CREATE TABLE IF NOT EXISTS meta (
+  name TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+"""
+
+
+def _shingles(text, size):
+  words = _WORD_PATTERN.findall(text.lower())
+  if len(words) < size:
+    return [' '.join(words)] if words else []
+  return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text, shingle_size=3):
+  """
+  본문의 64비트 SimHash (단어 shingle_size개 묶음 기준)
+
+  비슷한 글일수록 서로 다른 비트 수(hamming_distance)가 작습니다.
+
+  Returns:
+      (signature, shingle 수) 튜플
+  """
+  shingles = _shingles(text, shingle_size)
+  digests = b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles)
+  threshold = len(shingles) / 2
+  signature = 0
+  # 비트별 1의 개수를 shingle마다 세는 대신, 해시의 j번째 바이트만 모은 열에서 k번째 비트를 한 번에 셈 (C 수준 반복)
+  for j in range(SIMHASH_BITS // 8):
+    column = digests[j::8]
+    for k, table in enumerate(_BIT_TABLES):
+      if column.translate(table).count(1) > threshold:
+        signature |= 1 << (j * 8 + k)
+  return signature, len(shingles)
+
+
+def hamming_distance(a, b):
+  return (a ^ b).bit_count()
+
+
+def _to_signed(value):
+  """SQLite INTEGER(부호 있는 64비트)로 저장할 수 있게 변환"""
+  return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value):
+  return value + (1 << 64) if value < 0 else value
+
+
+def document_key(url):
+  """같은 기사를 다시 저장하면 갱신되도록 post ID를 키로 사용 (기사 URL이 아니면 URL 그대로)"""
+  return extract_post_id(url) or url
+
+
+class DedupIndex:
+  """
+  크롤링한 본문의 SimHash를 LSH(밴드) 인덱스로 관리해 거의 같은 글을 찾습니다 (출력 디렉토리의 SQLite 파일).
+
+  Medium은 같은 글을 여러 퍼블리케이션에 싣거나 다시 올리므로, 먼저 저장된 글(원본)과 SimHash 거리가
+  max_distance 이하인 글은 본문 대신 원본 참조로 저장합니다.
+  64비트를 max_distance + 1개 밴드로 나누면 거리가 max_distance 이하인 두 값은 적어도 한 밴드가 같으므로
+  (비둘기집 원리) 같은 밴드 값을 가진 원본만 후보로 꺼내 거리를 확인합니다.
+  """
+
+  def __init__(self, path, max_distance=None, min_shingles=None):
+    """
+    Args:
+        path: 인덱스 파일 경로
+        max_distance: 중복으로 볼 최대 SimHash 거리 (기본값: DEDUP_MAX_DISTANCE 또는 4)
+        min_shingles: 이보다 짧은 본문은 비교하지 않음 (기본값: DEDUP_MIN_SHINGLES 또는 50)
+    """
+    self.path = str(path)
+    self.max_distance = int(max_distance if max_distance is not None else os.getenv('DEDUP_MAX_DISTANCE', '4'))
+    self.min_shingles = int(min_shingles if min_shingles is not None else os.getenv('DEDUP_MIN_SHINGLES', '50'))
+    self.band_count = min(SIMHASH_BITS, self.max_distance + 1)
+    self._band_bits = SIMHASH_BITS // self.band_count
+    Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+    self._conn.execute('PRAGMA journal_mode=WAL')
+    self._conn.execute('PRAGMA synchronous=NORMAL')
+    with self._conn:
+      self._conn.executescript(_SCHEMA)
+    self._check_bands()
+
+  def close(self):
+    self._conn.close()
+
+  def _bands(self, signature):
+    mask = (1 << self._band_bits) - 1
+    return [(band, (signature >> (band * self._band_bits)) & mask) for band in range(self.band_count)]
+
+  def _check_bands(self):
+    """밴드 설정(max_distance)이 바뀌었으면 원본들의 밴드를 다시 만듭니다."""
+    row = self._conn.execute("SELECT value FROM meta WHERE name = 'band_count'").fetchone()
+    if row and int(row[0]) == self.band_count:
+      return
+    with self._conn:
+      self._conn.execute('DELETE FROM bands')
+      documents = self._conn.execute('SELECT key, simhash FROM documents WHERE duplicate_of IS NULL').fetchall()
+      self._conn.executemany('INSERT INTO bands (band, value, key) VALUES (?, ?, ?)',
+                             [(band, value, key) for key, signature in documents
+                              for band, value in self._bands(_to_unsigned(signature))])
+      self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('band_count', ?)", (str(self.band_count),))
+    if documents:
+      logger.info(f"중복 인덱스 밴드 재구성: 원본 {len(documents)}개 ({self.band_count}개 밴드)")
+
+  def _find(self, key, signature):
+    """key를 제외한 원본 중 거리가 가장 가까운 (key, url, output_path, 거리) (max_distance 이하가 없으면 None)"""
+    bands = self._bands(signature)
+    where = ' OR '.join(['(b.band = ? AND b.value = ?)'] * len(bands))
+    params = [item for pair in bands for item in pair]
+    rows = self._conn.execute(
+        f'SELECT DISTINCT d.key, d.url, d.output_path, d.simhash FROM bands b JOIN documents d ON d.key = b.key '
+        f'WHERE ({where}) AND d.key != ?', (*params, key)).fetchall()
+    best = None
+    for other_key, url, output_path, other in rows:
+      distance = hamming_distance(signature, _to_unsigned(other))
+      if distance <= self.max_distance and (best is None or distance < best[3]):
+        best = (other_key, url, output_path, distance)
+    return best
+
+  def check(self, url, content, output_path=None):
+    """
+    본문을 인덱스에 기록하고, 거의 같은 원본이 있으면 그 정보를 반환합니다.
+
+    같은 키(post ID)를 다시 저장하면 새 항목이 아니라 갱신으로 처리합니다. 이미 원본인 글은 갱신되어도 원본으로 남습니다
+    (그 글을 참조하는 중복이 있을 수 있으므로).
+
+    Args:
+        url: 기사 URL
+        content: 본문
+        output_path: 원본으로 저장될 때 기록할 결과 파일 경로
+
+    Returns:
+        중복이면 {'url', 'output_path', 'distance'}, 아니면 None
+    """
+    if not content:
+      return None
+    signature, shingle_count = simhash(content)
+    if shingle_count < self.min_shingles:
+      REGISTRY.inc('dedup_articles_total', result='too_short')
+      return None
+
+    key = document_key(url)
+    with self._lock, self._conn:
+      previous = self._conn.execute('SELECT duplicate_of FROM documents WHERE key = ?', (key,)).fetchone()
+      was_original = previous is not None and previous[0] is None
+      match = None if was_original else self._find(key, signature)
+      self._conn.execute('DELETE FROM bands WHERE key = ?', (key,))
+      self._conn.execute(
+          'INSERT INTO documents (key, url, simhash, output_path, duplicate_of) VALUES (?, ?, ?, ?, ?) '
+          'ON CONFLICT(key) DO UPDATE SET url = excluded.url, simhash = excluded.simhash, '
+          'output_path = excluded.output_path, duplicate_of = excluded.duplicate_of',
+          (key, url, _to_signed(signature), None if match else output_path, match[0] if match else None))
+      if not match:
+        self._conn.executemany('INSERT INTO bands (band, value, key) VALUES (?, ?, ?)',
+                               [(band, value, key) for band, value in self._bands(signature)])
+
+    if not match:
+      REGISTRY.inc('dedup_articles_total', result='updated' if previous is not None else 'original')
+      return None
+    REGISTRY.inc('dedup_articles_total', result='duplicate')
+    logger.info(f"거의 같은 글 (거리 {match[3]}): {url} → {match[1]}")
+    return {'url': match[1], 'output_path': match[2], 'distance': match[3]}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def dedup_enabled():
+  return os.getenv('DEDUP', 'false').lower() == 'true'
+
+
+def index_for(output_dir):
+  """출력 디렉토리별 DedupIndex (DEDUP_INDEX로 경로 지정 가능, 프로세스 안에서 공유)"""
+  path = os.getenv('DEDUP_INDEX') or os.path.join(output_dir, INDEX_FILENAME)
+  with _indexes_lock:
+    index = _indexes.get(path)
+    if index is None:
+      index = _indexes[path] = DedupIndex(path)
+    return index
+
+
+def apply_dedup(data, output_dir, output_path):
+  """
+  DEDUP=true이면 data의 본문을 인덱스에 기록하고, 거의 같은 원본이 있으면 data를 참조 형태로 바꿉니다
+  ('content'를 빼고 'duplicate_of'에 원본 URL, 파일 경로, 거리를 기록). 호출한 쪽의 all_articles 등에도 같은 형태가 남습니다.
+
+  Returns:
+      중복이면 True
+  """
+  if not dedup_enabled() or not data.get('content'):
+    return False
+  duplicate_of = index_for(output_dir).check(data.get('url', ''), data['content'], output_path)
+  if not duplicate_of:
+    data.pop('duplicate_of', None)
+    return False
+  data.pop('content')
+  data['duplicate_of'] = duplicate_of
+  return True
@@ -0,0 +1,216 @@
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from config import load_env
+from metrics import REGISTRY
+from utils import canonicalize_medium_url, extract_post_id
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+MEDIUM_FEED_BASE = 'https://medium.com/feed/'
+
+_ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+
+def feed_url(spec):
+  """
+  피드 지정을 Medium RSS 주소로 바꿉니다.
+
+  Args:
+      spec: '@작성자', 'tag:태그' (또는 'tag/태그'), 퍼블리케이션 slug, 또는 http(s) 피드 주소
+
+  Returns:
+      피드 URL
+  """
+  spec = spec.strip()
+  if re.match(r'https?://', spec):
+    return spec
+  match = re.match(r'tag[:/](.+)', spec)
+  if match:
+    return f'{MEDIUM_FEED_BASE}tag/{match.group(1).strip("/")}'
+  return MEDIUM_FEED_BASE + spec.strip('/')
+
+
+def feeds_from_env():
+  """DISCOVERY_FEEDS (공백 또는 쉼표로 구분)와 DISCOVERY_FEEDS_FILE (한 줄에 하나, # 주석)의 피드 URL 목록"""
+  specs = re.split(r'[\s,]+', os.getenv('DISCOVERY_FEEDS', ''))
+  feeds_file = os.getenv('DISCOVERY_FEEDS_FILE')
+  if feeds_file and os.path.exists(feeds_file):
+    with open(feeds_file, 'r', encoding='utf-8') as f:
+      specs.extend(line.strip() for line in f if not line.lstrip().startswith('#'))
+  feeds = []
+  for spec in specs:
+    if spec and feed_url(spec) not in feeds:
+      feeds.append(feed_url(spec))
+  return feeds
+
+
+def parse_feed(content):
+  """
+  RSS 2.0/Atom 피드에서 기사 항목을 추출합니다.
+
+  Returns:
+      [{'url': 정규화된 기사 URL, 'title': 제목, 'published': 게시 시각 문자열}] (기사 URL이 아닌 항목은 제외)
+  """
+  parser = etree.XMLParser(resolve_entities=False, no_network=True, recover=True, huge_tree=False)
+  root = etree.fromstring(content, parser)
+  if root is None:
+    return []
+  items = []
+  for item in root.iter('item', f'{_ATOM_NS}entry'):
+    if item.tag == 'item':
+      # Medium RSS의 <guid>는 https://medium.com/p/<post ID> 형식이라 link가 없을 때 대신 사용
+      link = item.findtext('link') or item.findtext('guid')
+      title = item.findtext('title')
+      published = item.findtext('pubDate')
+    else:
+      element = item.find(f'{_ATOM_NS}link[@rel="alternate"]')
+      if element is None:
+        element = item.find(f'{_ATOM_NS}link')
+      link = element.get('href') if element is not None else None
+      title = item.findtext(f'{_ATOM_NS}title')
+      published = item.findtext(f'{_ATOM_NS}published') or item.findtext(f'{_ATOM_NS}updated')
+    url = canonicalize_medium_url((link or '').strip())
+    if url:
+      items.append({'url': url, 'title': (title or '').strip() or None, 'published': (published or '').strip() or None})
+  return items
+
+
+class FeedDiscovery:
+  """
+  작성자/퍼블리케이션/태그 RSS 피드에서 새 기사를 찾아 크롤링 큐(CrawlJournal)에 추가합니다.
+
+  브라우저 없이 HTTP 클라이언트로 피드만 받으므로 "이 작성자들 지켜보기" 같은 작업을 거의 비용 없이 돌릴 수 있습니다.
+  - 피드는 연결을 재사용하는 requests.Session 하나로 workers개씩 동시에 받습니다.
+  - 지난 응답의 ETag/Last-Modified를 journal에 남겨 조건부 요청하고, 304면 파싱하지 않습니다.
+  - 항목 URL은 canonicalize_medium_url로 정규화하고, 큐에 없던 post ID만 pending으로 추가합니다
+    (urls.txt 등에서 ?source= 쿼리나 커스텀 도메인 URL로 이미 들어온 기사도 다시 크롤링하지 않음).
+  """
+
+  def __init__(self, journal, feeds=None, workers=None, timeout=None, user_agent=None):
+    """
+    Args:
+        journal: CrawlJournal
+        feeds: 피드 URL 또는 지정('@작성자' 등) 목록 (기본값: feeds_from_env())
+        workers: 동시에 받을 피드 수 (기본값: DISCOVERY_WORKERS 또는 8)
+        timeout: 피드 요청 타임아웃 (초, 기본값: DISCOVERY_TIMEOUT 또는 15)
+        user_agent: User-Agent 헤더 (기본값: DISCOVERY_USER_AGENT 또는 DEFAULT_USER_AGENT)
+    """
+    self.journal = journal
+    self.feeds = [feed_url(spec) for spec in feeds] if feeds is not None else feeds_from_env()
+    self.workers = int(workers or os.getenv('DISCOVERY_WORKERS', '8'))
+    self.timeout = float(timeout or os.getenv('DISCOVERY_TIMEOUT', '15'))
+    self.session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers, max_retries=1)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
+    self.session.headers.update({
+        'User-Agent': user_agent or os.getenv('DISCOVERY_USER_AGENT', DEFAULT_USER_AGENT),
+        'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8',
+    })
+
+  def close(self):
+    self.session.close()
+
+  def poll(self):
+    """
+    모든 피드를 한 번 확인합니다.
+
+    Returns:
+        통계 딕셔너리 {'feeds', 'not_modified', 'errors', 'items', 'queued'}
+    """
+    stats = {'feeds': len(self.feeds), 'not_modified': 0, 'errors': 0, 'items': 0, 'queued': 0}
+    if not self.feeds:
+      logger.warning("확인할 피드가 없습니다 (DISCOVERY_FEEDS 또는 DISCOVERY_FEEDS_FILE 설정)")
+      return stats
+    with REGISTRY.timer(stage='discover'), ThreadPoolExecutor(max_workers=min(self.workers, len(self.feeds)),
+                                                              thread_name_prefix='discovery') as executor:
+      for result in executor.map(self._poll_feed, self.feeds):
+        for key, value in result.items():
+          stats[key] += value
+    logger.info(f"피드 {stats['feeds']}개 확인: 변경 없음 {stats['not_modified']}개, 오류 {stats['errors']}개, "
+                f"항목 {stats['items']}개 중 {stats['queued']}개 신규 대기")
+    return stats
+
+  def _poll_feed(self, url):
+    result = {'not_modified': 0, 'errors': 0, 'items': 0, 'queued': 0}
+    headers = {}
+    state = self.journal.feed_state(url)
+    if state:
+      if state['etag']:
+        headers['If-None-Match'] = state['etag']
+      if state['last_modified']:
+        headers['If-Modified-Since'] = state['last_modified']
+
+    try:
+      response = self.session.get(url, headers=headers, timeout=self.timeout)
+      if response.status_code == 304:
+        REGISTRY.inc('discovery_feed_requests_total', status='not_modified')
+        result['not_modified'] = 1
+        return result
+      response.raise_for_status()
+      REGISTRY.inc('discovery_bytes_total', len(response.content))
+      items = parse_feed(response.content)
+    except (requests.RequestException, etree.XMLSyntaxError) as e:
+      REGISTRY.inc('discovery_feed_requests_total', status='error')
+      logger.warning(f"피드 확인 실패 ({url}): {e}")
+      result['errors'] = 1
+      return result
+
+    REGISTRY.inc('discovery_feed_requests_total', status='ok')
+    source = f"feed:{url[len(MEDIUM_FEED_BASE):] if url.startswith(MEDIUM_FEED_BASE) else url}"
+    # 큐에 다른 URL 형태로 이미 있는 기사는 제외 (post ID 기준)
+    known = self.journal.known_post_ids(extract_post_id(item['url']) for item in items)
+    entries = [(item['url'], source, {'feed': url, 'title': item['title'], 'published': item['published']})
+               for item in items if extract_post_id(item['url']) not in known]
+    result['items'] = len(items)
+    result['queued'] = self.journal.enqueue_many(entries)
+    REGISTRY.inc('discovery_items_total', result['queued'], result='new')
+    REGISTRY.inc('discovery_items_total', result['items'] - result['queued'], result='seen')
+    # 항목을 큐에 넣은 뒤에 검증자를 기록 (중간에 실패하면 다음 확인 때 다시 받음)
+    self.journal.save_feed_state(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    if result['queued']:
+      logger.info(f"피드 {url}: 새 기사 {result['queued']}개")
+    return result
+
+
+def discover_once(journal, feeds=None):
+  """피드를 한 번 확인해 새 기사를 큐에 추가하고 통계를 반환합니다."""
+  discovery = FeedDiscovery(journal, feeds)
+  try:
+    return discovery.poll()
+  finally:
+    discovery.close()
+
+
+def run_discovery(journal, interval=None):
+  """
+  main.py --discover: 피드를 확인해 새 기사를 큐에 추가합니다.
+
+  Args:
+      journal: CrawlJournal
+      interval: 반복 간격 (초, 기본값: DISCOVERY_INTERVAL 또는 0 = 한 번만 확인)
+  """
+  interval = float(interval if interval is not None else os.getenv('DISCOVERY_INTERVAL', '0'))
+  discovery = FeedDiscovery(journal)
+  try:
+    while True:
+      discovery.poll()
+      if interval <= 0:
+        return
+      logger.info(f"{interval:.0f}초 후 다시 확인합니다 (Ctrl+C로 종료)")
+      time.sleep(interval)
+  except KeyboardInterrupt:
+    logger.info("피드 확인 중단")
+  finally:
+    discovery.close()
@@ -0,0 +1,375 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from urllib.parse import unquote, urlparse
+
+import requests
+import urllib3
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+
+# 청크 크기 범위 (적응형: 처리량에 따라 MIN~MAX 사이에서 조정)
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+# 청크 하나를 받는 데 목표로 하는 시간 (초)
+TARGET_CHUNK_SECONDS = 0.5
+
+MANIFEST_FILENAME = '.download_manifest.json'
+
+
+class DownloadError(Exception):
+  """다운로드 실패 (크기/해시 불일치 포함)"""
+
+
+class DownloadManifest:
+  """
+  완료된 다운로드 목록을 JSON 파일로 관리합니다.
+
+  URL을 키로 최종 파일 경로, 크기, sha256을 기록하여
+  재실행 시 이미 받은 파일을 건너뛸 수 있게 합니다.
+  """
+
+  def __init__(self, download_path):
+    self.path = os.path.join(download_path, MANIFEST_FILENAME)
+    self._lock = threading.Lock()
+    self._entries = self._load()
+
+  def _load(self):
+    if not os.path.exists(self.path):
+      return {}
+    try:
+      with open(self.path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+    except (OSError, ValueError) as e:
+      logger.warning(f"다운로드 매니페스트를 읽을 수 없어 새로 만듭니다: {e}")
+      return {}
+
+  def _save(self):
+    tmp_path = f"{self.path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      json.dump(self._entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, self.path)
+
+  def get_completed(self, url):
+    """
+    완료 기록이 있고 파일이 그대로 남아 있으면 해당 항목을 반환합니다.
+
+    Args:
+        url: 다운로드 URL
+
+    Returns:
+        매니페스트 항목 딕셔너리, 없거나 파일이 변경되었으면 None
+    """
+    with self._lock:
+      entry = self._entries.get(url)
+    if not entry:
+      return None
+    file_path = entry.get('path')
+    if not file_path or not os.path.exists(file_path):
+      return None
+    if os.path.getsize(file_path) != entry.get('size'):
+      return None
+    return entry
+
+  def owned_by_other(self, file_path, url):
+    """file_path가 다른 URL의 완료된 다운로드로 기록되어 있는지"""
+    with self._lock:
+      return any(entry.get('path') == file_path for other, entry in self._entries.items() if other != url)
+
+  def record(self, url, file_path, size, sha256):
+    """완료된 다운로드를 기록합니다."""
+    with self._lock:
+      self._entries[url] = {
+          'path': file_path,
+          'size': size,
+          'sha256': sha256,
+          'completed_at': datetime.now().isoformat(timespec='seconds')
+      }
+      self._save()
+
+
+class ResumableDownloader:
+  """
+  이어받기와 무결성 검증을 지원하는 HTTP 다운로더
+
+  - `<파일명>.<URL 해시>.part` 임시 파일에 기록하고, 서버가 Range를 지원하면 끊긴 지점부터 이어받습니다.
+  - 처리량에 맞춰 청크 크기를 조정합니다.
+  - Content-Length 기반 크기와 서버가 제공한 해시(x-goog-hash, Content-MD5)를 검증한 뒤
+    `os.replace`로 원자적으로 최종 파일명으로 바꿉니다.
+  - 완료된 다운로드는 매니페스트에 기록되어 재실행 시 건너뜁니다.
+  """
+
+  def __init__(self, download_path, session=None, max_attempts=5, retry_interval=3, timeout=60):
+    self.download_path = download_path
+    self.session = session or requests.Session()
+    self.session.headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+    self.max_attempts = max_attempts
+    self.retry_interval = retry_interval
+    self.timeout = timeout
+    os.makedirs(download_path, exist_ok=True)
+    self.manifest = DownloadManifest(download_path)
+    # 응답에서 알아낸 파일명 (재시도 시 같은 .part를 이어받기 위해 보관)
+    self._resolved_names = {}
+    self._finalize_lock = threading.Lock()
+
+  @classmethod
+  def from_browser_context(cls, browser_context, download_path, **kwargs):
+    """
+    Playwright 브라우저 컨텍스트의 쿠키와 User-Agent로 세션을 구성합니다.
+    (로그인된 Medium 세션으로 다운로드할 때 사용)
+    """
+    session = requests.Session()
+    for cookie in browser_context.cookies():
+      session.cookies.set(
+          cookie['name'], cookie['value'],
+          domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    try:
+      user_agent = browser_context.pages[0].evaluate('() => navigator.userAgent')
+      session.headers['User-Agent'] = user_agent
+    except Exception:
+      session.headers['User-Agent'] = DEFAULT_USER_AGENT
+    session.headers['Referer'] = 'https://medium.com/'
+    return cls(download_path, session=session, **kwargs)
+
+  def download(self, url, file_name=None):
+    """
+    URL을 다운로드합니다.
+
+    Args:
+        url: 다운로드 URL
+        file_name: 저장할 파일명 (기본값: Content-Disposition 또는 URL에서 추출)
+
+    Returns:
+        최종 파일 경로
+
+    Raises:
+        DownloadError: 재시도 후에도 다운로드/검증에 실패한 경우
+    """
+    completed = self.manifest.get_completed(url)
+    if completed:
+      logger.info(f"이미 다운로드된 파일입니다. 건너뜁니다: {completed['path']}")
+      return completed['path']
+
+    last_error = None
+    for attempt in range(1, self.max_attempts + 1):
+      try:
+        return self._download_once(url, file_name)
+      except DownloadError as e:
+        # 검증 실패는 .part가 손상되었다는 의미이므로 처음부터 다시 받음
+        last_error = e
+        logger.warning(f"다운로드 검증 실패 ({attempt}/{self.max_attempts}): {e}")
+      except requests.exceptions.RequestException as e:
+        last_error = e
+        logger.warning(f"다운로드 중단 ({attempt}/{self.max_attempts}): {e}")
+      if attempt < self.max_attempts:
+        REGISTRY.inc('crawl_retries_total', kind='download')
+        time.sleep(self.retry_interval)
+
+    raise DownloadError(f"다운로드 실패: {url} ({last_error})")
+
+  def _download_once(self, url, file_name):
+    headers = {'Accept': '*/*'}
+    file_name = file_name or self._resolved_names.get(url)
+
+    # 최종 파일명을 알아야 .part 위치가 정해지므로, 이전 시도에서 정해진 이름이 있으면 재사용
+    if file_name:
+      part_path = self._part_path(file_name, url)
+      offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+      if offset:
+        headers['Range'] = f'bytes={offset}-'
+    else:
+      offset = 0
+
+    with self.session.get(url, stream=True, headers=headers, allow_redirects=True,
+                          timeout=self.timeout) as response:
+      if response.status_code == 416:
+        # 요청한 범위가 파일 크기를 넘음 → .part가 이미 완성되었거나 손상됨
+        logger.debug("Range 요청이 거부되었습니다 (416). 처음부터 다시 받습니다.")
+        os.remove(self._part_path(file_name, url))
+        raise DownloadError("잘못된 이어받기 범위")
+      response.raise_for_status()
+
+      content_type = response.headers.get('Content-Type', '')
+      if 'text/html' in content_type:
+        # 인증되지 않은 경우 로그인 페이지가 내려옴 (docs/DOWNLOAD_IMPLEMENTATION_REPORT.md 참고)
+        raise requests.exceptions.HTTPError(
+            f"파일 대신 HTML 페이지가 반환되었습니다 (인증 필요 가능성): {response.url}")
+
+      if not file_name:
+        file_name = self._file_name_from_response(response, url)
+        self._resolved_names[url] = file_name
+        part_path = self._part_path(file_name, url)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset:
+          # 남아 있는 .part를 Range로 이어받도록 이 요청은 닫고 다시 요청
+          response.close()
+          return self._download_once(url, file_name)
+
+      part_path = self._part_path(file_name, url)
+      resumed = response.status_code == 206 and offset > 0
+      if offset and not resumed:
+        logger.info("서버가 Range를 지원하지 않아 처음부터 다시 받습니다.")
+        offset = 0
+
+      total_size = self._expected_total_size(response, offset if resumed else 0)
+      expected_hashes = self._expected_hashes(response)
+
+      sha256 = hashlib.sha256()
+      md5 = hashlib.md5() if 'md5' in expected_hashes else None
+      if resumed:
+        # 이어받는 경우 기존 부분의 해시를 먼저 반영
+        self._hash_existing(part_path, sha256, md5)
+        logger.info(f"이어받기: {offset} 바이트부터 ({file_name})")
+
+      mode = 'ab' if resumed else 'wb'
+      written = offset if resumed else 0
+      chunk_size = MIN_CHUNK_SIZE
+      with open(part_path, mode) as f:
+        while True:
+          started = time.monotonic()
+          try:
+            data = response.raw.read(chunk_size, decode_content=True)
+          except urllib3.exceptions.HTTPError as e:
+            # 연결 끊김: 여기까지 받은 내용은 .part에 남겨 다음 시도에서 이어받음
+            f.flush()
+            raise requests.exceptions.ChunkedEncodingError(f"연결이 끊겼습니다: {e}") from e
+          if not data:
+            break
+          f.write(data)
+          sha256.update(data)
+          if md5:
+            md5.update(data)
+          written += len(data)
+          REGISTRY.inc('download_bytes_total', len(data))
+          chunk_size = self._next_chunk_size(chunk_size, time.monotonic() - started)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if total_size is not None and written != total_size:
+      if written > total_size:
+        os.remove(part_path)
+        raise DownloadError(f"파일 크기 불일치: 예상 {total_size}, 실제 {written}")
+      # 덜 받은 경우 .part를 남겨 다음 시도에서 이어받음
+      raise requests.exceptions.ChunkedEncodingError(
+          f"연결이 끊겼습니다: {written}/{total_size} 바이트")
+
+    if md5 and md5.digest() != expected_hashes['md5']:
+      os.remove(part_path)
+      raise DownloadError("MD5 해시 불일치")
+
+    return self.finalize(url, part_path, file_name, written, sha256.hexdigest())
+
+  def finalize(self, url, part_path, file_name, size=None, sha256=None):
+    """
+    검증이 끝난 .part 파일을 최종 파일명으로 원자적으로 옮기고 매니페스트에 기록합니다.
+
+    Args:
+        url: 다운로드 URL
+        part_path: 임시(.part) 파일 경로
+        file_name: 최종 파일명
+        size: 파일 크기 (없으면 계산)
+        sha256: sha256 hex digest (없으면 계산)
+
+    Returns:
+        최종 파일 경로
+    """
+    if size is None:
+      size = os.path.getsize(part_path)
+    if sha256 is None:
+      digest = hashlib.sha256()
+      self._hash_existing(part_path, digest, None)
+      sha256 = digest.hexdigest()
+    with self._finalize_lock:
+      # 다른 링크가 같은 파일명으로 이미 받은 파일은 덮어쓰지 않고 "이름 (2).zip"처럼 번호를 붙임
+      base, extension = os.path.splitext(file_name)
+      final_path = os.path.join(self.download_path, file_name)
+      number = 2
+      while os.path.exists(final_path) and self.manifest.owned_by_other(final_path, url):
+        final_path = os.path.join(self.download_path, f"{base} ({number}){extension}")
+        number += 1
+      os.replace(part_path, final_path)
+      self.manifest.record(url, final_path, size, sha256)
+    self._resolved_names.pop(url, None)
+    logger.info(f"파일 다운로드 완료: {final_path} ({size} 바이트, sha256={sha256[:12]}…)")
+    return final_path
+
+  def part_path_for(self, file_name, url):
+    """최종 파일명과 URL에 대응하는 .part 경로"""
+    return self._part_path(file_name, url)
+
+  def _part_path(self, file_name, url):
+    # 여러 스레드가 같은 다운로더를 쓰므로, 다른 링크가 같은 파일명으로 내려와도 .part를 함께 쓰지 않도록 URL 해시를 붙임
+    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(self.download_path, f"{file_name}.{url_hash}.part")
+
+  @staticmethod
+  def _next_chunk_size(chunk_size, elapsed):
+    """청크 하나를 받는 데 걸린 시간에 따라 다음 청크 크기를 조정합니다."""
+    if elapsed < TARGET_CHUNK_SECONDS / 2:
+      return min(chunk_size * 2, MAX_CHUNK_SIZE)
+    if elapsed > TARGET_CHUNK_SECONDS * 2:
+      return max(chunk_size // 2, MIN_CHUNK_SIZE)
+    return chunk_size
+
+  @staticmethod
+  def _hash_existing(part_path, sha256, md5):
+    with open(part_path, 'rb') as f:
+      while True:
+        data = f.read(MAX_CHUNK_SIZE)
+        if not data:
+          break
+        sha256.update(data)
+        if md5:
+          md5.update(data)
+
+  @staticmethod
+  def _expected_total_size(response, offset):
+    """Content-Range/Content-Length에서 전체 파일 크기를 계산합니다."""
+    content_range = response.headers.get('Content-Range', '')
+    match = re.match(r'bytes\s+\d+-\d+/(\d+)', content_range)
+    if match:
+      return int(match.group(1))
+    # 압축 전송인 경우 Content-Length는 디코딩 후 크기와 다름
+    if response.headers.get('Content-Encoding', 'identity') != 'identity':
+      return None
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+      return offset + int(content_length)
+    return None
+
+  @staticmethod
+  def _expected_hashes(response):
+    """서버가 제공한 해시(GCS x-goog-hash, Content-MD5)를 추출합니다."""
+    hashes = {}
+    for value in response.headers.get('x-goog-hash', '').split(','):
+      name, _, encoded = value.strip().partition('=')
+      if name == 'md5' and encoded:
+        hashes['md5'] = base64.b64decode(encoded)
+    content_md5 = response.headers.get('Content-MD5')
+    if content_md5 and 'md5' not in hashes:
+      hashes['md5'] = base64.b64decode(content_md5)
+    return hashes
+
+  @staticmethod
+  def _file_name_from_response(response, url):
+    """Content-Disposition 또는 최종 URL 경로에서 파일명을 추출합니다."""
+    disposition = response.headers.get('Content-Disposition', '')
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", disposition, re.IGNORECASE)
+    if not match:
+      match = re.search(r'filename="?([^";]+)"?', disposition, re.IGNORECASE)
+    if match:
+      file_name = unquote(match.group(1).strip())
+    else:
+      path_parts = [p for p in urlparse(response.url or url).path.split('/') if p]
+      file_name = unquote(path_parts[-1]) if path_parts else 'medium-export.zip'
+    return re.sub(r'[^\w\-_\.]', '_', os.path.basename(file_name))
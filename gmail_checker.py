@@ -1,12 +1,16 @@
 import base64
+import json
 import logging
 import os
 import re
 import time
+import threading
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from email.utils import getaddresses
 from io import StringIO
 
-import requests
-from dotenv import load_dotenv
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -15,7 +19,10 @@
 from googleapiclient.errors import HttpError
 from lxml import etree
 
-load_dotenv()
+from config import load_env
+from downloader import DownloadError, ResumableDownloader
+
+load_env()
 
 logger = logging.getLogger(__name__)
 
@@ -25,14 +32,55 @@
     'https://www.googleapis.com/auth/gmail.modify'
 ]
 
+# 백로그 모드에서 처리 완료한 Gmail 메시지 ID를 기록하는 파일명 (다운로드 경로 아래)
+LEDGER_FILENAME = '.gmail_ledger.json'
+
+
+class MessageLedger:
+  """
+  처리 완료한 Gmail 메시지를 메시지 ID 기준으로 기록합니다.
+
+  UNREAD 라벨과 무관하게 같은 메시지를 두 번 처리하지 않도록 합니다.
+  """
+
+  def __init__(self, download_path):
+    self.path = os.path.join(download_path, LEDGER_FILENAME)
+    self._entries = {}
+    if os.path.exists(self.path):
+      try:
+        with open(self.path, 'r', encoding='utf-8') as f:
+          self._entries = json.load(f)
+      except (OSError, ValueError) as e:
+        logger.warning(f"Gmail 처리 기록을 읽을 수 없어 새로 만듭니다: {e}")
+
+  def __contains__(self, message_id):
+    return message_id in self._entries
+
+  def mark_processed(self, message_id, links, file_paths):
+    """메시지 처리 완료를 기록합니다."""
+    self._entries[message_id] = {
+        'links': links,
+        'files': file_paths,
+        'processed_at': datetime.now().isoformat(timespec='seconds')
+    }
+    tmp_path = f"{self.path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      json.dump(self._entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, self.path)
+
 
 class GmailChecker:
-  def __init__(self, credentials_path=None, token_path=None, sender_email=None):
+  def __init__(self, credentials_path=None, token_path=None, sender_email=None, service=None):
+    """
+    Args:
+        service: 이미 만들어진 Gmail API 서비스 객체 (지정하면 인증을 건너뜀, 벤치마크의 가짜 서비스 등)
+    """
     self.credentials_path = credentials_path or os.getenv(
         'GMAIL_CREDENTIALS_PATH', 'credentials.json')
     self.token_path = token_path or os.getenv('GMAIL_TOKEN_PATH', 'token.json')
-    self.service = None
-    self._authenticate()
+    self.service = service
+    if self.service is None:
+      self._authenticate()
 
   def _authenticate(self):
     """Gmail API 인증 및 서비스 초기화"""
@@ -288,64 +336,59 @@ def _extract_links_from_message(self, body_text, body_html):
     return list(links)
 
   def _download_from_url(self, url, download_path, browser_page=None):
-    """URL에서 파일 다운로드"""
-    try:
-      logger.info(f"다운로드 요청: {url}")
+    """
+    URL에서 파일 다운로드
 
-      # 브라우저 페이지가 있으면 브라우저로 다운로드 (로그인된 세션 사용)
-      if browser_page:
-        logger.debug("브라우저를 통해 다운로드 중...")
-        try:
-          # 다운로드 이벤트를 먼저 대기 시작 (리다이렉트 전에 시작)
-          with browser_page.expect_download(timeout=60000) as download_info:
-            try:
-              # 리다이렉트를 따라가면서 최종 다운로드 URL까지 이동
-              browser_page.goto(url, wait_until='load', timeout=60000)
-            except Exception as goto_error:
-              # "Download is starting" 에러는 정상적인 경우 (다운로드가 시작됨)
-              error_msg = str(goto_error)
-              if "Download is starting" in error_msg:
-                logger.debug("다운로드가 시작되었습니다")
-              else:
-                raise
-          download = download_info.value
-          file_name = download.suggested_filename
-          if file_name:
-            file_path = os.path.join(download_path, file_name)
-          download.save_as(file_path)
-          logger.info(f"파일 다운로드 완료: {file_path}")
-          return file_path
-        except Exception as e:
-          logger.error(f"브라우저 다운로드 실패: {e}")
-          return None
+    로그인된 브라우저 페이지가 있으면 그 세션 쿠키로 이어받기 가능한 HTTP 다운로드를 먼저 시도하고,
+    실패하면 브라우저 다운로드로 대체합니다. 두 경우 모두 `.part` 임시 파일에 기록한 뒤
+    검증이 끝나면 원자적으로 최종 파일명으로 바꾸고 매니페스트에 기록합니다.
+    """
+    logger.info(f"다운로드 요청: {url}")
 
-      # requests 사용 (fallback, 인증이 필요 없는 경우에만)
+    if browser_page:
+      downloader = ResumableDownloader.from_browser_context(browser_page.context, download_path)
+    else:
+      # 인증이 필요 없는 경우에만 성공할 수 있음
       logger.warning("브라우저 페이지가 없어 requests로 시도합니다 (인증이 필요할 수 있습니다)")
-      headers = {
-          'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-          'Referer': 'https://medium.com/',
-          'Accept': '*/*'
-      }
-
-      response = requests.get(url, stream=True, headers=headers, allow_redirects=True, timeout=60)
-      response.raise_for_status()
-
-      # 파일 저장
-      with open(file_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-          if chunk:
-            f.write(chunk)
-
-      logger.info(f"파일 다운로드 완료: {file_path}")
-      return file_path
-
-    except requests.exceptions.RequestException as e:
-      logger.error(f"파일 다운로드 실패: {e}")
-      if hasattr(e, 'response') and e.response is not None:
-        logger.debug(f"에러 Response 상태 코드: {e.response.status_code}")
-      return None
+      downloader = ResumableDownloader(download_path)
+      downloader.session.headers['Referer'] = 'https://medium.com/'
+
+    try:
+      return downloader.download(url)
+    except DownloadError as e:
+      if not browser_page:
+        logger.error(f"파일 다운로드 실패: {e}")
+        return None
+      logger.warning(f"HTTP 이어받기 다운로드 실패, 브라우저 다운로드로 대체합니다: {e}")
+
+    return self._download_with_browser(url, downloader, browser_page)
+
+  def _download_with_browser(self, url, downloader, browser_page):
+    """브라우저 세션으로 다운로드 (이어받기 불가, .part 경유 원자적 저장)"""
+    logger.debug("브라우저를 통해 다운로드 중...")
+    try:
+      # 다운로드 이벤트를 먼저 대기 시작 (리다이렉트 전에 시작)
+      with browser_page.expect_download(timeout=60000) as download_info:
+        try:
+          # 리다이렉트를 따라가면서 최종 다운로드 URL까지 이동
+          browser_page.goto(url, wait_until='load', timeout=60000)
+        except Exception as goto_error:
+          # "Download is starting" 에러는 정상적인 경우 (다운로드가 시작됨)
+          error_msg = str(goto_error)
+          if "Download is starting" in error_msg:
+            logger.debug("다운로드가 시작되었습니다")
+          else:
+            raise
+      download = download_info.value
+      failure = download.failure()
+      if failure:
+        raise Exception(f"브라우저 다운로드 실패: {failure}")
+      file_name = download.suggested_filename or 'medium-export.zip'
+      part_path = downloader.part_path_for(file_name, url)
+      download.save_as(part_path)
+      return downloader.finalize(url, part_path, file_name)
     except Exception as e:
-      logger.error(f"파일 다운로드 실패: {e}")
+      logger.error(f"브라우저 다운로드 실패: {e}")
       return None
 
   def get_medium_list(self, email=None, sender_email=None, download_path="", search_query="", max_retries=5, retry_interval=5, browser_page=None):
@@ -431,3 +474,305 @@ def get_medium_list(self, email=None, sender_email=None, download_path="", searc
           return None
 
     return None
+
+  def _iter_message_ids(self, query, page_size=100):
+    """pageToken을 따라가며 검색 결과의 모든 메시지 ID를 반환합니다."""
+    page_token = None
+    while True:
+      results = self.service.users().messages().list(
+          userId='me',
+          q=query,
+          maxResults=page_size,
+          pageToken=page_token
+      ).execute()
+
+      for message in results.get('messages', []):
+        yield message['id']
+
+      page_token = results.get('nextPageToken')
+      if not page_token:
+        break
+
+  def drain_medium_list_backlog(self, email=None, sender_email=None, download_path="", search_query="", browser_page=None, max_workers=4, mark_as_read=True):
+    """
+    검색 조건에 맞는 모든 Medium 다운로드 이메일을 처리합니다 (백로그 모드).
+
+    UNREAD 여부와 관계없이 모든 페이지를 순회하며, 처리 기록(ledger)에 없는 메시지의
+    모든 다운로드 링크를 병렬로 받습니다. 한 메시지의 링크가 모두 받아졌을 때만
+    처리 완료로 기록하므로, 실패한 메시지는 다음 실행에서 다시 시도됩니다.
+
+    Args:
+        email: Medium 로그인에 사용한 이메일 주소
+        sender_email: Medium 발신자 이메일
+        download_path: 다운로드 경로
+        search_query: 추가 Gmail 검색 조건
+        browser_page: 로그인된 브라우저 페이지 (세션 쿠키 사용)
+        max_workers: 동시 다운로드 수
+        mark_as_read: 처리 완료한 메시지를 읽음 처리할지 여부
+
+    Returns:
+        다운로드된 파일 경로 리스트
+    """
+    if not email:
+      email = os.getenv('MEDIUM_EMAIL')
+
+    if not email:
+      raise ValueError("이메일 주소가 제공되지 않았습니다.")
+
+    os.makedirs(download_path, exist_ok=True)
+    ledger = MessageLedger(download_path)
+
+    query_parts = [f'from:{sender_email}', f'to:{email}']
+    if search_query:
+      query_parts.append(search_query)
+    query = ' '.join(query_parts)
+
+    # 1. 모든 페이지를 순회하며 미처리 메시지의 링크 수집
+    # (Gmail API 클라이언트는 스레드 안전하지 않으므로 이 단계는 현재 스레드에서만 수행)
+    logger.info("Gmail에서 Medium 리스트 이메일 백로그 수집 중...")
+    pending = {}
+    skipped = 0
+    try:
+      for message_id in self._iter_message_ids(query):
+        if message_id in ledger:
+          skipped += 1
+          continue
+        msg = self.service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='full'
+        ).execute()
+        body_text = self._extract_body_from_message(msg)
+        body_html = self._extract_html_from_message(msg)
+        links = self._extract_links_from_message(body_text, body_html)
+        if links:
+          pending[message_id] = links
+        else:
+          logger.debug(f"다운로드 링크가 없는 메시지: {message_id}")
+    except HttpError as error:
+      logger.error(f'Gmail API 오류 발생: {error}')
+      if not pending:
+        return []
+
+    total_links = sum(len(links) for links in pending.values())
+    logger.info(f"미처리 메시지 {len(pending)}개, 다운로드 링크 {total_links}개 (이미 처리: {skipped}개)")
+    if not pending:
+      return []
+
+    # 2. 링크를 병렬로 다운로드 (같은 링크는 한 번만)
+    if browser_page:
+      downloader = ResumableDownloader.from_browser_context(browser_page.context, download_path)
+    else:
+      downloader = ResumableDownloader(download_path)
+      downloader.session.headers['Referer'] = 'https://medium.com/'
+
+    unique_links = list(dict.fromkeys(link for links in pending.values() for link in links))
+    results = {}
+
+    def _download(link):
+      try:
+        return downloader.download(link)
+      except DownloadError as e:
+        logger.warning(f"다운로드 실패: {link} ({e})")
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='medium-download') as executor:
+      for link, file_path in zip(unique_links, executor.map(_download, unique_links)):
+        results[link] = file_path
+
+    # Playwright 페이지는 스레드 간에 공유할 수 없으므로 브라우저 대체 다운로드는 순차 처리
+    if browser_page:
+      for link in unique_links:
+        if not results[link]:
+          results[link] = self._download_with_browser(link, downloader, browser_page)
+
+    # 3. 모든 링크가 받아진 메시지만 처리 완료로 기록
+    downloaded = []
+    for message_id, links in pending.items():
+      file_paths = [results[link] for link in links]
+      if not all(file_paths):
+        logger.warning(f"일부 다운로드 실패로 다음 실행에서 재시도합니다: {message_id}")
+        continue
+
+      ledger.mark_processed(message_id, links, file_paths)
+      downloaded.extend(file_paths)
+      if mark_as_read:
+        try:
+          self.service.users().messages().modify(
+              userId='me',
+              id=message_id,
+              body={'removeLabelIds': ['UNREAD']}
+          ).execute()
+        except HttpError as e:
+          logger.warning(f"읽음 처리 실패 ({message_id}): {e}")
+
+    logger.info(f"백로그 처리 완료: 파일 {len(set(downloaded))}개")
+    return list(dict.fromkeys(downloaded))
+
+
+class VerificationCodeDispatcher:
+  """
+  여러 Medium 계정의 로그인 인증 코드를 하나의 폴링 루프로 받아 분배합니다.
+
+  각 로그인이 `to:{email}` 쿼리로 따로 폴링하면 API 호출이 계정 수만큼 늘고,
+  UNREAD 라벨을 두고 경쟁하여 다른 로그인의 코드를 소비할 수 있습니다.
+  디스패처는 수신자 주소와 도착 시각을 기준으로 대기 중인 로그인(Future)에 코드를 전달합니다.
+
+  Gmail API 클라이언트는 스레드 안전하지 않으므로 전달받은 GmailChecker는
+  디스패처의 폴링 스레드에서만 사용해야 합니다.
+  """
+
+  # 메일 도착 시각과 코드 요청 시각 사이의 허용 오차 (초, 서버 간 시계 차이)
+  CLOCK_SKEW = 5
+
+  def __init__(self, gmail_checker=None, sender_email=None, poll_interval=3):
+    self.gmail_checker = gmail_checker or GmailChecker()
+    self.sender_email = sender_email or os.getenv('SENDER_EMAIL', 'noreply@medium.com')
+    self.poll_interval = poll_interval
+    self._waiters = {}  # 수신자 주소 → [(요청 시각, Future), ...]
+    self._parsed = {}  # 메시지 ID → (수신자 주소 목록, 도착 시각, 코드)
+    self._condition = threading.Condition()
+    self._stopped = False
+    self._thread = None
+
+  def start(self):
+    """폴링 스레드를 시작합니다."""
+    with self._condition:
+      if self._thread and self._thread.is_alive():
+        return self
+      self._stopped = False
+      self._thread = threading.Thread(target=self._poll_loop, name='gmail-code-dispatcher', daemon=True)
+      self._thread.start()
+    return self
+
+  def stop(self):
+    """폴링 스레드를 멈추고 대기 중인 요청을 취소합니다."""
+    with self._condition:
+      self._stopped = True
+      for waiters in self._waiters.values():
+        for _, future in waiters:
+          future.cancel()
+      self._waiters.clear()
+      self._condition.notify_all()
+    if self._thread:
+      self._thread.join(timeout=self.poll_interval * 2)
+
+  def request_code(self, email, since=None):
+    """
+    인증 코드를 요청합니다.
+
+    Args:
+        email: 로그인 중인 Medium 계정 이메일 (메일 수신자)
+        since: 코드 요청(Continue 클릭) 시각 (epoch 초), 이보다 오래된 메일은 무시
+
+    Returns:
+        인증 코드 문자열로 완료되는 Future
+    """
+    future = Future()
+    with self._condition:
+      self._waiters.setdefault(email.lower(), []).append((since or time.time(), future))
+      self._condition.notify_all()
+    self.start()
+    return future
+
+  def wait_for_code(self, email, since=None, timeout=60):
+    """
+    인증 코드가 도착할 때까지 기다립니다.
+
+    Returns:
+        인증 코드 문자열, 시간 내에 도착하지 않으면 None
+    """
+    future = self.request_code(email, since=since)
+    try:
+      return future.result(timeout=timeout)
+    except FutureTimeoutError:
+      logger.warning(f"인증 코드 대기 시간 초과: {email}")
+      self._discard(email.lower(), future)
+      return None
+    except CancelledError:
+      return None
+
+  def _discard(self, address, future):
+    with self._condition:
+      waiters = self._waiters.get(address, [])
+      self._waiters[address] = [w for w in waiters if w[1] is not future]
+      if not self._waiters[address]:
+        del self._waiters[address]
+    future.cancel()
+
+  def _poll_loop(self):
+    while True:
+      with self._condition:
+        # 대기 중인 로그인이 없으면 API를 호출하지 않고 쉼
+        while not self._stopped and not self._waiters:
+          self._condition.wait()
+        if self._stopped:
+          return
+
+      try:
+        self._poll_once()
+      except HttpError as error:
+        logger.error(f'Gmail API 오류 발생: {error}')
+      except Exception as e:
+        logger.exception(f"인증 코드 폴링 중 오류: {e}")
+
+      with self._condition:
+        if self._stopped:
+          return
+        self._condition.wait(timeout=self.poll_interval)
+
+  def _poll_once(self):
+    """안 읽은 인증 코드 메일을 한 번 조회하고, 대기 중인 로그인에 분배합니다."""
+    service = self.gmail_checker.service
+    query = f'from:{self.sender_email} is:unread "Your login code is" newer_than:1d'
+    results = service.users().messages().list(userId='me', q=query, maxResults=50).execute()
+    message_ids = [m['id'] for m in results.get('messages', [])]
+
+    for message_id in message_ids:
+      if message_id not in self._parsed:
+        msg = service.users().messages().get(userId='me', id=message_id, format='full').execute()
+        headers = {h['name'].lower(): h['value'] for h in msg['payload'].get('headers', [])}
+        recipients = [addr.lower() for _, addr in getaddresses(
+            [headers.get('to', ''), headers.get('delivered-to', '')]) if addr]
+        received_at = int(msg.get('internalDate', 0)) / 1000
+        self._parsed[message_id] = (recipients, received_at, self.gmail_checker._extract_code_from_message(msg))
+
+    # 오래된 메일부터 분배 (같은 계정의 재요청 시 먼저 온 코드가 먼저 대기한 로그인에게 가도록)
+    for message_id in sorted(message_ids, key=lambda mid: self._parsed[mid][1]):
+      recipients, received_at, code = self._parsed[message_id]
+      if not code:
+        continue
+      future = self._claim_waiter(recipients, received_at)
+      if not future:
+        continue
+      try:
+        service.users().messages().modify(
+            userId='me', id=message_id, body={'removeLabelIds': ['UNREAD']}).execute()
+      except HttpError as e:
+        logger.warning(f"읽음 처리 실패 ({message_id}): {e}")
+      del self._parsed[message_id]
+      try:
+        future.set_result(code)
+        logger.info(f"인증 코드 전달: {', '.join(recipients)}")
+      except InvalidStateError:
+        # 전달 직전에 대기 시간이 초과된 경우
+        logger.debug(f"인증 코드를 받을 로그인이 이미 종료됨: {', '.join(recipients)}")
+
+    # 목록에서 사라진(읽음 처리된) 메시지의 캐시 정리
+    for message_id in set(self._parsed) - set(message_ids):
+      del self._parsed[message_id]
+
+  def _claim_waiter(self, recipients, received_at):
+    """수신자와 도착 시각이 맞는 가장 먼저 대기한 요청을 꺼냅니다."""
+    with self._condition:
+      for address in recipients:
+        waiters = self._waiters.get(address)
+        if not waiters:
+          continue
+        for index, (since, future) in enumerate(waiters):
+          if received_at + self.CLOCK_SKEW >= since and not future.cancelled():
+            del waiters[index]
+            if not waiters:
+              del self._waiters[address]
+            return future
+    return None
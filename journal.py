@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from config import load_env
+from utils import extract_post_id
+
+load_env()
+
+# URL 상태
+STATUS_PENDING = 'pending'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+  url TEXT PRIMARY KEY,
+  post_id TEXT,
+  source TEXT,
+  metadata TEXT,
+  status TEXT NOT NULL DEFAULT 'pending',
+  outcome TEXT,
+  error TEXT,
+  output_path TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  enqueued_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_status ON urls (status, enqueued_at);
+CREATE TABLE IF NOT EXISTS feeds (
+  url TEXT PRIMARY KEY,
+  etag TEXT,
+  last_modified TEXT,
+  checked_at TEXT NOT NULL
+);
+"""
+
+
+def _now():
+  return datetime.now().isoformat(timespec='seconds')
+
+
+class CrawlJournal:
+  """
+  크롤링 대상 URL과 처리 결과를 기록하는 로컬 큐 (SQLite)
+
+  urls.txt, Medium export 아카이브 등 여러 입력에서 들어온 URL을 한 곳에 모으고,
+  URL별 상태(pending/done/failed)와 결과를 남겨 재실행 시 이어서 처리할 수 있게 합니다.
+  """
+
+  def __init__(self, path=None):
+    self.path = path or os.getenv('CRAWL_JOURNAL', os.path.join('output', 'crawl_journal.sqlite3'))
+    Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(self.path, check_same_thread=False)
+    self._conn.row_factory = sqlite3.Row
+    with self._conn:
+      self._conn.executescript(_SCHEMA)
+      self._migrate()
+
+  def _migrate(self):
+    """post_id 열이 없던 이전 journal에 열을 추가하고 기존 URL의 post ID를 채웁니다."""
+    columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(urls)')}
+    if 'post_id' not in columns:
+      self._conn.execute('ALTER TABLE urls ADD COLUMN post_id TEXT')
+      self._conn.create_function('extract_post_id', 1, extract_post_id, deterministic=True)
+      self._conn.execute('UPDATE urls SET post_id = extract_post_id(url)')
+    self._conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_post_id ON urls (post_id)')
+
+  def close(self):
+    self._conn.close()
+
+  def enqueue(self, url, source=None, metadata=None, requeue=False):
+    """
+    URL을 큐에 추가합니다.
+
+    Args:
+        url: 크롤링할 URL
+        source: URL 출처 (예: 'urls.txt', 'export:bookmarks')
+        metadata: 출처에서 얻은 부가 정보 딕셔너리
+        requeue: 이미 처리된 URL이어도 다시 pending으로 되돌릴지 여부
+
+    Returns:
+        새로 추가(또는 재대기)되었으면 True
+    """
+    return self.enqueue_many([(url, source, metadata)], requeue=requeue) > 0
+
+  def enqueue_many(self, entries, requeue=False):
+    """
+    여러 URL을 한 트랜잭션으로 큐에 추가합니다.
+
+    Args:
+        entries: (url, source, metadata) 튜플 이터러블
+        requeue: 이미 처리된 URL이어도 다시 pending으로 되돌릴지 여부
+
+    Returns:
+        새로 추가(또는 재대기)된 URL 수
+    """
+    now = _now()
+    added = 0
+    with self._lock, self._conn:
+      for url, source, metadata in entries:
+        cursor = self._conn.execute(
+            'INSERT OR IGNORE INTO urls (url, post_id, source, metadata, enqueued_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (url, extract_post_id(url), source, json.dumps(metadata, ensure_ascii=False) if metadata else None,
+             now, now))
+        if cursor.rowcount:
+          added += 1
+        elif requeue:
+          cursor = self._conn.execute(
+              'UPDATE urls SET status = ?, updated_at = ? WHERE url = ? AND status != ?',
+              (STATUS_PENDING, now, url, STATUS_PENDING))
+          added += cursor.rowcount
+    return added
+
+  def pending_urls(self, limit=None):
+    """처리 대기 중인 URL 리스트 (추가된 순서)"""
+    query = 'SELECT url FROM urls WHERE status = ? ORDER BY enqueued_at, rowid'
+    params = [STATUS_PENDING]
+    if limit:
+      query += ' LIMIT ?'
+      params.append(limit)
+    with self._lock:
+      return [row['url'] for row in self._conn.execute(query, params)]
+
+  def iter_pending(self, batch_size=1000):
+    """
+    처리 대기 중인 URL을 batch_size개씩 읽어 하나씩 내보냅니다 (전체 목록을 메모리에 올리지 않음).
+
+    추가된 순서(rowid)로 읽으며, 순회 중에 처리 결과가 기록되어도 다음 묶음 위치가 흔들리지 않습니다.
+    idx_urls_status로는 rowid 순서를 얻지 못해 묶음마다 정렬하게 되므로, rowid 범위로 이어서 훑습니다 (전체 한 번).
+    """
+    last_rowid = 0
+    while True:
+      with self._lock:
+        rows = self._conn.execute(
+            'SELECT rowid, url FROM urls NOT INDEXED WHERE status = ? AND rowid > ? ORDER BY rowid LIMIT ?',
+            (STATUS_PENDING, last_rowid, batch_size)).fetchall()
+      if not rows:
+        return
+      last_rowid = rows[-1]['rowid']
+      for row in rows:
+        yield row['url']
+
+  def get(self, url):
+    """URL의 기록을 딕셔너리로 반환합니다 (없으면 None)."""
+    with self._lock:
+      row = self._conn.execute('SELECT * FROM urls WHERE url = ?', (url,)).fetchone()
+    if not row:
+      return None
+    entry = dict(row)
+    entry['metadata'] = json.loads(entry['metadata']) if entry['metadata'] else {}
+    return entry
+
+  def known_post_ids(self, post_ids):
+    """
+    주어진 post ID 중 큐에 (URL 형태와 상관없이) 이미 있는 것을 반환합니다.
+
+    urls.txt 등은 URL을 받은 그대로(?source= 쿼리, 커스텀 도메인 포함) 기록하므로 URL 문자열 대신 post ID로 비교합니다.
+
+    Returns:
+        이미 있는 post ID 집합
+    """
+    post_ids = list({post_id for post_id in post_ids if post_id})
+    known = set()
+    with self._lock:
+      # SQLite 바인딩 변수 수 제한을 넘지 않도록 나눠 조회
+      for start in range(0, len(post_ids), 500):
+        chunk = post_ids[start:start + 500]
+        rows = self._conn.execute(
+            f"SELECT DISTINCT post_id FROM urls WHERE post_id IN ({','.join('?' * len(chunk))})", chunk)
+        known.update(row['post_id'] for row in rows)
+    return known
+
+  def __contains__(self, url):
+    with self._lock:
+      return self._conn.execute('SELECT 1 FROM urls WHERE url = ?', (url,)).fetchone() is not None
+
+  def mark_done(self, url, output_path=None, outcome='ok', source=None):
+    """
+    URL 처리 완료를 기록합니다. 큐에 없던 URL이면 새로 추가합니다.
+
+    Args:
+        url: 처리한 URL
+        output_path: 저장된 결과 파일 경로
+        outcome: 처리 결과 구분
+        source: 큐에 없던 URL일 때 기록할 출처
+    """
+    now = _now()
+    with self._lock, self._conn:
+      self._conn.execute(
+          'INSERT INTO urls (url, post_id, source, status, outcome, output_path, attempts, enqueued_at, updated_at) '
+          'VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?) '
+          'ON CONFLICT(url) DO UPDATE SET status = excluded.status, outcome = excluded.outcome, '
+          'output_path = excluded.output_path, error = NULL, attempts = attempts + 1, '
+          'updated_at = excluded.updated_at',
+          (url, extract_post_id(url), source, STATUS_DONE, outcome, output_path, now, now))
+
+  def mark_failed(self, url, error, outcome='error'):
+    """URL 처리 실패를 기록합니다."""
+    now = _now()
+    with self._lock, self._conn:
+      self._conn.execute(
+          'UPDATE urls SET status = ?, outcome = ?, error = ?, attempts = attempts + 1, updated_at = ? '
+          'WHERE url = ?',
+          (STATUS_FAILED, outcome, str(error), now, url))
+
+  def feed_state(self, feed_url):
+    """피드의 마지막 조건부 요청 정보 {'etag', 'last_modified', 'checked_at'} (없으면 None)"""
+    with self._lock:
+      row = self._conn.execute('SELECT etag, last_modified, checked_at FROM feeds WHERE url = ?',
+                               (feed_url,)).fetchone()
+    return dict(row) if row else None
+
+  def save_feed_state(self, feed_url, etag=None, last_modified=None):
+    """피드 응답의 ETag/Last-Modified를 기록합니다 (다음 요청에서 If-None-Match/If-Modified-Since로 사용)."""
+    with self._lock, self._conn:
+      self._conn.execute(
+          'INSERT INTO feeds (url, etag, last_modified, checked_at) VALUES (?, ?, ?, ?) '
+          'ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, '
+          'checked_at = excluded.checked_at',
+          (feed_url, etag, last_modified, _now()))
+
+  def counts(self):
+    """상태별 URL 수"""
+    with self._lock:
+      rows = self._conn.execute('SELECT status, COUNT(*) AS n FROM urls GROUP BY status').fetchall()
+    return {row['status']: row['n'] for row in rows}
@@ -0,0 +1,132 @@
+import logging
+import os
+
+from config import load_env
+from metrics import REGISTRY
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 기사 끝까지 필요한 만큼만 스크롤하며 지연 로딩 콘텐츠를 불러옵니다 (page.evaluate가 Promise 완료까지 대기).
+#  - 한 화면씩 스크롤하고, IntersectionObserver로 화면 근처에 들어온 이미지의 load/error를 기다림
+#  - MutationObserver로 기사 DOM 변경을 추적해, 기사 끝에 도달한 뒤 quietMs 동안 변경이 없으면 종료
+#  - 끝에 도달한 뒤 DOM이 자라면 다시 스크롤을 이어감
+_LAZY_LOAD_JS = """
+async ({quietMs, maxMs, imageTimeoutMs}) => {
+  const started = performance.now();
+  const root = document.querySelector('article.meteredContent') || document.querySelector('article') || document.body;
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+  const nextFrame = () => new Promise((resolve) => requestAnimationFrame(() => resolve()));
+
+  let lastMutation = performance.now();
+  const mutations = new MutationObserver(() => { lastMutation = performance.now(); });
+  mutations.observe(root, {childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset']});
+
+  const loading = new Set();
+  let images = 0;
+  const waitImage = (img) => {
+    if (img.complete && img.naturalWidth) return;
+    images += 1;
+    const done = new Promise((resolve) => {
+      img.addEventListener('load', resolve, {once: true});
+      img.addEventListener('error', resolve, {once: true});
+      setTimeout(resolve, imageTimeoutMs);
+    }).then(() => loading.delete(done));
+    loading.add(done);
+  };
+  const visibility = new IntersectionObserver((entries) => {
+    for (const entry of entries) {
+      if (entry.isIntersecting) {
+        visibility.unobserve(entry.target);
+        waitImage(entry.target);
+      }
+    }
+  }, {rootMargin: '200px 0px'});
+  const tracked = new WeakSet();
+  const track = () => {
+    for (const img of root.querySelectorAll('img')) {
+      if (!tracked.has(img)) {
+        tracked.add(img);
+        visibility.observe(img);
+      }
+    }
+  };
+
+  let steps = 0;
+  let timedOut = false;
+  try {
+    while (true) {
+      if (performance.now() - started > maxMs) {
+        timedOut = true;
+        break;
+      }
+      track();
+      const beforeScroll = window.scrollY;
+      if (root.getBoundingClientRect().bottom > window.innerHeight) {
+        window.scrollBy(0, Math.max(window.innerHeight * 0.9, 200));
+      }
+      if (window.scrollY !== beforeScroll) {
+        steps += 1;
+        await nextFrame();
+        if (loading.size) {
+          await Promise.race([Promise.all(loading), sleep(quietMs)]);
+        }
+        continue;
+      }
+      // 기사 끝(또는 문서 끝)에 도달: 이미지 로드와 DOM 정지를 기다림
+      await nextFrame();
+      if (loading.size) {
+        await Promise.race([Promise.all(loading), sleep(Math.max(maxMs - (performance.now() - started), 0))]);
+      }
+      const idle = performance.now() - lastMutation;
+      if (idle >= quietMs) {
+        break;
+      }
+      await sleep(quietMs - idle);
+    }
+  } finally {
+    mutations.disconnect();
+    visibility.disconnect();
+    window.scrollTo(0, 0);
+  }
+  return {
+    steps,
+    images,
+    pendingImages: loading.size,
+    height: Math.round(root.getBoundingClientRect().height),
+    elapsedMs: Math.round(performance.now() - started),
+    timedOut,
+  };
+}
+"""
+
+
+def load_lazy_content(page, quiet_ms=None, max_seconds=None, image_timeout_ms=3000):
+  """
+  기사의 지연 로딩 콘텐츠를 불러오고 맨 위로 돌아옵니다.
+
+  고정 횟수 스크롤과 sleep 대신 기사 길이만큼만 스크롤하고, 기사 DOM이 quiet_ms 동안
+  변하지 않으면 바로 끝나므로 짧은 글은 빠르게, 긴 글은 끝까지 불러옵니다.
+
+  Args:
+      page: Playwright Page
+      quiet_ms: 기사 끝에 도달한 뒤 DOM 변경이 없어야 하는 시간 (기본값: LAZY_LOAD_QUIET_MS 또는 500)
+      max_seconds: 전체 최대 시간 (기본값: LAZY_LOAD_MAX_SECONDS 또는 20)
+      image_timeout_ms: 이미지 하나의 로드를 기다리는 최대 시간
+
+  Returns:
+      {'steps', 'images', 'pendingImages', 'height', 'elapsedMs', 'timedOut'} 딕셔너리
+  """
+  quiet_ms = int(quiet_ms if quiet_ms is not None else os.getenv('LAZY_LOAD_QUIET_MS', '500'))
+  max_seconds = float(max_seconds if max_seconds is not None else os.getenv('LAZY_LOAD_MAX_SECONDS', '20'))
+  result = page.evaluate(_LAZY_LOAD_JS, {'quietMs': quiet_ms, 'maxMs': int(max_seconds * 1000),
+                                         'imageTimeoutMs': image_timeout_ms})
+  REGISTRY.observe('lazy_load_scroll_steps', result['steps'])
+  if result['timedOut']:
+    REGISTRY.inc('lazy_load_timeouts_total')
+    logger.warning(f"지연 로딩 대기 시간 초과 ({max_seconds:.0f}s, 로드 중인 이미지 {result['pendingImages']}개)")
+  elif __debug__:
+    logger.debug(f"지연 로딩 완료: 스크롤 {result['steps']}회, 이미지 {result['images']}개, "
+                 f"높이 {result['height']}px, {result['elapsedMs']}ms")
+  return result
@@ -0,0 +1,99 @@
+import copy
+import json
+import logging
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# 큐가 계속 차 있어도 이 개수/시간마다 한 번은 flush
+FLUSH_EVERY_RECORDS = 256
+FLUSH_INTERVAL = 1.0
+
+# JSON 로그에 넣지 않을 LogRecord 기본 속성 (extra로 넘긴 필드만 추가로 기록)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class _BatchedFlushMixin:
+  """emit마다 flush하지 않고, 리스너가 큐를 비웠을 때 한꺼번에 flush합니다."""
+
+  def flush(self):
+    pass
+
+  def flush_batch(self):
+    super().flush()
+
+  def close(self):
+    self.flush_batch()
+    super().close()
+
+
+class BatchedStreamHandler(_BatchedFlushMixin, logging.StreamHandler):
+  pass
+
+
+class BatchedTimedRotatingFileHandler(_BatchedFlushMixin, TimedRotatingFileHandler):
+  pass
+
+
+class BatchingQueueListener(QueueListener):
+  """백그라운드 스레드에서 로그를 쓰고, 큐가 비거나 일정량/시간이 지나면 flush합니다."""
+
+  def __init__(self, log_queue, *handlers):
+    super().__init__(log_queue, *handlers, respect_handler_level=True)
+    self._pending = 0
+    self._last_flush = time.monotonic()
+
+  def _flush_handlers(self):
+    for handler in self.handlers:
+      handler.flush_batch()
+    self._pending = 0
+    self._last_flush = time.monotonic()
+
+  def stop(self):
+    super().stop()
+    self._flush_handlers()
+
+  def handle(self, record):
+    # 기록을 쓴 뒤에 세어야 큐가 빈 순간의 마지막 기록까지 flush됨
+    super().handle(record)
+    self._pending += 1
+    if (self._pending >= FLUSH_EVERY_RECORDS or self.queue.empty()
+        or time.monotonic() - self._last_flush >= FLUSH_INTERVAL):
+      self._flush_handlers()
+
+
+class JsonLinesFormatter(logging.Formatter):
+  """로그 한 줄을 JSON 객체 하나로 기록합니다 (extra로 넘긴 필드 포함)."""
+
+  def format(self, record):
+    entry = {
+        'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+        'level': record.levelname,
+        'logger': record.name,
+        'thread': record.threadName,
+        'message': record.getMessage(),
+    }
+    for key, value in vars(record).items():
+      if key not in _RECORD_ATTRS and not key.startswith('_'):
+        entry[key] = value
+    if record.exc_info:
+      entry['exc_info'] = self.formatException(record.exc_info)
+    elif record.exc_text:
+      entry['exc_info'] = record.exc_text
+    return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(QueueHandler):
+  """
+  기본 QueueHandler.prepare()는 예외 traceback을 메시지에 합쳐 버립니다.
+  JSON 형식에서 예외를 별도 필드로 남기도록 메시지 인자만 합치고 예외는 exc_text로 보존합니다.
+  """
+
+  def prepare(self, record):
+    record = copy.copy(record)
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+      record.exc_text = logging.Formatter().formatException(record.exc_info)
+      record.exc_info = None
+    return record
@@ -1,15 +1,14 @@
 import argparse
 import os
 import sys
-
-from dotenv import load_dotenv
+import threading
+import time
 
 from config import get_logger, setup_logging
-from crawler import MediumCrawler
-from gmail_checker import GmailChecker
-from utils import read_urls_from_file, save_all_crawled_data, save_crawled_data
 
-load_dotenv()
+# Playwright, Google API 클라이언트, lxml 등 무거운 의존성은 import 비용이 크므로
+# 모듈 로드 시점이 아니라 해당 모드에서 필요할 때 import 합니다.
+# (--help, 잘못된 인자, Gmail이 필요 없는 모드의 시작 시간을 줄이기 위함, benchmarks/startup.py 참고)
 
 
 def show_menu():
@@ -43,6 +42,26 @@ def main():
   parser.add_argument('--debug', action='store_true', help='디버그 모드 활성화')
   parser.add_argument('--mode', type=int, choices=[1, 2, 3],
                       help='작업 모드: 1=로그인만, 2=로그인+크롤링, 3=Gmail 리스트 다운로드')
+  parser.add_argument('--backlog', action='store_true',
+                      help='모드 3에서 대기 중인 모든 다운로드 이메일을 한 번에 처리')
+  parser.add_argument('--serve', action='store_true',
+                      help='로그인된 브라우저를 유지하며 로컬 작업 API로 크롤링 요청을 받는 서비스 모드')
+  parser.add_argument('--host', default=os.getenv('SERVICE_HOST', '127.0.0.1'), help='서비스 모드 바인드 주소')
+  parser.add_argument('--port', type=int, default=int(os.getenv('SERVICE_PORT', '8765')), help='서비스 모드 포트')
+  parser.add_argument('--socket', default=os.getenv('SERVICE_SOCKET'),
+                      help='서비스 모드에서 TCP 대신 사용할 Unix 소켓 경로')
+  parser.add_argument('--job-store', default=os.getenv('JOB_STORE'),
+                      help='여러 노드가 공유하는 작업 테이블 URI (sqlite:///경로, postgresql://..., postgres)')
+  parser.add_argument('--enqueue', action='store_true',
+                      help='urls.txt의 URL을 공유 작업 테이블에 추가하고 종료 (로그인 불필요)')
+  parser.add_argument('--node', action='store_true',
+                      help='공유 작업 테이블에서 URL을 임대받아 크롤링하는 노드 모드')
+  parser.add_argument('--launch-browser', action='store_true',
+                      help='크롤러 프로세스들이 CDP_ENDPOINT로 연결해 함께 쓰는 Chromium을 띄우고 감시 (Ctrl+C로 종료)')
+  parser.add_argument('--discover', action='store_true',
+                      help='DISCOVERY_FEEDS의 RSS 피드에서 새 기사를 찾아 크롤링 큐에 추가하고 종료 (로그인 불필요)')
+  parser.add_argument('--profile', action='store_true',
+                      help='모드 2 크롤링을 cProfile/tracemalloc으로 프로파일링 (결과: PROFILE_DIR)')
   args = parser.parse_args()
 
   # 로깅 설정
@@ -53,6 +72,25 @@ def main():
   logger.info("Medium Crawler 시작")
   logger.info("=" * 50)
 
+  # 공유 브라우저 런처 (로그인 불필요)
+  if args.launch_browser:
+    from browser_launcher import run_launcher
+    run_launcher()
+    return
+
+  # 피드에서 새 기사 찾기 (로그인 불필요, DISCOVERY_INTERVAL이 있으면 반복)
+  if args.discover:
+    from discovery import run_discovery
+    from journal import CrawlJournal
+
+    journal = CrawlJournal()
+    try:
+      run_discovery(journal)
+      logger.info(f"크롤링 큐 상태: {journal.counts()}")
+    finally:
+      journal.close()
+    return
+
   # 환경 변수 확인 (필수: MEDIUM_EMAIL)
   email = os.getenv('MEDIUM_EMAIL')
   if not email:
@@ -62,8 +100,43 @@ def main():
 
   logger.debug(f"이메일: {email}")
 
-  # 메뉴 선택 (명령줄 인자가 없으면 대화형 메뉴 표시)
-  if args.mode:
+  # 공유 작업 테이블에 URL 추가 (로그인 불필요)
+  if args.enqueue:
+    from coordinator import open_job_store
+    from url_source import UrlSource, batched, prefetch
+
+    store = open_job_store(args.job_store)
+    try:
+      added = 0
+      for batch in batched(prefetch(UrlSource(os.getenv('URLS_FILE', 'urls.txt').split())), 1000):
+        added += store.add_urls(batch)
+      logger.info(f"작업 테이블에 URL {added}개 추가 (상태: {store.counts()})")
+    finally:
+      store.close()
+    return
+
+  # 서비스 모드: 브라우저를 띄워 둔 채 작업 API로 요청을 받음
+  if args.serve:
+    from service import CrawlerService, serve
+
+    service = CrawlerService(
+        email=email,
+        workers=int(os.getenv('SERVICE_WORKERS', '1')),
+        max_queued_jobs=int(os.getenv('SERVICE_MAX_QUEUED_JOBS', '100')),
+        headless=os.getenv('SERVICE_HEADLESS', 'true').lower() != 'false'
+    )
+    try:
+      serve(service, host=args.host, port=args.port, socket_path=args.socket)
+    except RuntimeError as e:
+      logger.error(str(e))
+      sys.exit(1)
+    logger.info("프로그램 종료.")
+    return
+
+  # 메뉴 선택 (명령줄 인자가 없으면 대화형 메뉴 표시, 노드 모드는 로그인 후 크롤링이므로 모드 2로 취급)
+  if args.node:
+    mode = 2
+  elif args.mode:
     mode = args.mode
   else:
     mode = show_menu()
@@ -72,6 +145,11 @@ def main():
 
   # 모드 3: Gmail을 통해 Medium 리스트 다운로드 (로그인 필요)
   if mode == 3:
+    from archive_ingester import ingest_export_archives
+    from crawler import MediumCrawler
+    from gmail_checker import GmailChecker
+    from journal import CrawlJournal
+
     logger.info("Gmail을 통해 Medium 리스트 다운로드 시작...")
     logger.info("=" * 50)
 
@@ -107,15 +185,31 @@ def main():
       search_query = 'subject:"Medium download request"'
 
       # 로그인된 브라우저 페이지를 전달하여 다운로드
-      result = gmail_checker.get_medium_list(
-          email=email,
-          sender_email=sender_email,
-          download_path=download_path,
-          search_query=search_query,
-          browser_page=crawler.page
-      )
+      if args.backlog:
+        result = gmail_checker.drain_medium_list_backlog(
+            email=email,
+            sender_email=sender_email,
+            download_path=download_path,
+            search_query=search_query,
+            browser_page=crawler.page,
+            max_workers=int(os.getenv('DOWNLOAD_WORKERS', '4'))
+        )
+      else:
+        result = gmail_checker.get_medium_list(
+            email=email,
+            sender_email=sender_email,
+            download_path=download_path,
+            search_query=search_query,
+            browser_page=crawler.page
+        )
       if result:
         logger.info(f"다운로드 완료: {result}")
+        # export 아카이브를 읽어 기사 링크는 크롤링 큐에, 본인 글은 바로 출력으로
+        journal = CrawlJournal()
+        stats = ingest_export_archives(result, journal)
+        logger.info(f"크롤링 큐에 추가된 URL: {stats['queued']}개 (대기 중: {journal.counts().get('pending', 0)}개)")
+        logger.info(f"export에서 바로 저장된 본인 글: {stats['posts']}개")
+        journal.close()
       else:
         logger.warning("다운로드할 항목을 찾을 수 없습니다.")
     except Exception as e:
@@ -127,7 +221,28 @@ def main():
     logger.info("프로그램 종료.")
     return
 
+  # 모드 1 (여러 계정): MEDIUM_EMAILS의 모든 계정을 동시에 로그인 테스트
+  accounts = [e.strip() for e in os.getenv('MEDIUM_EMAILS', '').split(',') if e.strip()]
+  if mode == 1 and len(accounts) > 1:
+    from crawler import login_accounts_concurrently
+    from gmail_checker import VerificationCodeDispatcher
+
+    logger.info(f"{len(accounts)}개 계정 동시 로그인 테스트 시작...")
+    dispatcher = VerificationCodeDispatcher()
+    try:
+      results = login_accounts_concurrently(accounts, dispatcher)
+    finally:
+      dispatcher.stop()
+    for account, success in results.items():
+      logger.info(f"  {account}: {'성공' if success else '실패'}")
+    if not all(results.values()):
+      sys.exit(1)
+    logger.info("로그인 테스트 완료. 종료합니다.")
+    return
+
   # 모드 1, 2: Medium 로그인 필요
+  from crawler import MediumCrawler
+
   # 크롤러 초기화
   logger.info("크롤러 초기화 중...")
   try:
@@ -153,98 +268,232 @@ def main():
     crawler.close_browser()
     sys.exit(1)
 
+  # 크롤링 단계별 지표 내보내기 (METRICS_PORT, METRICS_SNAPSHOT 설정 시)
+  from metrics import REGISTRY, start_exporters_from_env
+  stop_metrics = start_exporters_from_env()
+
+  # 노드 모드: 공유 작업 테이블에서 URL 묶음을 임대받아 크롤링
+  if args.node:
+    from coordinator import CrawlNode, open_job_store
+
+    store = open_job_store(args.job_store)
+    node = CrawlNode(
+        store,
+        crawler,
+        batch_size=int(os.getenv('NODE_BATCH_SIZE', '10')),
+        lease_seconds=int(os.getenv('NODE_LEASE_SECONDS', '300'))
+    )
+    try:
+      stats = node.run(exit_when_idle=os.getenv('NODE_EXIT_WHEN_IDLE', 'true').lower() != 'false')
+      logger.info(f"노드 처리 결과: 성공 {stats['done']}개, 실패 {stats['failed']}개, 다른 노드로 넘어감 {stats['lost']}개")
+      logger.info(f"단계별 지표:\n{REGISTRY.summary_table()}")
+    finally:
+      stop_metrics()
+      store.close()
+      crawler.close_browser()
+    return
+
   # 모드 1: 로그인만 테스트하고 종료
   if mode == 1:
     logger.info("로그인 테스트 완료. 종료합니다.")
+    stop_metrics()
     crawler.close_browser()
     return
 
-  # 모드 2: 로그인 성공 후 URL 리스트 확인 및 읽기
-  urls_file = os.getenv('URLS_FILE', 'urls.txt')
-  if not os.path.exists(urls_file):
-    logger.warning(f"URL 리스트 파일을 찾을 수 없습니다: {urls_file}")
-    logger.warning("로그인은 성공했지만 크롤링할 URL이 없습니다.")
-    logger.warning(f"'{urls_file}' 파일을 생성하고 크롤링할 URL을 한 줄에 하나씩 입력하세요.")
-    crawler.close_browser()
-    sys.exit(0)
+  # 모드 2: 로그인 성공 후 URL 리스트를 크롤링 큐(journal)에 추가
+  # (urls.txt의 URL은 매번 다시 크롤링하고, export 등으로 들어온 대기 URL도 함께 처리)
+  from journal import CrawlJournal
+  from url_source import UrlSource, enqueue_from_source
+  from utils import AllArticlesWriter, save_crawled_data
 
-  # URL 리스트 읽기
-  logger.info(f"URL 리스트 파일 읽는 중: {urls_file}")
+  journal = CrawlJournal()
+  # 여러 입력은 공백으로 구분 (glob 패턴, .gz/.zst, '-'는 표준 입력)
+  urls_file = os.getenv('URLS_FILE', 'urls.txt')
+  source = UrlSource(urls_file.split())
+  logger.info(f"URL 리스트 읽는 중: {urls_file}")
   try:
-    urls = read_urls_from_file(urls_file)
-    logger.info(f"총 {len(urls)}개의 URL을 찾았습니다.")
-    logger.debug(f"URL 목록: {urls}")
+    enqueue_from_source(journal, source, requeue=True, label=urls_file)
+    logger.info(f"총 {source.stats['unique']}개의 URL을 찾았습니다 (중복 {source.stats['duplicates']}개 제외).")
+  except FileNotFoundError as e:
+    logger.warning(str(e))
   except Exception as e:
     logger.exception(f"URL 리스트 파일 읽기 실패: {e}")
     crawler.close_browser()
     sys.exit(1)
 
-  if not urls:
-    logger.warning("크롤링할 URL이 없습니다.")
+  # 지켜보는 작성자/퍼블리케이션 피드의 새 기사도 함께 처리
+  if os.getenv('DISCOVERY_FEEDS') or os.getenv('DISCOVERY_FEEDS_FILE'):
+    from discovery import discover_once
+    discover_once(journal)
+
+  pending_count = journal.counts().get('pending', 0)
+  if not pending_count:
+    logger.warning("로그인은 성공했지만 크롤링할 URL이 없습니다.")
+    logger.warning(f"'{urls_file}' 파일을 생성하고 크롤링할 URL을 한 줄에 하나씩 입력하세요.")
     crawler.close_browser()
     sys.exit(0)
+  logger.info(f"크롤링 대기 URL: {pending_count}개")
+  # 대기 URL은 묶음 단위로 읽어 처리 (전체 목록을 메모리에 올리지 않음)
+  urls = journal.iter_pending()
 
   # 크롤링 실행
   logger.info("크롤링 시작...")
   logger.info("=" * 50)
 
-  all_data = []
-  success_count = 0
-  error_count = 0
-
-  for i, url in enumerate(urls, 1):
-    logger.info(f"[{i}/{len(urls)}] 크롤링 중: {url}")
+  # 전체 결과는 메모리에 모으지 않고 all_articles.jsonl에 바로 한 줄씩 기록
+  all_articles = AllArticlesWriter(output_dir=os.getenv('OUTPUT_DIR', 'output'))
+  counts = {'started': 0, 'success': 0, 'error': 0}
+  counts_lock = threading.Lock()
+
+  # 응답(댓글)은 로그인한 쿠키로 GraphQL에서 따로 받음 (크롤링과 별도 스레드)
+  response_fetcher = None
+  from responses import ResponseFetcher
+  if ResponseFetcher.enabled():
+    response_fetcher = ResponseFetcher.from_crawler(crawler)
+    logger.info(f"응답 수집 사용: 동시 {response_fetcher.workers}개")
+
+  # 본문 이미지는 크롤링 루프와 별도 스레드에서 받아 내용 해시 기준으로 저장
+  asset_downloader = None
+  from assets import AssetDownloader
+  if AssetDownloader.enabled():
+    asset_downloader = AssetDownloader()
+    logger.info(f"이미지 수집 사용: 동시 {asset_downloader.workers}개 ({asset_downloader.asset_dir})")
+
+  profiler = None
+  if args.profile:
+    from profiling import CrawlProfiler
+    profiler = CrawlProfiler().start()
+    logger.info(f"프로파일링 모드: 결과는 {profiler.output_dir}에 저장됩니다.")
+
+  # 공유 브라우저가 다시 떠서 연결이 끊기면 주 크롤러를 다시 연결할 때 복원할 로그인 세션
+  storage_state = crawler.context.storage_state()
+
+  def _record(key, article_data=None):
+    with counts_lock:
+      counts[key] += 1
+    if article_data is not None:
+      try:
+        all_articles.write(article_data)
+      except OSError as e:
+        logger.error(f"  전체 데이터 기록 오류: {e}")
+
+  def _process(worker, url):
+    """URL 하나를 크롤링하고 저장/기록합니다 (동시 크롤링 시 워커 스레드에서 호출)."""
+    with counts_lock:
+      counts['started'] += 1
+      index = counts['started']
+    logger.info(f"[{index}/{pending_count}] 크롤링 중: {url}")
 
     try:
-      article_data = crawler.crawl_article(url)
+      if profiler:
+        with profiler.article(url):
+          article_data = worker.crawl_article(url)
+      else:
+        article_data = worker.crawl_article(url)
 
       if 'error' in article_data:
-        logger.error(f"  오류: {article_data['error']}")
-        error_count += 1
+        outcome = article_data.get('outcome', 'error')
+        logger.error(f"  오류 [{outcome}]: {article_data['error']}")
+        journal.mark_failed(url, article_data['error'], outcome=outcome)
+        _record('error', article_data)
       else:
         # 개별 파일로 저장
         try:
-          saved_path = save_crawled_data(article_data)
+          with REGISTRY.timer(stage='save'):
+            saved_path = save_crawled_data(article_data)
+          journal.mark_done(url, output_path=saved_path)
           logger.info(f"  저장 완료: {saved_path}")
           logger.debug(f"  크롤링 데이터: {article_data.get('title', 'N/A')}")
-          all_data.append(article_data)
-          success_count += 1
+          # all_articles에 먼저 기록 (이미지 다운로드 스레드가 article_data['images']를 채우기 전 상태로 고정)
+          _record('success', article_data)
+          if response_fetcher:
+            response_fetcher.submit(article_data)
+          if asset_downloader:
+            asset_downloader.submit(article_data, saved_path)
         except Exception as e:
           logger.exception(f"  저장 오류: {e}")
-          error_count += 1
+          journal.mark_failed(url, e)
+          _record('error')
+      return article_data
 
     except Exception as e:
       logger.exception(f"  크롤링 오류: {e}")
       error_data = {
           'url': url,
+          'outcome': 'error',
           'error': str(e)
       }
-      all_data.append(error_data)
-      error_count += 1
+      journal.mark_failed(url, e)
+      _record('error', error_data)
+      return error_data
+    finally:
+      # 주 크롤러(순차 루프, 동시 크롤링의 primary)는 브라우저가 죽거나 공유 브라우저가 다시 떠서 연결이 끊기면
+      # 다시 연결해 남은 URL을 계속 처리 (워커 크롤러는 AdaptiveCrawlPool이 새로 만듦)
+      if worker is crawler and not crawler.is_healthy():
+        logger.warning("브라우저 연결이 끊겼습니다. 다시 연결합니다.")
+        try:
+          crawler.restart_browser(storage_state)
+        except Exception as e:
+          logger.error(f"브라우저 재연결 실패: {e}")
+
+  crawl_delay = float(os.getenv('CRAWL_DELAY', '2'))
+  from concurrency import AIMDController
+  controller = AIMDController.from_env()
+  if controller and profiler:
+    # 프로파일러(SIGPROF 샘플러, 기사별 cProfile)는 메인 스레드 기준이므로 순차 크롤링
+    logger.info("프로파일링 모드에서는 동시 크롤링을 사용하지 않습니다.")
+    controller = None
+
+  if controller:
+    # 동시 크롤링: 워커마다 자기 브라우저를 띄우고 로그인한 세션의 쿠키를 복원
+    from concurrency import AdaptiveCrawlPool
+
+    def _create_worker_crawler():
+      # 워커는 로그인하지 않으므로 GmailChecker를 새로 만들지 않고 주 크롤러의 것을 공유 (Gmail 인증 반복 방지)
+      worker = MediumCrawler(email=email, headless=False, gmail_checker=crawler.gmail_checker)
+      worker.start_browser(storage_state=storage_state)
+      return worker
+
+    logger.info(f"동시 크롤링: {controller.min_limit}~{controller.max_limit}개 페이지 (시작: {controller.limit}개)")
+    AdaptiveCrawlPool(_create_worker_crawler, controller, delay=crawl_delay).run(urls, _process, primary=crawler)
+    if controller.decisions:
+      logger.info("동시성 조절 기록:\n" + '\n'.join(
+          f"  {d['from']} → {d['to']}  ({d['reason']}, 페이지 {d['pages']}개)" for d in controller.decisions))
+  else:
+    for i, url in enumerate(urls, 1):
+      # 다음 URL 크롤링 전 잠시 대기 (서버 부하 방지)
+      if i > 1:
+        time.sleep(crawl_delay)
+      _process(crawler, url)
 
-    # 다음 URL 크롤링 전 잠시 대기 (서버 부하 방지)
-    if i < len(urls):
-      import time
-      time.sleep(2)
+  if response_fetcher:
+    response_fetcher.close()
+  if asset_downloader:
+    asset_downloader.close()
 
   # 모든 데이터를 하나의 파일로도 저장
-  if all_data:
-    try:
-      output_dir = os.getenv('OUTPUT_DIR', 'output')
-      all_data_path = save_all_crawled_data(all_data, output_dir=output_dir)
-      logger.info(f"전체 데이터 저장 완료: {all_data_path}")
-    except Exception as e:
-      logger.exception(f"전체 데이터 저장 오류: {e}")
+  try:
+    all_data_path = all_articles.close()
+    if all_data_path:
+      logger.info(f"전체 데이터 저장 완료: {all_data_path} ({all_articles.count}개)")
+  except Exception as e:
+    logger.exception(f"전체 데이터 저장 오류: {e}")
 
   # 결과 요약
   logger.info("=" * 50)
   logger.info("크롤링 완료")
   logger.info("=" * 50)
-  logger.info(f"성공: {success_count}개")
-  logger.info(f"실패: {error_count}개")
-  logger.info(f"전체: {len(urls)}개")
+  logger.info(f"성공: {counts['success']}개")
+  logger.info(f"실패: {counts['error']}개")
+  logger.info(f"전체: {counts['started']}개")
+  logger.info(f"단계별 지표:\n{REGISTRY.summary_table()}")
+  logger.info(f"선택자 적중 통계:\n{crawler.selector_stats.summary_table()}")
+  if profiler:
+    logger.info(profiler.finish())
 
   # 브라우저 종료
+  stop_metrics()
+  journal.close()
   crawler.close_browser()
   logger.info("프로그램 종료.")
 
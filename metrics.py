@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램별로 보관하는 최대 샘플 수 (넘으면 reservoir sampling으로 대표 샘플 유지)
+MAX_SAMPLES = 10000
+
+
+def _label_key(labels):
+  return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key, extra=None):
+  items = list(label_key) + list((extra or {}).items())
+  if not items:
+    return ''
+  return '{' + ','.join(f'{k}="{str(v)}"' for k, v in items) + '}'
+
+
+def _pick(ordered, q):
+  """정렬된 샘플에서 분위수 q (0~1) 값"""
+  if not ordered:
+    return 0.0
+  return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+class Histogram:
+  """지연 시간 분포 (count/sum과 p50/p95/p99 계산용 샘플)"""
+
+  def __init__(self):
+    self.count = 0
+    self.sum = 0.0
+    self.max = 0.0
+    self._samples = []
+
+  def observe(self, value):
+    self.count += 1
+    self.sum += value
+    self.max = max(self.max, value)
+    if len(self._samples) < MAX_SAMPLES:
+      self._samples.append(value)
+    else:
+      index = random.randrange(self.count)
+      if index < MAX_SAMPLES:
+        self._samples[index] = value
+
+  def percentile(self, q):
+    return _pick(sorted(self._samples), q)
+
+  def snapshot(self):
+    ordered = sorted(self._samples)
+    return {
+        'count': self.count,
+        'sum': self.sum,
+        'mean': self.sum / self.count if self.count else 0.0,
+        'p50': _pick(ordered, 0.5),
+        'p95': _pick(ordered, 0.95),
+        'p99': _pick(ordered, 0.99),
+        'max': self.max,
+    }
+
+
+class MetricsRegistry:
+  """
+  크롤링 파이프라인 지표 저장소
+
+  - 카운터: 바이트 수, 재시도, 선택자 fallback 사용 횟수 등
+  - 히스토그램: 단계별 소요 시간 (time.monotonic 기준)
+  Prometheus 텍스트 형식과 JSON 스냅샷으로 내보낼 수 있습니다.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._counters = {}
+    self._histograms = {}
+    self._help = {}
+    self.started_at = time.time()
+
+  def describe(self, name, help_text):
+    self._help[name] = help_text
+
+  def inc(self, name, value=1, **labels):
+    """카운터를 증가시킵니다."""
+    key = (name, _label_key(labels))
+    with self._lock:
+      self._counters[key] = self._counters.get(key, 0) + value
+
+  def observe(self, name, value, **labels):
+    """히스토그램에 값을 기록합니다."""
+    key = (name, _label_key(labels))
+    with self._lock:
+      histogram = self._histograms.get(key)
+      if histogram is None:
+        histogram = self._histograms[key] = Histogram()
+      histogram.observe(value)
+
+  @contextmanager
+  def timer(self, name='crawl_stage_seconds', **labels):
+    """블록 실행 시간을 히스토그램에 기록합니다 (예외가 나도 기록)."""
+    started = time.monotonic()
+    try:
+      yield
+    finally:
+      self.observe(name, time.monotonic() - started, **labels)
+
+  def reset(self):
+    with self._lock:
+      self._counters.clear()
+      self._histograms.clear()
+      self.started_at = time.time()
+
+  def snapshot(self):
+    """현재 지표를 JSON 직렬화 가능한 딕셔너리로 반환합니다."""
+    with self._lock:
+      counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                  for (name, labels), value in sorted(self._counters.items())]
+      histograms = [{'name': name, 'labels': dict(labels), **histogram.snapshot()}
+                    for (name, labels), histogram in sorted(self._histograms.items())]
+    return {'timestamp': time.time(), 'uptime': time.time() - self.started_at,
+            'counters': counters, 'histograms': histograms}
+
+  def to_prometheus(self):
+    """Prometheus 텍스트 노출 형식 (히스토그램은 summary 타입으로 내보냄)"""
+    lines = []
+    with self._lock:
+      counter_names = sorted({name for name, _ in self._counters})
+      for name in counter_names:
+        if name in self._help:
+          lines.append(f'# HELP {name} {self._help[name]}')
+        lines.append(f'# TYPE {name} counter')
+        for (key_name, labels), value in sorted(self._counters.items()):
+          if key_name == name:
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+      histogram_names = sorted({name for name, _ in self._histograms})
+      for name in histogram_names:
+        if name in self._help:
+          lines.append(f'# HELP {name} {self._help[name]}')
+        lines.append(f'# TYPE {name} summary')
+        for (key_name, labels), histogram in sorted(self._histograms.items()):
+          if key_name != name:
+            continue
+          for q in (0.5, 0.95, 0.99):
+            lines.append(f'{name}{_format_labels(labels, {"quantile": q})} {histogram.percentile(q):.6f}')
+          lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum:.6f}')
+          lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+  def summary_table(self):
+    """실행 종료 시 출력할 요약 표"""
+    snapshot = self.snapshot()
+    lines = []
+    if snapshot['histograms']:
+      lines.append(f"{'stage':<36} {'count':>7} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'total(s)':>9}")
+      for h in snapshot['histograms']:
+        label = ','.join(f'{v}' for v in h['labels'].values()) or h['name']
+        lines.append(f"{label:<36} {h['count']:>7} {h['p50']:>8.3f} {h['p95']:>8.3f} "
+                     f"{h['p99']:>8.3f} {h['sum']:>9.2f}")
+    if snapshot['counters']:
+      lines.append(f"{'counter':<54} {'value':>12}")
+      for c in snapshot['counters']:
+        labels = ','.join(f'{k}={v}' for k, v in c['labels'].items())
+        name = f"{c['name']}{{{labels}}}" if labels else c['name']
+        lines.append(f"{name:<54} {c['value']:>12}")
+    return '\n'.join(lines)
+
+
+# 프로세스 전체에서 공유하는 기본 저장소
+REGISTRY = MetricsRegistry()
+REGISTRY.describe('crawl_stage_seconds', 'Duration of each crawl pipeline stage')
+REGISTRY.describe('crawl_articles_total', 'Crawled articles by result')
+REGISTRY.describe('crawl_bytes_total', 'Response bytes received by the crawler browser')
+REGISTRY.describe('crawl_retries_total', 'Retried operations')
+REGISTRY.describe('download_bytes_total', 'Bytes written by the resumable downloader')
+REGISTRY.describe('selector_fallbacks_total', 'Extractions that needed a fallback selector')
+REGISTRY.describe('lazy_load_scroll_steps', 'Scroll steps needed to load lazy article content')
+REGISTRY.describe('lazy_load_timeouts_total', 'Lazy content loads that hit the time limit')
+REGISTRY.describe('concurrency_adjustments_total', 'Crawl concurrency changes by direction')
+REGISTRY.describe('discovery_feed_requests_total', 'Feed polls by status (ok, not_modified, error)')
+REGISTRY.describe('discovery_items_total', 'Feed items by result (new, seen)')
+REGISTRY.describe('discovery_bytes_total', 'Feed response bytes received by discovery')
+REGISTRY.describe('dedup_articles_total', 'Saved articles by near-duplicate check result')
+REGISTRY.describe('responses_posts_total', 'Response fetches per article by result (updated, unchanged, error)')
+REGISTRY.describe('responses_bytes_total', 'GraphQL response bytes received by the response fetcher')
+REGISTRY.describe('assets_total', 'Article images by result (downloaded, cached, same_content, errors)')
+REGISTRY.describe('assets_bytes_total', 'Image bytes downloaded by the asset downloader')
+
+
+def start_http_exporter(port, host='127.0.0.1', registry=REGISTRY):
+  """
+  /metrics (Prometheus 텍스트)와 /metrics.json을 제공하는 HTTP 서버를 백그라운드로 시작합니다.
+
+  Returns:
+      ThreadingHTTPServer (shutdown()으로 종료)
+  """
+  class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+      pass
+
+    def do_GET(self):
+      path = self.path.split('?')[0]
+      if path == '/metrics':
+        body = registry.to_prometheus().encode('utf-8')
+        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+      elif path == '/metrics.json':
+        body = json.dumps(registry.snapshot()).encode('utf-8')
+        content_type = 'application/json'
+      else:
+        self.send_error(404)
+        return
+      self.send_response(200)
+      self.send_header('Content-Type', content_type)
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+  server = ThreadingHTTPServer((host, port), _MetricsHandler)
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, name='metrics-exporter', daemon=True).start()
+  logger.info(f"지표 노출: http://{host}:{port}/metrics")
+  return server
+
+
+def start_json_snapshots(path, interval=30, registry=REGISTRY):
+  """
+  interval초마다 JSON 스냅샷을 파일로 씁니다 (임시 파일 + os.replace).
+
+  Returns:
+      (중단용 threading.Event, 스냅샷 스레드) 튜플 (set()하면 마지막 스냅샷을 쓰고 종료하므로 스레드를 join해서 기다림)
+  """
+  stop_event = threading.Event()
+
+  def _write():
+    try:
+      tmp_path = f"{path}.tmp"
+      with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry.snapshot(), f)
+      os.replace(tmp_path, path)
+    except OSError as e:
+      logger.warning(f"지표 스냅샷 저장 실패: {e}")
+
+  def _loop():
+    while not stop_event.wait(interval):
+      _write()
+    _write()
+
+  thread = threading.Thread(target=_loop, name='metrics-snapshot', daemon=True)
+  thread.start()
+  return stop_event, thread
+
+
+def start_exporters_from_env(registry=REGISTRY):
+  """
+  환경 변수에 따라 지표 내보내기를 시작합니다.
+
+  - METRICS_PORT: Prometheus /metrics HTTP 포트
+  - METRICS_SNAPSHOT: 주기적 JSON 스냅샷 경로 (METRICS_SNAPSHOT_INTERVAL초마다, 기본 30)
+
+  Returns:
+      종료 시 호출할 함수
+  """
+  server = None
+  snapshot_stop = snapshot_thread = None
+  port = os.getenv('METRICS_PORT')
+  if port:
+    server = start_http_exporter(int(port), host=os.getenv('METRICS_HOST', '127.0.0.1'), registry=registry)
+  snapshot_path = os.getenv('METRICS_SNAPSHOT')
+  if snapshot_path:
+    snapshot_stop, snapshot_thread = start_json_snapshots(
+        snapshot_path, float(os.getenv('METRICS_SNAPSHOT_INTERVAL', '30')), registry=registry)
+
+  def _shutdown():
+    if server:
+      server.shutdown()
+    if snapshot_stop:
+      # 데몬 스레드라 기다리지 않으면 프로세스가 바로 끝나 마지막 스냅샷이 남지 않음
+      snapshot_stop.set()
+      snapshot_thread.join(timeout=10)
+  return _shutdown
@@ -0,0 +1,133 @@
+from enum import Enum
+from urllib.parse import urlparse
+
+from utils import extract_post_id
+
+
+class Outcome(str, Enum):
+  """
+  기사 페이지 처리 결과 구분 (journal outcome, 출력 JSON의 'outcome' 값)
+
+  문자열 Enum이므로 JSON 직렬화와 journal 기록에 그대로 사용할 수 있습니다.
+  """
+
+  OK = 'ok'
+  NOT_FOUND = 'not_found'  # 404/410, Medium 404 페이지
+  REMOVED = 'removed'  # 삭제·신고·계정 정지로 내려간 글
+  PAYWALLED = 'paywalled'  # 멤버 전용 글인데 본문 대신 가입 유도 화면
+  LOGIN_REQUIRED = 'login_required'  # 로그인 페이지로 리다이렉트 (세션 만료)
+  NOT_ARTICLE = 'not_article'  # 태그/프로필/목록 등 기사가 아닌 페이지
+  HTTP_ERROR = 'http_error'  # 그 밖의 4xx/5xx
+  ERROR = 'error'  # 크롤링 중 예외
+
+  @property
+  def permanent(self):
+    """다시 시도해도 결과가 같은 outcome인지 (재시도 대상에서 제외)"""
+    return self in (Outcome.NOT_FOUND, Outcome.REMOVED, Outcome.PAYWALLED, Outcome.NOT_ARTICLE)
+
+
+# 본문 텍스트(소문자)에 나타나는 표식
+_NOT_FOUND_MARKERS = (
+    'out of nothing, something',  # Medium 404 페이지 문구
+    'page not found',
+)
+_REMOVED_MARKERS = (
+    'this story was removed',
+    'this post was removed',
+    'this post is under investigation',
+    'this account is under investigation',
+    'story unavailable',
+    'has been removed for violating',
+    'the author deleted this medium story',
+)
+_PAYWALL_MARKERS = (
+    'the author made this story available to medium members only',
+    'become a member to read this story',
+    'read the full story with a free account',
+    'create an account to read the full story',
+)
+_LOGIN_PATHS = ('/m/signin', '/m/callback', '/m/account')
+
+# 페이지에서 분류에 필요한 정보를 한 번의 evaluate로 가져옴
+# (innerText는 레이아웃 계산을 유발하므로 텍스트 노드 값을 직접 모으고, 앞부분만 검사)
+# 기사 본문 문단의 텍스트는 빼고 모음: 본문이 "story unavailable" 같은 문구를 인용해도 삭제/유료로 오분류하지 않도록
+_PAGE_PROBE_JS = """
+() => {
+  const STORY = '[data-selectable-paragraph], article p, article li, article blockquote, article pre, article figcaption';
+  const SKIP = STORY + ', script, style, noscript, template';
+  const parts = [];
+  let length = 0;
+  if (document.body) {
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+      acceptNode: (node) => {
+        if (node.nodeType === Node.TEXT_NODE) return NodeFilter.FILTER_ACCEPT;
+        // FILTER_REJECT는 하위 노드 전체를 건너뜀
+        return node.matches(SKIP) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP;
+      },
+    });
+    while (length < 20000 && walker.nextNode()) {
+      parts.push(walker.currentNode.data);
+      length += walker.currentNode.data.length;
+    }
+  }
+  return {
+    text: parts.join(' ').slice(0, 20000).toLowerCase(),
+    hasArticle: !!document.querySelector('article'),
+  };
+}
+"""
+
+
+def classify_url(url):
+  """
+  이동 전에 URL만으로 판단할 수 있는 결과 (post ID가 없으면 기사가 아님)
+
+  Returns:
+      (Outcome, 설명) 또는 판단할 수 없으면 None
+  """
+  if not extract_post_id(url):
+    return Outcome.NOT_ARTICLE, f"기사 URL이 아닙니다 (post ID 없음): {url}"
+  return None
+
+
+def classify_page(page, response, requested_url):
+  """
+  page.goto 직후 페이지를 분류합니다.
+
+  HTTP 상태, 리다이렉트된 최종 URL, 삭제/유료 표식을 차례로 확인합니다.
+  삭제/유료 표식은 기사 본문 문단 밖의 텍스트(안내 화면, 가입 유도 배너)에서만 찾습니다.
+  article 구조가 아직 없다는 이유만으로는 실패로 보지 않습니다 (렌더링이 늦을 수 있음).
+
+  Args:
+      page: Playwright Page
+      response: page.goto가 반환한 Response (없을 수 있음)
+      requested_url: 요청한 URL
+
+  Returns:
+      (Outcome, 설명) 튜플, 정상 기사 페이지면 (Outcome.OK, None)
+  """
+  if response is not None:
+    status = response.status
+    if status in (404, 410):
+      return Outcome.NOT_FOUND, f"HTTP {status}"
+    if status >= 400:
+      return Outcome.HTTP_ERROR, f"HTTP {status}"
+
+  final_url = page.url or requested_url
+  path = urlparse(final_url).path
+  if any(path.startswith(prefix) for prefix in _LOGIN_PATHS):
+    return Outcome.LOGIN_REQUIRED, f"로그인 페이지로 리다이렉트됨: {final_url}"
+  if final_url != requested_url and not extract_post_id(final_url):
+    return Outcome.NOT_ARTICLE, f"기사가 아닌 페이지로 리다이렉트됨: {final_url}"
+
+  probe = page.evaluate(_PAGE_PROBE_JS)
+  text = probe['text']
+  if not probe['hasArticle']:
+    # 404/삭제 안내 페이지는 200으로 내려오는 경우가 있음
+    if any(marker in text for marker in _NOT_FOUND_MARKERS):
+      return Outcome.NOT_FOUND, "Medium 404 페이지"
+  if any(marker in text for marker in _REMOVED_MARKERS):
+    return Outcome.REMOVED, "삭제되었거나 볼 수 없는 글"
+  if any(marker in text for marker in _PAYWALL_MARKERS):
+    return Outcome.PAYWALLED, "멤버 전용 글 (본문 대신 가입 안내)"
+  return Outcome.OK, None
@@ -0,0 +1,180 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class _StackSampler:
+  """
+  CPU 시간 기준으로 메인 스레드의 호출 스택을 샘플링합니다 (SIGPROF, Linux/macOS).
+
+  cProfile은 호출자-피호출자 쌍만 기록하므로, flamegraph용 전체 스택은 따로 모읍니다.
+  별도 스레드로 샘플링하면 cProfile(3.12+는 모든 스레드를 기록)의 시간 집계가 섞이므로
+  시그널 핸들러로 메인 스레드 안에서 수집합니다.
+  결과는 folded 형식(`a;b;c 횟수`)으로 flamegraph.pl, speedscope 등에서 열 수 있습니다.
+  """
+
+  def __init__(self, interval=0.005):
+    self.interval = interval
+    self.stacks = Counter()
+    self._previous_handler = None
+
+  @staticmethod
+  def available():
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+  def start(self):
+    self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+    signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+  def stop(self):
+    signal.setitimer(signal.ITIMER_PROF, 0, 0)
+    signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+  def _sample(self, signum, frame):
+    stack = []
+    while frame is not None:
+      code = frame.f_code
+      stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+      frame = frame.f_back
+    self.stacks[';'.join(reversed(stack))] += 1
+
+
+class CrawlProfiler:
+  """
+  크롤링을 cProfile + tracemalloc으로 프로파일링합니다 (main.py --profile).
+
+  기사마다 별도의 cProfile 프로파일을 만들어 기사별 상위 함수를 기록하고, 전체를 합산한 pstats를 저장합니다.
+  결과 파일 (output_dir):
+    - crawl.pstats       전체 합산 (python -m pstats, snakeviz, gprof2dot 등에서 사용)
+    - crawl.folded       CPU 시간 기준 스택 샘플 (flamegraph.pl / speedscope)
+    - articles.json      기사별 wall/CPU 시간, 메모리 할당 최대치, 상위 함수
+    - allocations.txt    실행 중 늘어난 메모리 할당 상위 위치
+    - summary.txt        함수별 누적 시간 상위 목록
+  """
+
+  def __init__(self, output_dir=None, top=25, sample_interval=0.005):
+    self.output_dir = Path(output_dir or os.getenv('PROFILE_DIR', os.path.join('output', 'profile')))
+    self.top = top
+    self.sample_interval = sample_interval
+    self.articles = []
+    self._stats = None
+    self._sampler = None
+    self._baseline_snapshot = None
+
+  def start(self):
+    """메모리 추적을 시작합니다 (스택 25단계까지 기록)."""
+    self.output_dir.mkdir(parents=True, exist_ok=True)
+    tracemalloc.start(25)
+    self._baseline_snapshot = tracemalloc.take_snapshot()
+    if _StackSampler.available():
+      self._sampler = _StackSampler(self.sample_interval)
+      self._sampler.start()
+    else:
+      logger.info("이 환경에서는 스택 샘플링을 지원하지 않아 crawl.folded를 만들지 않습니다.")
+    return self
+
+  @contextmanager
+  def article(self, url):
+    """기사 하나를 처리하는 구간을 프로파일링합니다."""
+    profile = cProfile.Profile()
+    tracemalloc.reset_peak()
+    allocated_before, _ = tracemalloc.get_traced_memory()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    profile.enable()
+    try:
+      yield
+    finally:
+      profile.disable()
+      wall = time.perf_counter() - wall_started
+      cpu = time.process_time() - cpu_started
+      allocated_after, peak = tracemalloc.get_traced_memory()
+
+      stats = pstats.Stats(profile)
+      if self._stats is None:
+        self._stats = stats
+      else:
+        self._stats.add(stats)
+
+      self.articles.append({
+          'url': url,
+          'wall': round(wall, 4),
+          'cpu': round(cpu, 4),
+          'alloc_peak_kb': round((peak - allocated_before) / 1024, 1),
+          'alloc_retained_kb': round((allocated_after - allocated_before) / 1024, 1),
+          'top_functions': self._top_functions(stats, 5),
+      })
+
+  @staticmethod
+  def _top_functions(stats, limit):
+    """자체 실행 시간(tottime) 기준 상위 함수 (스택 샘플러 자체는 제외)"""
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+      if name == '_sample' and filename == __file__:
+        continue
+      rows.append({'function': f"{name} ({os.path.basename(filename)}:{line})", 'calls': calls,
+                   'tottime': round(tottime, 4), 'cumtime': round(cumtime, 4)})
+    rows.sort(key=lambda row: row['tottime'], reverse=True)
+    return rows[:limit]
+
+  def finish(self):
+    """결과 파일을 쓰고 요약 문자열을 반환합니다."""
+    if self._sampler:
+      self._sampler.stop()
+
+    if self._stats is not None:
+      self._stats.dump_stats(self.output_dir / 'crawl.pstats')
+      stream = io.StringIO()
+      self._stats.stream = stream
+      self._stats.sort_stats('cumulative').print_stats(self.top)
+      self._stats.sort_stats('tottime').print_stats(self.top)
+      (self.output_dir / 'summary.txt').write_text(stream.getvalue(), encoding='utf-8')
+
+    if self._sampler and self._sampler.stacks:
+      with open(self.output_dir / 'crawl.folded', 'w', encoding='utf-8') as f:
+        for stack, count in self._sampler.stacks.most_common():
+          f.write(f"{stack} {count}\n")
+
+    with open(self.output_dir / 'articles.json', 'w', encoding='utf-8') as f:
+      json.dump(self.articles, f, ensure_ascii=False, indent=2)
+
+    allocation_lines = []
+    if tracemalloc.is_tracing():
+      snapshot = tracemalloc.take_snapshot().filter_traces([
+          tracemalloc.Filter(False, tracemalloc.__file__),
+          tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+      ])
+      for stat in snapshot.compare_to(self._baseline_snapshot, 'lineno')[:self.top]:
+        allocation_lines.append(str(stat))
+      tracemalloc.stop()
+    (self.output_dir / 'allocations.txt').write_text('\n'.join(allocation_lines) + '\n', encoding='utf-8')
+
+    return self.summary(allocation_lines[:5])
+
+  def summary(self, allocation_lines=()):
+    lines = [f"프로파일 결과: {self.output_dir}"]
+    if self.articles:
+      wall = sum(a['wall'] for a in self.articles)
+      cpu = sum(a['cpu'] for a in self.articles)
+      lines.append(f"  기사 {len(self.articles)}개, wall {wall:.2f}s, Python CPU {cpu:.2f}s ({cpu / wall:.0%})"
+                   if wall else f"  기사 {len(self.articles)}개")
+    if self._stats is not None:
+      lines.append("  자체 실행 시간 상위 함수:")
+      for row in self._top_functions(self._stats, 10):
+        lines.append(f"    {row['tottime']:8.3f}s  {row['calls']:>8}회  {row['function']}")
+    if allocation_lines:
+      lines.append("  메모리 증가 상위 위치:")
+      lines.extend(f"    {line}" for line in allocation_lines)
+    return '\n'.join(lines)
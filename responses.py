@@ -0,0 +1,258 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import load_env
+from metrics import REGISTRY
+from utils import extract_post_id, load_crawled_data, output_path_for_url, write_json_atomic
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = 'https://medium.com/_/graphql'
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+
+# 기사 페이지의 응답 패널이 쓰는 것과 같은 형태의 쿼리 (최신순, 답글의 부모는 inResponseToPostResult)
+_RESPONSES_QUERY = """
+query PostResponsesQuery($postId: ID!, $paging: PagingOptions, $sortType: ResponseSortType) {
+  post(id: $postId) {
+    id
+    postResponses { count }
+    threadedPostResponses(paging: $paging, sortType: $sortType) {
+      posts {
+        id
+        createdAt
+        clapCount
+        creator { id name username }
+        inResponseToPostResult { __typename ... on Post { id } }
+        content { bodyModel { paragraphs { text } } }
+      }
+      pagingInfo { next { from to limit page } }
+    }
+  }
+}
+"""
+
+
+def responses_path(post_id, output_dir=None):
+  """기사 응답 파일 경로 (output_dir/responses 아래에 기사 파일과 같은 규칙으로 나눠 저장)"""
+  if not output_dir:
+    output_dir = os.getenv('OUTPUT_DIR', 'output')
+  return output_path_for_url(f'https://medium.com/p/{post_id}', os.path.join(output_dir, 'responses'))
+
+
+def _compact_response(post, users):
+  """GraphQL 응답 글 하나를 저장 형식으로 바꿉니다 (작성자는 users에 한 번만 기록하고 ID로 연결)."""
+  creator = post.get('creator') or {}
+  if creator.get('id'):
+    users[creator['id']] = {'name': creator.get('name'), 'username': creator.get('username')}
+  parent = post.get('inResponseToPostResult') or {}
+  paragraphs = (((post.get('content') or {}).get('bodyModel') or {}).get('paragraphs')) or []
+  return {
+      'id': post['id'],
+      'parent': parent.get('id'),
+      'author': creator.get('id'),
+      'created_at': post.get('createdAt'),
+      'claps': post.get('clapCount'),
+      'text': '\n\n'.join(p['text'] for p in paragraphs if p.get('text')),
+  }
+
+
+class ResponseFetcher:
+  """
+  기사의 응답(댓글)을 Medium GraphQL 엔드포인트로 받아 post ID별 파일로 저장합니다.
+
+  브라우저에서 "See all responses"를 누르고 패널을 스크롤하는 대신, 로그인한 크롤러 컨텍스트의 쿠키로
+  HTTP 요청만 보내 페이지 단위로 받습니다.
+  - submit()은 바로 반환하고, 받기는 workers개 스레드가 합니다. 대기 중인 기사가 max_pending개를 넘으면
+    submit()이 기다리므로 크롤링보다 느려도 메모리가 늘지 않습니다.
+  - 응답은 최신순으로 받고, 이미 저장한 응답이 나오는 페이지에서 멈춥니다 (재실행 시 새 응답만 받음).
+    max_pages에서 끊기면 다음 페이지 위치('resume')를 함께 저장하고, 다음 실행은 그 위치부터 이어 받습니다.
+  - 저장 형식은 {'post_id', 'count', 'fetched_at', 'users': {ID: 작성자}, 'responses': [...]}이고,
+    응답의 'parent'는 기사 또는 다른 응답의 ID, 'author'는 users의 키입니다.
+  """
+
+  def __init__(self, cookies, output_dir=None, workers=None, page_size=None, max_pages=None, max_pending=None,
+               user_agent=None, timeout=30):
+    """
+    Args:
+        cookies: 로그인한 컨텍스트의 쿠키 목록 (BrowserContext.cookies() 결과)
+        output_dir: 출력 디렉토리 (기본값: 환경 변수에서 읽음)
+        workers: 동시에 받을 기사 수 (기본값: RESPONSES_WORKERS 또는 4)
+        page_size: 요청 한 번에 받을 응답 수 (기본값: RESPONSES_PAGE_SIZE 또는 25)
+        max_pages: 기사 하나에서 받을 최대 페이지 수 (기본값: RESPONSES_MAX_PAGES 또는 40)
+        max_pending: 받기를 기다리는 기사 수 한도 (기본값: workers * 4)
+        user_agent: User-Agent 헤더 (크롤러 브라우저와 같게)
+        timeout: 요청 타임아웃 (초)
+    """
+    self.output_dir = output_dir or os.getenv('OUTPUT_DIR', 'output')
+    self.workers = int(workers or os.getenv('RESPONSES_WORKERS', '4'))
+    self.page_size = int(page_size or os.getenv('RESPONSES_PAGE_SIZE', '25'))
+    self.max_pages = int(max_pages or os.getenv('RESPONSES_MAX_PAGES', '40'))
+    self.timeout = timeout
+    self.stats = {'posts': 0, 'skipped': 0, 'new': 0, 'errors': 0}
+    self._stats_lock = threading.Lock()
+    self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='responses')
+
+    self.session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=None, respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, max_retries=retry)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
+    self.session.headers.update({
+        'User-Agent': user_agent or DEFAULT_USER_AGENT,
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+        'Origin': 'https://medium.com',
+        'apollographql-client-name': 'lite',
+    })
+    for cookie in cookies:
+      self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'),
+                               path=cookie.get('path', '/'))
+
+  @classmethod
+  def from_crawler(cls, crawler, **kwargs):
+    """
+    크롤러의 로그인 쿠키로 만듭니다. Playwright 객체는 만든 스레드에서만 쓸 수 있으므로 크롤러 스레드에서 호출합니다.
+    """
+    return cls(crawler.context.cookies(), **kwargs)
+
+  @staticmethod
+  def enabled():
+    return os.getenv('RESPONSES', 'false').lower() == 'true'
+
+  def submit(self, article_data):
+    """
+    기사의 응답 받기를 예약합니다 (대기 중인 기사가 한도를 넘으면 자리가 날 때까지 기다림).
+
+    Args:
+        article_data: 크롤링 결과 (url, metadata.comments 사용)
+    """
+    post_id = extract_post_id(article_data.get('url', ''))
+    if not post_id:
+      return
+    expected = (article_data.get('metadata') or {}).get('comments')
+    self._slots.acquire()
+    try:
+      future = self._executor.submit(self.fetch, post_id, expected)
+    except BaseException:
+      self._slots.release()
+      raise
+    future.add_done_callback(self._done)
+
+  def _done(self, future):
+    self._slots.release()
+    if future.exception() is not None:
+      self._count('errors')
+      logger.error(f"응답 저장 실패: {future.exception()}")
+
+  def close(self):
+    """예약된 받기를 모두 마치고 세션을 닫습니다."""
+    self._executor.shutdown(wait=True)
+    self.session.close()
+    if self.stats['posts']:
+      logger.info(f"응답 수집: 기사 {self.stats['posts']}개, 새 응답 {self.stats['new']}개, "
+                  f"변경 없음 {self.stats['skipped']}개, 오류 {self.stats['errors']}개")
+
+  def _count(self, key, value=1):
+    with self._stats_lock:
+      self.stats[key] += value
+
+  def _query(self, post_id, paging):
+    payload = [{
+        'operationName': 'PostResponsesQuery',
+        'variables': {'postId': post_id, 'paging': paging, 'sortType': 'NEWEST'},
+        'query': _RESPONSES_QUERY,
+    }]
+    response = self.session.post(GRAPHQL_URL, json=payload, timeout=self.timeout,
+                                 headers={'graphql-operation': 'PostResponsesQuery'})
+    response.raise_for_status()
+    REGISTRY.inc('responses_bytes_total', len(response.content))
+    result = response.json()
+    result = result[0] if isinstance(result, list) else result
+    if result.get('errors'):
+      raise RuntimeError(f"GraphQL 오류: {result['errors'][0].get('message')}")
+    return ((result.get('data') or {}).get('post')) or {}
+
+  def fetch(self, post_id, expected=None):
+    """
+    기사 하나의 새 응답을 받아 저장합니다 (워커 스레드에서 실행, 예외를 밖으로 던지지 않음).
+
+    Args:
+        post_id: 기사 post ID
+        expected: 기사 페이지에 표시된 응답 수 (저장된 응답이 이미 그만큼이면 요청하지 않음)
+
+    Returns:
+        새로 받은 응답 수 (오류면 None)
+    """
+    self._count('posts')
+    path = responses_path(post_id, self.output_dir)
+    stored = load_crawled_data(path) if os.path.exists(path) else {'post_id': post_id, 'users': {}, 'responses': []}
+    known = {response['id'] for response in stored['responses']}
+    resume = stored.get('resume')
+    if expected is not None and known and len(known) >= expected and not resume:
+      self._count('skipped')
+      REGISTRY.inc('responses_posts_total', result='unchanged')
+      return 0
+
+    new_responses = []
+    users = dict(stored['users'])
+    # 지난 실행이 max_pages에서 끊겼으면 그 다음 페이지부터 이어 받음 (새 응답은 이어 받기가 끝난 다음 실행에서)
+    paging = resume or {'limit': self.page_size}
+    try:
+      with REGISTRY.timer(stage='responses'):
+        for _ in range(self.max_pages):
+          post = self._query(post_id, paging)
+          thread = post.get('threadedPostResponses') or {}
+          stored['count'] = (post.get('postResponses') or {}).get('count', stored.get('count'))
+          page = thread.get('posts') or []
+          reached_known = False
+          for item in page:
+            if item['id'] in known:
+              reached_known = True
+              continue
+            known.add(item['id'])
+            new_responses.append(_compact_response(item, users))
+          next_page = (thread.get('pagingInfo') or {}).get('next')
+          # 최신순이므로 이미 저장한 응답이 나오면 그 뒤는 모두 받은 것
+          if reached_known or not page or not next_page:
+            paging = None
+            break
+          paging = {key: value for key, value in next_page.items() if value is not None}
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+      self._count('errors')
+      REGISTRY.inc('responses_posts_total', result='error')
+      # 일부만 받은 채 저장하면 다음 실행이 그 응답에서 멈춰 사이가 빠지므로 저장하지 않음
+      logger.warning(f"응답 받기 실패 ({post_id}): {e}")
+      return None
+
+    if not new_responses and paging == resume and os.path.exists(path):
+      self._count('skipped')
+      REGISTRY.inc('responses_posts_total', result='unchanged')
+      return 0
+    stored['users'] = users
+    # 이어 받은 응답은 저장된 응답보다 오래되었을 수 있으므로 작성 시각 기준 최신순으로 다시 정렬
+    stored['responses'] = sorted(new_responses + stored['responses'],
+                                 key=lambda response: response.get('created_at') or 0, reverse=True)
+    # max_pages에서 끊겼으면 다음 페이지 위치를 남김 (다음 실행이 처음부터 받으면 이미 받은 응답에서 멈춰 나머지가 빠짐)
+    if paging:
+      stored['resume'] = paging
+    else:
+      stored.pop('resume', None)
+    stored['fetched_at'] = datetime.now().isoformat(timespec='seconds')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json_atomic(path, stored)
+    self._count('new', len(new_responses))
+    REGISTRY.inc('responses_posts_total', result='updated')
+    if __debug__:
+      logger.debug(f"응답 {len(new_responses)}개 저장: {path}" + (" (다음 실행에서 이어 받음)" if paging else ""))
+    return len(new_responses)
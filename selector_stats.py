@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from config import load_env
+from metrics import REGISTRY
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 페이지 레이아웃 구분 (medium.com 본 사이트와 커스텀 도메인 퍼블리케이션은 DOM 구조가 다름)
+LAYOUT_MEDIUM = 'medium'
+LAYOUT_CUSTOM = 'custom'
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def page_layout(url):
+  """URL의 페이지 레이아웃 구분"""
+  host = (urlparse(url or '').hostname or '').lower()
+  if host == 'medium.com' or host.endswith('.medium.com'):
+    return LAYOUT_MEDIUM
+  return LAYOUT_CUSTOM
+
+
+class SelectorStats:
+  """
+  필드·레이아웃별로 어떤 선택자가 실제로 값을 찾았는지 기록하고, 잘 맞는 선택자부터 시도하도록 순서를 정합니다.
+
+  같은 종류의 페이지를 연속으로 크롤링하면 매번 같은 선택자에서 실패하는 query_selector 왕복이 반복되므로,
+  적중률(hit / (hit + miss), 라플라스 보정) 순으로 정렬하고 처음 보는 선택자는 원래 순서를 유지합니다.
+  정렬은 단계(tier) 안에서만 합니다. 페이지 전체 대체 선택자는 기사 범위 선택자보다 자주 "적중"하지만
+  엉뚱한 요소(추천 기사의 태그, 다른 제목 등)를 잡을 수 있으므로 항상 기사 범위 단계 뒤에 시도합니다.
+  통계는 JSON 파일에 저장되어 다음 실행에서도 이어서 사용합니다.
+  """
+
+  def __init__(self, path=None):
+    self.path = Path(path or os.getenv('SELECTOR_STATS', os.path.join('output', 'selector_stats.json')))
+    self._lock = threading.Lock()
+    self._stats = {}  # layout → field → selector → {'hit': n, 'miss': n}
+    self._dirty = False
+    self._load()
+
+  @classmethod
+  def shared(cls, path=None):
+    """같은 파일을 쓰는 인스턴스를 프로세스 안에서 공유합니다 (여러 크롤러 스레드가 저장 시 덮어쓰지 않도록)."""
+    key = str(Path(path or os.getenv('SELECTOR_STATS', os.path.join('output', 'selector_stats.json'))).resolve())
+    with _shared_lock:
+      if key not in _shared:
+        _shared[key] = cls(path)
+      return _shared[key]
+
+  def _load(self):
+    if not self.path.exists():
+      return
+    try:
+      with open(self.path, 'r', encoding='utf-8') as f:
+        self._stats = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+      logger.warning(f"선택자 통계 파일을 읽을 수 없어 새로 시작합니다 ({self.path}): {e}")
+      self._stats = {}
+
+  def order(self, field, layout, tiers):
+    """
+    시도할 선택자 순서를 반환합니다.
+
+    Args:
+        field: 추출 필드 이름 (예: 'title')
+        layout: page_layout() 결과
+        tiers: 선택자 단계 목록 (단계 순서는 그대로 두고 단계 안에서만 정렬, 처음 보는 선택자는 원래 순서 유지)
+
+    Returns:
+        정렬된 선택자 리스트
+    """
+    with self._lock:
+      counts = self._stats.get(layout, {}).get(field, {})
+
+      def _score(item):
+        index, selector = item
+        entry = counts.get(selector)
+        if not entry:
+          return (-0.5, index)
+        return (-(entry['hit'] + 1) / (entry['hit'] + entry['miss'] + 2), index)
+
+      return [selector for tier in tiers for _, selector in sorted(enumerate(tier), key=_score)]
+
+  def record(self, field, layout, selector, hit):
+    """선택자 시도 결과를 기록합니다."""
+    with self._lock:
+      entry = self._stats.setdefault(layout, {}).setdefault(field, {}).setdefault(selector, {'hit': 0, 'miss': 0})
+      entry['hit' if hit else 'miss'] += 1
+      self._dirty = True
+    if not hit:
+      REGISTRY.inc('selector_misses_total', field=field)
+
+  def counts(self):
+    """필드·레이아웃별 선택자 hit/miss 수 (복사본)"""
+    with self._lock:
+      return json.loads(json.dumps(self._stats))
+
+  def save(self):
+    """통계를 파일에 저장합니다 (임시 파일 + os.replace)."""
+    with self._lock:
+      if not self._dirty:
+        return
+      data = json.dumps(self._stats, ensure_ascii=False, indent=2, sort_keys=True)
+      self._dirty = False
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      f.write(data)
+    os.replace(tmp_path, self.path)
+
+  def summary_table(self):
+    """필드별 hit/miss 요약 표"""
+    lines = [f"{'layout':<8} {'field':<16} {'hits':>6} {'misses':>7}  best selector"]
+    for layout, fields in sorted(self.counts().items()):
+      for field, selectors in sorted(fields.items()):
+        hits = sum(entry['hit'] for entry in selectors.values())
+        misses = sum(entry['miss'] for entry in selectors.values())
+        best = max(selectors.items(), key=lambda item: item[1]['hit'])[0] if hits else '-'
+        lines.append(f"{layout:<8} {field:<16} {hits:>6} {misses:>7}  {best}")
+    return '\n'.join(lines)
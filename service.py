@@ -0,0 +1,444 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import load_env
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+
+
+class ServiceBusyError(Exception):
+  """작업 큐가 가득 찬 경우"""
+
+
+class CrawlJob:
+  """URL 묶음 하나에 대한 크롤링 작업"""
+
+  def __init__(self, urls):
+    self.id = uuid.uuid4().hex[:12]
+    self.urls = urls
+    self.status = JOB_QUEUED
+    self.results = []
+    self.created_at = time.time()
+    self.started_at = None
+    self.finished_at = None
+    self._condition = threading.Condition()
+
+  @property
+  def finished(self):
+    return self.status in (JOB_DONE, JOB_CANCELLED)
+
+  def add_result(self, result):
+    with self._condition:
+      self.results.append(result)
+      self._condition.notify_all()
+
+  def set_status(self, status):
+    with self._condition:
+      self.status = status
+      if status == JOB_RUNNING:
+        self.started_at = time.time()
+      elif status in (JOB_DONE, JOB_CANCELLED):
+        self.finished_at = time.time()
+      self._condition.notify_all()
+
+  def iter_results(self, timeout=None):
+    """결과가 생기는 대로 반환합니다. 작업이 끝나면 종료합니다."""
+    index = 0
+    while True:
+      with self._condition:
+        while index >= len(self.results) and not self.finished:
+          if not self._condition.wait(timeout=timeout):
+            return
+        pending = self.results[index:]
+        finished = self.finished
+      for result in pending:
+        yield result
+      index += len(pending)
+      if finished and index >= len(self.results):
+        return
+
+  def summary(self):
+    """결과 본문을 제외한 작업 상태"""
+    errors = sum(1 for r in self.results if r.get('status') != 'ok')
+    return {
+        'id': self.id,
+        'status': self.status,
+        'total': len(self.urls),
+        'completed': len(self.results),
+        'errors': errors,
+        'created_at': self.created_at,
+        'started_at': self.started_at,
+        'finished_at': self.finished_at,
+    }
+
+
+class CrawlerService:
+  """
+  로그인된 MediumCrawler를 계속 띄워 두고 작업을 받아 처리하는 서비스
+
+  - 워커마다 자체 스레드에서 브라우저를 띄우고 로그인해 둡니다 (Playwright sync API는 스레드에 묶임).
+  - 작업은 큐에 쌓이고, 동시에 실행되는 작업 수는 워커 수로 제한됩니다.
+  - 브라우저/페이지가 죽으면 다시 띄우고 로그인한 뒤 해당 URL을 한 번 더 시도합니다.
+  """
+
+  def __init__(self, email, workers=1, max_queued_jobs=100, max_urls_per_job=500,
+               headless=True, crawl_delay=None, max_finished_jobs=1000):
+    self.email = email
+    self.workers = workers
+    self.max_urls_per_job = max_urls_per_job
+    self.headless = headless
+    self.crawl_delay = float(os.getenv('CRAWL_DELAY', '2')) if crawl_delay is None else crawl_delay
+    self.max_finished_jobs = max_finished_jobs
+    self._queue = queue.Queue(maxsize=max_queued_jobs)
+    self._jobs = OrderedDict()
+    self._jobs_lock = threading.Lock()
+    self._worker_states = {}
+    self._threads = []
+    self._stopping = threading.Event()
+    self._code_dispatcher = None
+
+  def start(self):
+    """워커 스레드를 시작합니다."""
+    from gmail_checker import VerificationCodeDispatcher
+
+    # 워커가 여러 개여도 인증 코드 폴링은 하나로
+    self._code_dispatcher = VerificationCodeDispatcher()
+    for index in range(self.workers):
+      name = f'crawler-worker-{index}'
+      self._worker_states[name] = 'starting'
+      thread = threading.Thread(target=self._worker_loop, args=(name,), name=name, daemon=True)
+      thread.start()
+      self._threads.append(thread)
+
+  def stop(self, timeout=30):
+    """새 작업을 멈추고 워커를 종료합니다."""
+    self._stopping.set()
+    for _ in self._threads:
+      try:
+        self._queue.put_nowait(None)
+      except queue.Full:
+        pass
+    for thread in self._threads:
+      thread.join(timeout=timeout)
+    if self._code_dispatcher:
+      self._code_dispatcher.stop()
+
+  def submit(self, urls):
+    """
+    작업을 큐에 추가합니다.
+
+    Raises:
+        ValueError: URL 목록이 리스트가 아니거나, 비었거나, 너무 많은 경우
+        ServiceBusyError: 큐가 가득 찬 경우
+    """
+    # 문자열 하나를 넘기면 글자 단위로 순회해 한 글자짜리 "URL" 작업이 만들어지므로 거부
+    if not isinstance(urls, (list, tuple)):
+      raise ValueError("urls는 URL 문자열의 리스트여야 합니다.")
+    urls = [u.strip() for u in urls if isinstance(u, str) and u.strip()]
+    if not urls:
+      raise ValueError("크롤링할 URL이 없습니다.")
+    if len(urls) > self.max_urls_per_job:
+      raise ValueError(f"작업당 URL은 최대 {self.max_urls_per_job}개입니다.")
+
+    job = CrawlJob(urls)
+    with self._jobs_lock:
+      self._jobs[job.id] = job
+      self._prune_finished_jobs()
+    try:
+      self._queue.put_nowait(job)
+    except queue.Full:
+      with self._jobs_lock:
+        del self._jobs[job.id]
+      raise ServiceBusyError("작업 큐가 가득 찼습니다. 잠시 후 다시 시도하세요.")
+    logger.info(f"작업 등록: {job.id} (URL {len(urls)}개)")
+    return job
+
+  def get(self, job_id):
+    with self._jobs_lock:
+      return self._jobs.get(job_id)
+
+  def cancel(self, job_id):
+    """대기 중인 작업을 취소합니다. 실행 중인 작업은 남은 URL을 건너뜁니다."""
+    job = self.get(job_id)
+    if job and not job.finished:
+      job.set_status(JOB_CANCELLED)
+    return job
+
+  def health(self):
+    return {
+        'workers': dict(self._worker_states),
+        'queued_jobs': self._queue.qsize(),
+        'jobs': len(self._jobs),
+    }
+
+  def _prune_finished_jobs(self):
+    """오래된 완료 작업을 메모리에서 정리합니다 (호출자가 _jobs_lock 보유)."""
+    finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+    for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+      del self._jobs[job_id]
+
+  def _start_crawler(self, name):
+    from crawler import MediumCrawler
+
+    self._worker_states[name] = 'logging_in'
+    crawler = MediumCrawler(email=self.email, headless=self.headless, code_dispatcher=self._code_dispatcher)
+    if not crawler.login():
+      crawler.close_browser()
+      raise RuntimeError("로그인에 실패했습니다.")
+    self._worker_states[name] = 'ready'
+    return crawler
+
+  def _worker_loop(self, name):
+    crawler = None
+    while not self._stopping.is_set():
+      try:
+        if crawler is None:
+          crawler = self._start_crawler(name)
+      except Exception as e:
+        logger.error(f"[{name}] 브라우저 시작/로그인 실패, 30초 후 재시도: {e}")
+        self._worker_states[name] = 'error'
+        if self._stopping.wait(30):
+          break
+        continue
+
+      job = self._queue.get()
+      if job is None:
+        break
+      if job.status == JOB_CANCELLED:
+        continue
+
+      self._worker_states[name] = f'running:{job.id}'
+      job.set_status(JOB_RUNNING)
+      try:
+        crawler = self._run_job(name, crawler, job)
+      finally:
+        if job.status != JOB_CANCELLED:
+          job.set_status(JOB_DONE)
+        logger.info(f"[{name}] 작업 완료: {job.id}")
+        self._worker_states[name] = 'ready' if crawler else 'restarting'
+
+    if crawler:
+      crawler.close_browser()
+    self._worker_states[name] = 'stopped'
+
+  def _run_job(self, name, crawler, job):
+    """작업의 URL을 순서대로 크롤링합니다. 브라우저가 죽으면 다시 띄운 crawler를 반환합니다."""
+    from metrics import REGISTRY
+    from utils import save_crawled_data
+
+    for index, url in enumerate(job.urls):
+      if job.status == JOB_CANCELLED or self._stopping.is_set():
+        break
+      if index and self.crawl_delay:
+        time.sleep(self.crawl_delay)
+
+      started = time.monotonic()
+      article_data = crawler.crawl_article(url)
+      if 'error' in article_data and not crawler.is_healthy():
+        # 브라우저/페이지가 죽은 경우: 다시 띄우고 한 번 더 시도
+        logger.warning(f"[{name}] 브라우저 이상 감지, 재시작합니다: {article_data['error']}")
+        self._worker_states[name] = 'restarting'
+        crawler.close_browser()
+        try:
+          crawler = self._start_crawler(name)
+        except Exception as e:
+          # 남은 URL은 실패로 기록하고, 워커 루프에서 다시 브라우저를 띄움
+          logger.error(f"[{name}] 브라우저 재시작 실패: {e}")
+          for remaining in job.urls[index:]:
+            job.add_result({'url': remaining, 'status': 'error', 'error': f"브라우저 재시작 실패: {e}"})
+          return None
+        REGISTRY.inc('crawl_retries_total', kind='browser_restart')
+        article_data = crawler.crawl_article(url)
+
+      result = {'url': url, 'elapsed': round(time.monotonic() - started, 3)}
+      result['outcome'] = article_data.get('outcome', 'error')
+      if 'error' in article_data:
+        result.update(status='error', error=article_data['error'])
+      else:
+        try:
+          result.update(status='ok', output_path=save_crawled_data(article_data), data=article_data)
+        except Exception as e:
+          result.update(status='error', error=f"저장 오류: {e}")
+      job.add_result(result)
+    return crawler
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+  """
+  로컬 작업 API
+
+    POST   /jobs               {"urls": [...]} → 202 {"id": ...}
+    GET    /jobs/<id>          작업 상태
+    GET    /jobs/<id>/results  결과 스트림 (NDJSON, 작업이 끝날 때까지 이어짐)
+    DELETE /jobs/<id>          작업 취소
+    GET    /health             워커 상태
+    GET    /metrics            단계별 지표 (Prometheus 텍스트)
+  """
+
+  protocol_version = 'HTTP/1.1'
+  service = None  # serve()에서 설정
+
+  def address_string(self):
+    # Unix 소켓에서는 client_address가 비어 있음
+    return self.client_address[0] if self.client_address else 'unix'
+
+  def log_message(self, format, *args):
+    logger.debug(f"{self.address_string()} {format % args}")
+
+  def _send_json(self, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/json; charset=utf-8')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def _job_from_path(self):
+    parts = [p for p in self.path.split('?')[0].split('/') if p]
+    if len(parts) < 2 or parts[0] != 'jobs':
+      return None, parts
+    return self.service.get(parts[1]), parts
+
+  def do_GET(self):
+    if self.path.split('?')[0] == '/health':
+      self._send_json(200, self.service.health())
+      return
+    if self.path.split('?')[0] == '/metrics':
+      from metrics import REGISTRY
+      body = REGISTRY.to_prometheus().encode('utf-8')
+      self.send_response(200)
+      self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+      return
+
+    job, parts = self._job_from_path()
+    if not job:
+      self._send_json(404, {'error': 'not found'})
+      return
+    if len(parts) == 2:
+      self._send_json(200, job.summary())
+    elif len(parts) == 3 and parts[2] == 'results':
+      self._stream_results(job)
+    else:
+      self._send_json(404, {'error': 'not found'})
+
+  def _stream_results(self, job):
+    self.send_response(200)
+    self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+    self.send_header('Transfer-Encoding', 'chunked')
+    self.end_headers()
+    try:
+      for result in job.iter_results():
+        line = (json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8')
+        self.wfile.write(f'{len(line):X}\r\n'.encode('ascii') + line + b'\r\n')
+        self.wfile.flush()
+      self.wfile.write(b'0\r\n\r\n')
+    except (BrokenPipeError, ConnectionResetError):
+      logger.debug(f"결과 스트림 연결 종료: {job.id}")
+
+  def do_POST(self):
+    if self.path.split('?')[0] != '/jobs':
+      self._send_json(404, {'error': 'not found'})
+      return
+    try:
+      length = int(self.headers.get('Content-Length', '0'))
+      payload = json.loads(self.rfile.read(length) or b'{}')
+      job = self.service.submit(payload.get('urls', []))
+    except (ValueError, AttributeError) as e:
+      self._send_json(400, {'error': str(e)})
+      return
+    except ServiceBusyError as e:
+      self._send_json(503, {'error': str(e)})
+      return
+    self._send_json(202, job.summary())
+
+  def do_DELETE(self):
+    job, parts = self._job_from_path()
+    if not job or len(parts) != 2:
+      self._send_json(404, {'error': 'not found'})
+      return
+    self._send_json(200, self.service.cancel(job.id).summary())
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+  daemon_threads = True
+
+
+def _remove_stale_socket(socket_path):
+  """
+  이전 실행이 남긴 소켓 파일만 지웁니다.
+
+  Raises:
+      RuntimeError: 경로가 소켓이 아니거나(일반 파일 등), 다른 서비스가 아직 그 소켓으로 요청을 받고 있는 경우
+  """
+  try:
+    mode = os.stat(socket_path).st_mode
+  except FileNotFoundError:
+    return
+  if not stat.S_ISSOCK(mode):
+    raise RuntimeError(f"소켓 경로에 소켓이 아닌 파일이 있습니다: {socket_path}")
+  probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    probe.connect(socket_path)
+  except (ConnectionRefusedError, FileNotFoundError):
+    # 연결을 받는 프로세스가 없는 남은 소켓
+    os.remove(socket_path)
+    return
+  finally:
+    probe.close()
+  raise RuntimeError(f"다른 크롤러 서비스가 이미 실행 중입니다: unix:{socket_path}")
+
+
+def serve(service, host='127.0.0.1', port=8765, socket_path=None):
+  """
+  서비스를 시작하고 요청을 처리합니다 (Ctrl+C로 종료).
+
+  Args:
+      service: CrawlerService
+      host: HTTP 바인드 주소 (기본값: 로컬만)
+      port: HTTP 포트
+      socket_path: 지정하면 TCP 대신 Unix 소켓으로 서비스
+
+  Raises:
+      RuntimeError: socket_path에 소켓이 아닌 파일이 있거나 다른 서비스가 사용 중인 경우
+  """
+  handler = type('JobRequestHandler', (_JobRequestHandler,), {'service': service})
+  if socket_path:
+    _remove_stale_socket(socket_path)
+    server = _ThreadingUnixHTTPServer(socket_path, handler)
+    logger.info(f"크롤러 서비스 시작: unix:{socket_path}")
+  else:
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info(f"크롤러 서비스 시작: http://{host}:{port}")
+
+  service.start()
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    logger.info("서비스 종료 중...")
+  finally:
+    server.server_close()
+    service.stop()
+    if socket_path and os.path.exists(socket_path):
+      os.remove(socket_path)
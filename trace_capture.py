@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from config import load_env
+from metrics import REGISTRY
+from page_classifier import Outcome
+from utils import extract_post_id
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# 같은 디렉토리를 여러 크롤러(스레드)가 함께 쓰므로 용량 정리는 한 번에 하나씩
+_eviction_lock = threading.Lock()
+
+
+class TraceCapture:
+  """
+  느리거나 추출에 실패한 페이지의 Playwright trace를 남깁니다 (opt-in).
+
+  브라우저 컨텍스트에서 tracing을 한 번 시작해 두고, 페이지마다 chunk를 새로 열어
+  - 지연 시간이 latency_threshold 이상이거나 추출 실패/빈 결과인 페이지만 zip으로 저장하고
+  - 나머지 chunk는 파일로 쓰지 않고 버립니다.
+  저장한 trace는 meta.json을 추가해 최대 압축으로 다시 묶고, 전체 크기가 max_bytes를 넘으면
+  가장 오래된 trace부터 지웁니다 (LRU).
+
+  trace에는 스크린샷, DOM 스냅샷, 네트워크 기록이 모두 들어 있으므로
+  `playwright show-trace <파일>`로 열어 볼 수 있습니다.
+  """
+
+  def __init__(self, output_dir=None, latency_threshold=None, max_bytes=None):
+    """
+    Args:
+        output_dir: trace 저장 디렉토리 (기본값: TRACE_DIR 또는 output/traces)
+        latency_threshold: 이 시간(초) 이상 걸린 페이지의 trace를 보관 (기본값: TRACE_LATENCY_THRESHOLD 또는 30)
+        max_bytes: trace 디렉토리 최대 크기 (기본값: TRACE_MAX_MB 또는 500MB)
+    """
+    self.output_dir = Path(output_dir or os.getenv('TRACE_DIR', os.path.join('output', 'traces')))
+    self.latency_threshold = float(latency_threshold if latency_threshold is not None
+                                   else os.getenv('TRACE_LATENCY_THRESHOLD', '30'))
+    self.max_bytes = int(max_bytes if max_bytes is not None
+                         else float(os.getenv('TRACE_MAX_MB', '500')) * 1024 * 1024)
+    self.output_dir.mkdir(parents=True, exist_ok=True)
+    self._context = None
+    self._current = None
+
+  @classmethod
+  def from_env(cls):
+    """TRACE_CAPTURE=true이면 TraceCapture를, 아니면 None을 반환합니다."""
+    if os.getenv('TRACE_CAPTURE', 'false').lower() != 'true':
+      return None
+    return cls()
+
+  def attach(self, context):
+    """브라우저 컨텍스트에서 tracing을 시작합니다 (start_browser 직후 호출)."""
+    context.tracing.start(screenshots=True, snapshots=True, sources=False)
+    self._context = context
+    self._current = None
+
+  def detach(self):
+    """tracing을 중지합니다 (남은 chunk는 버림)."""
+    if self._context is None:
+      return
+    try:
+      self._context.tracing.stop()
+    except Exception as e:
+      logger.debug(f"tracing 중지 중 오류: {e}")
+    self._context = None
+    self._current = None
+
+  def begin(self, url):
+    """페이지 하나의 trace chunk를 시작합니다."""
+    if self._context is None:
+      return
+    try:
+      self._context.tracing.start_chunk(title=url)
+      self._current = (url, time.monotonic())
+    except Exception as e:
+      logger.debug(f"trace chunk 시작 실패 ({url}): {e}")
+      self._current = None
+
+  def end(self, article_data):
+    """
+    페이지 처리를 마치고 보관 여부를 결정합니다.
+
+    Args:
+        article_data: crawl_article 결과 딕셔너리
+
+    Returns:
+        보관한 trace 파일 경로, 버렸으면 None
+    """
+    if self._context is None or self._current is None:
+      return None
+    url, started = self._current
+    self._current = None
+    elapsed = time.monotonic() - started
+    reason = self._keep_reason(article_data, elapsed)
+
+    try:
+      if not reason:
+        # path 없이 중지하면 chunk를 파일로 쓰지 않음
+        self._context.tracing.stop_chunk()
+        return None
+
+      with tempfile.TemporaryDirectory(dir=self.output_dir) as tmp_dir:
+        raw_path = os.path.join(tmp_dir, 'trace.zip')
+        self._context.tracing.stop_chunk(path=raw_path)
+        path = self._store(raw_path, url, elapsed, reason, article_data)
+    except Exception as e:
+      logger.warning(f"trace 저장 실패 ({url}): {e}")
+      return None
+
+    REGISTRY.inc('traces_kept_total', reason=reason)
+    logger.info(f"trace 보관 ({reason}, {elapsed:.1f}s): {path}")
+    self._evict()
+    return path
+
+  def _keep_reason(self, article_data, elapsed):
+    outcome = article_data.get('outcome')
+    if outcome and Outcome(outcome).permanent:
+      # 404/삭제/멤버 전용/기사 아님은 분류 결과만으로 충분
+      return None
+    if 'error' in article_data:
+      return 'error'
+    if not article_data.get('title') or not article_data.get('content'):
+      return 'empty'
+    if elapsed >= self.latency_threshold:
+      return 'slow'
+    return None
+
+  def _store(self, raw_path, url, elapsed, reason, article_data):
+    """Playwright trace에 meta.json을 더해 최대 압축으로 다시 묶습니다."""
+    slug = extract_post_id(url) or re.sub(r'[^A-Za-z0-9]+', '-', url.split('//')[-1])[:60].strip('-')
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{reason}_{slug}.zip"
+    final_path = self.output_dir / name
+    meta = {
+        'url': url,
+        'reason': reason,
+        'elapsed': round(elapsed, 3),
+        'captured_at': datetime.now().isoformat(timespec='seconds'),
+        'error': article_data.get('error'),
+        'empty_fields': [k for k in ('title', 'author', 'content') if 'error' not in article_data
+                         and not article_data.get(k)],
+    }
+
+    tmp_path = f"{final_path}.tmp"
+    with zipfile.ZipFile(raw_path) as source, \
+            zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as target:
+      for info in source.infolist():
+        target.writestr(info.filename, source.read(info))
+      target.writestr('meta.json', json.dumps(meta, ensure_ascii=False, indent=2))
+    os.replace(tmp_path, final_path)
+    return str(final_path)
+
+  def _evict(self):
+    """디렉토리 크기가 max_bytes를 넘으면 가장 오래된(마지막 수정 시각 기준) trace부터 삭제합니다."""
+    with _eviction_lock:
+      entries = []
+      for path in self.output_dir.glob('*.zip'):
+        try:
+          stat = path.stat()
+        except FileNotFoundError:
+          continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+      total = sum(size for _, size, _ in entries)
+      for _, size, path in sorted(entries):
+        if total <= self.max_bytes:
+          break
+        try:
+          path.unlink()
+          total -= size
+          logger.debug(f"trace 용량 초과로 삭제: {path}")
+        except FileNotFoundError:
+          total -= size
+
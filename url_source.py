@@ -0,0 +1,293 @@
+import glob
+import gzip
+import hashlib
+import io
+import logging
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from config import load_env
+from utils import extract_post_id
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _open_zstd(path):
+  try:
+    from compression import zstd  # Python 3.14+
+    return zstd.open(path, 'rt', encoding='utf-8')
+  except ImportError:
+    pass
+  try:
+    import zstandard
+  except ImportError as e:
+    raise ImportError(f".zst 파일을 읽으려면 zstandard를 설치하세요: pip install zstandard ({path})") from e
+  return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True),
+                          encoding='utf-8')
+
+
+def open_text(path):
+  """
+  텍스트 입력을 엽니다 ('-'는 표준 입력, .gz/.zst는 압축을 풀면서 읽음).
+
+  Returns:
+      줄 단위로 읽을 수 있는 텍스트 스트림 (표준 입력은 닫지 않도록 호출자가 구분)
+  """
+  if path == '-':
+    return sys.stdin
+  if path.endswith('.gz'):
+    return gzip.open(path, 'rt', encoding='utf-8')
+  if path.endswith('.zst'):
+    return _open_zstd(path)
+  return open(path, 'r', encoding='utf-8')
+
+
+def expand_inputs(patterns):
+  """
+  입력 경로 목록을 펼칩니다 (glob 패턴은 일치하는 파일을 이름순으로, '-'는 그대로).
+
+  Raises:
+      FileNotFoundError: 일치하는 파일이 없는 경로가 있을 때
+  """
+  if isinstance(patterns, (str, os.PathLike)):
+    patterns = [patterns]
+  paths = []
+  for pattern in patterns:
+    pattern = str(pattern)
+    if pattern == '-':
+      paths.append(pattern)
+      continue
+    matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else ([pattern] if os.path.exists(pattern) else [])
+    if not matches:
+      raise FileNotFoundError(f"URL 리스트 파일을 찾을 수 없습니다: {pattern}")
+    paths.extend(matches)
+  return paths
+
+
+def iter_url_lines(patterns):
+  """입력 파일들에서 URL 줄을 하나씩 읽습니다 (빈 줄과 # 주석 제외, 파일 전체를 메모리에 올리지 않음)."""
+  for path in expand_inputs(patterns):
+    stream = open_text(path)
+    try:
+      for line in stream:
+        url = line.strip()
+        if url and not url.startswith('#'):
+          yield url
+    finally:
+      if stream is not sys.stdin:
+        stream.close()
+
+
+class BloomFilter:
+  """
+  고정 크기 비트 배열로 '이미 본 항목'을 판별합니다 (거짓 양성 비율 error_rate, 거짓 음성 없음).
+
+  메모리는 capacity와 error_rate로만 정해지고 (1,000만 개·1%에 약 12MB) 입력 크기에 따라 늘지 않습니다.
+  """
+
+  def __init__(self, capacity=10_000_000, error_rate=0.001):
+    self.capacity = capacity
+    self.error_rate = error_rate
+    self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+    self._bits = bytearray((self.size + 7) // 8)
+    self.count = 0
+
+  def _positions(self, item):
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], 'little')
+    second = int.from_bytes(digest[8:], 'little') % (self.size - 1) + 1
+    # double hashing (Kirsch–Mitzenmacher)
+    return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+  def __contains__(self, item):
+    return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+  def add(self, item):
+    """항목을 추가합니다. 처음 보는 항목이었으면 True (거짓 양성이면 False일 수 있음)."""
+    added = False
+    for pos in self._positions(item):
+      mask = 1 << (pos & 7)
+      if not self._bits[pos >> 3] & mask:
+        self._bits[pos >> 3] |= mask
+        added = True
+    if added:
+      self.count += 1
+    return added
+
+
+class ExactUrlSet:
+  """
+  디스크(SQLite 임시 파일)에 두는 정확한 중복 판별 집합
+
+  Bloom filter가 처음 본다고 한 키는 확실히 새 키이므로 배치로 기록만 하고(record),
+  '이미 봤을 수 있음'이라고 한 키만 하나씩 조회합니다(add). 키는 디스크에 있으므로 메모리를 거의 쓰지 않습니다.
+  파일은 닫을 때 지웁니다 (실행 간 중복은 크롤링 큐가 판단).
+  """
+
+  def __init__(self, directory=None, batch_size=10000):
+    import tempfile
+
+    if directory:
+      Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, self.path = tempfile.mkstemp(prefix='url_set_', suffix='.sqlite3', dir=directory)
+    os.close(fd)
+    self._conn = sqlite3.connect(self.path, check_same_thread=False)
+    self._conn.execute('PRAGMA journal_mode=OFF')
+    self._conn.execute('PRAGMA synchronous=OFF')
+    self._conn.execute('CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID')
+    self._batch_size = batch_size
+    self._buffer = []
+
+  def record(self, key):
+    """새 키로 확실한 키를 기록합니다 (배치로 모아서 INSERT)."""
+    self._buffer.append((key,))
+    if len(self._buffer) >= self._batch_size:
+      self._flush()
+
+  def add(self, key):
+    """키를 추가합니다. 처음 보는 키이면 True"""
+    self._flush()
+    return self._conn.execute('INSERT OR IGNORE INTO seen (key) VALUES (?)', (key,)).rowcount > 0
+
+  def _flush(self):
+    if self._buffer:
+      self._conn.executemany('INSERT OR IGNORE INTO seen (key) VALUES (?)', self._buffer)
+      self._conn.commit()
+      self._buffer = []
+
+  def close(self):
+    self._conn.close()
+    os.unlink(self.path)
+
+
+class UrlSource:
+  """
+  여러 입력(일반/gz/zst 파일, glob, 표준 입력)에서 URL을 스트리밍으로 읽으면서 중복을 제거합니다.
+
+  중복 판별 키는 post ID(기사 URL이 아니면 원래 문자열)이므로 쿼리, 커스텀 도메인 등 형태만 다른 같은 기사도 걸러지고,
+  읽은 URL은 원래 형태 그대로 내보냅니다.
+  - 기본: Bloom filter만 사용 (메모리 고정, error_rate 비율로 새 URL을 중복으로 잘못 건너뛸 수 있음)
+  - exact=True: Bloom filter가 '봤을 수 있음'이라고 한 URL만 디스크 집합(ExactUrlSet)으로 다시 확인 (잘못 건너뛰는 URL 없음)
+  """
+
+  def __init__(self, patterns, capacity=None, error_rate=None, exact=None, exact_dir=None):
+    """
+    Args:
+        patterns: 입력 경로 또는 경로 목록 ('-'는 표준 입력, glob 패턴 가능)
+        capacity: 예상 고유 URL 수 (기본값: URL_DEDUP_CAPACITY 또는 10,000,000)
+        error_rate: Bloom filter 거짓 양성 비율 (기본값: URL_DEDUP_ERROR_RATE 또는 0.001)
+        exact: 디스크 집합으로 정확히 판별할지 여부 (기본값: URL_DEDUP_EXACT 또는 false)
+        exact_dir: 디스크 집합 임시 파일 디렉토리 (기본값: URL_DEDUP_DIR, 없으면 시스템 임시 디렉토리)
+    """
+    self.patterns = patterns
+    self.capacity = int(capacity or os.getenv('URL_DEDUP_CAPACITY', '10000000'))
+    self.error_rate = float(error_rate or os.getenv('URL_DEDUP_ERROR_RATE', '0.001'))
+    self.exact = exact if exact is not None else os.getenv('URL_DEDUP_EXACT', 'false').lower() == 'true'
+    self.exact_dir = exact_dir or os.getenv('URL_DEDUP_DIR') or None
+    self.stats = {'read': 0, 'unique': 0, 'duplicates': 0}
+
+  def __iter__(self):
+    bloom = BloomFilter(self.capacity, self.error_rate)
+    exact_set = ExactUrlSet(self.exact_dir) if self.exact else None
+    try:
+      for url in iter_url_lines(self.patterns):
+        self.stats['read'] += 1
+        key = extract_post_id(url) or url
+        if bloom.add(key):
+          new = True
+          if exact_set is not None:
+            exact_set.record(key)
+        else:
+          new = exact_set.add(key) if exact_set is not None else False
+        if not new:
+          self.stats['duplicates'] += 1
+          continue
+        self.stats['unique'] += 1
+        yield url
+    finally:
+      if exact_set is not None:
+        exact_set.close()
+      if self.stats['read']:
+        logger.info(f"URL 입력: {self.stats['read']}줄, 고유 {self.stats['unique']}개, 중복 {self.stats['duplicates']}개")
+
+
+def prefetch(iterable, maxsize=1000):
+  """
+  별도 스레드에서 iterable을 읽어 크기가 제한된 큐로 넘깁니다.
+
+  압축 해제와 중복 판별을 소비자(큐 기록)와 겹쳐 처리하고, 소비자가 느리면 큐가 찰 때 읽기를 멈춥니다 (backpressure).
+  읽는 쪽의 예외는 소비자 쪽에서 다시 발생합니다.
+  """
+  items = queue.Queue(maxsize=maxsize)
+  stopped = threading.Event()
+  failure = []
+
+  def _produce():
+    try:
+      for item in iterable:
+        while not stopped.is_set():
+          try:
+            items.put(item, timeout=0.5)
+            break
+          except queue.Full:
+            continue
+        if stopped.is_set():
+          return
+    except BaseException as e:
+      failure.append(e)
+    finally:
+      while not stopped.is_set():
+        try:
+          items.put(_STOP, timeout=0.5)
+          break
+        except queue.Full:
+          continue
+
+  thread = threading.Thread(target=_produce, name='url-source', daemon=True)
+  thread.start()
+  try:
+    while True:
+      item = items.get()
+      if item is _STOP:
+        break
+      yield item
+    if failure:
+      raise failure[0]
+  finally:
+    stopped.set()
+
+
+def batched(iterable, size):
+  """iterable을 size개씩 묶은 리스트로 내보냅니다."""
+  batch = []
+  for item in iterable:
+    batch.append(item)
+    if len(batch) >= size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+
+def enqueue_from_source(journal, source, batch_size=1000, requeue=False, label=None):
+  """
+  UrlSource의 URL을 크롤링 큐(CrawlJournal)에 배치 단위로 추가합니다.
+
+  Returns:
+      새로 추가(또는 재대기)된 URL 수
+  """
+  label = label or (source.patterns if isinstance(source.patterns, str) else ','.join(map(str, source.patterns)))
+  added = 0
+  for batch in batched(prefetch(source, maxsize=batch_size * 4), batch_size):
+    added += journal.enqueue_many(((url, label, None) for url in batch), requeue=requeue)
+  return added
@@ -1,11 +1,17 @@
+import gzip
+import hashlib
 import json
 import os
+import re
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
+from urllib.parse import urlparse, urlunparse
 
-from dotenv import load_dotenv
+from config import load_env
 
-load_dotenv()
+load_env()
 
 
 def read_urls_from_file(file_path=None):
@@ -34,75 +40,284 @@ def read_urls_from_file(file_path=None):
   return urls
 
 
-def save_crawled_data(data: Dict, output_dir=None, filename=None):
+# Medium 기사 URL 마지막 경로 조각 끝의 post ID (예: .../my-story-1a2b3c4d5e6f, /p/1a2b3c4d5e6f)
+# Medium post ID는 10~12자리(대부분 12자리) 16진수
+_POST_ID_PATTERN = re.compile(r'(?:^|-)([0-9a-f]{10,12})$')
+# 기사가 아닌 목록/계정 페이지의 경로 조각 (예: /tag/deadbeef0123, /@user/list/reading-list-1a2b3c4d5e6f)
+_NON_ARTICLE_SEGMENTS = frozenset({'tag', 'tagged', 'topic', 'topics', 'm', 'me', 'search', 'list', 'lists',
+                                   'membership', 'plans', 'followers', 'following'})
+
+
+def extract_post_id(url):
   """
-  크롤링한 데이터를 JSON 파일로 저장합니다.
+  Medium 기사 URL에서 post ID를 추출합니다.
+
+  마지막 경로 조각 끝의 ID만 보고, 태그/목록/계정 페이지 경로(_NON_ARTICLE_SEGMENTS)는 기사로 보지 않습니다.
 
   Args:
-      data: 저장할 데이터 딕셔너리
+      url: Medium 기사 URL
+
+  Returns:
+      post ID 문자열, 기사 URL이 아니면 None
+  """
+  segments = [segment for segment in urlparse(url).path.split('/') if segment]
+  if not segments or any(segment.lower() in _NON_ARTICLE_SEGMENTS for segment in segments[:-1]):
+    return None
+  match = _POST_ID_PATTERN.search(segments[-1])
+  return match.group(1) if match else None
+
+
+def canonicalize_medium_url(url):
+  """
+  Medium 기사 URL을 정규화합니다 (쿼리/프래그먼트 제거, https, 소문자 호스트).
+
+  Args:
+      url: Medium 기사 URL
+
+  Returns:
+      정규화된 URL, 기사 URL이 아니면 None
+  """
+  if not url:
+    return None
+  parsed = urlparse(url.strip())
+  if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+    return None
+  if not extract_post_id(url):
+    return None
+  host = parsed.netloc.lower()
+  if host == 'www.medium.com':
+    host = 'medium.com'
+  return urlunparse(('https', host, parsed.path.rstrip('/'), '', '', ''))
+
+
+MANIFEST_FILENAME = 'manifest.jsonl'
+
+_manifest_lock = threading.Lock()
+_json_encoder = None
+
+
+def _dumps(data):
+  """JSON을 압축 형식(공백 없음) UTF-8 바이트로 직렬화합니다 (orjson이 설치되어 있으면 사용)."""
+  global _json_encoder
+  if _json_encoder is None:
+    try:
+      import orjson
+      _json_encoder = orjson.dumps
+    except ImportError:
+      _json_encoder = lambda value: json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+  return _json_encoder(data)
+
+
+def _output_compression():
+  compression = os.getenv('OUTPUT_COMPRESS', '').lower()
+  if compression not in ('', 'none', 'gzip'):
+    raise ValueError(f"지원하지 않는 OUTPUT_COMPRESS 값입니다: {compression} (gzip 또는 빈 값)")
+  return compression == 'gzip'
+
+
+def write_atomic(path, payload):
+  """
+  같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 바꿔 넣습니다 (중간에 죽어도 잘린 파일이 남지 않음).
+
+  Args:
+      path: 최종 파일 경로
+      payload: 쓸 바이트
+  """
+  path = str(path)
+  directory, name = os.path.split(path)
+  tmp_path = os.path.join(directory, f'.{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+  try:
+    with open(tmp_path, 'wb') as f:
+      f.write(payload)
+    os.replace(tmp_path, path)
+  except BaseException:
+    try:
+      os.unlink(tmp_path)
+    except FileNotFoundError:
+      pass
+    raise
+
+
+def write_json_atomic(path, data):
+  """
+  data를 압축 형식 JSON으로 path에 원자적으로 씁니다 (.gz로 끝나면 gzip 압축).
+
+  Returns:
+      쓴 바이트 수
+  """
+  payload = _dumps(data)
+  if str(path).endswith('.gz'):
+    # mtime=0: 같은 내용이면 같은 바이트 (백업/비교 시 불필요한 변경이 생기지 않음)
+    payload = gzip.compress(payload, compresslevel=6, mtime=0)
+  write_atomic(path, payload)
+  return len(payload)
+
+
+def output_path_for_url(url, output_dir=None, compress=None):
+  """
+  기사 URL의 결과 파일 경로 (같은 URL은 항상 같은 경로)
+
+  post ID의 해시 앞 두 글자씩 OUTPUT_SHARD_DEPTH 단계(기본값 1)의 하위 디렉토리로 나눠
+  파일이 수십만 개여도 디렉토리 하나가 커지지 않게 합니다. 파일명은 post ID이므로 쿼리, 커스텀 도메인 등
+  형태만 다른 같은 기사의 URL은 같은 파일로 저장됩니다 (기사 URL이 아니면 URL 마지막 경로와 URL 해시).
+
+  Args:
+      url: 기사 URL
       output_dir: 출력 디렉토리 (기본값: 환경 변수에서 읽음)
-      filename: 저장할 파일명 (기본값: URL 기반으로 자동 생성)
+      compress: gzip 압축 여부 (기본값: OUTPUT_COMPRESS=gzip 여부)
 
   Returns:
-      저장된 파일 경로
+      결과 파일 경로 (output_dir/ab/<post ID>.json[.gz])
   """
   if not output_dir:
     output_dir = os.getenv('OUTPUT_DIR', 'output')
+  if compress is None:
+    compress = _output_compression()
 
-  # 출력 디렉토리 생성
-  Path(output_dir).mkdir(parents=True, exist_ok=True)
-
-  # 파일명 생성
-  if not filename:
-    url = data.get('url', 'unknown')
-    # URL에서 파일명으로 사용할 수 있는 부분 추출
-    import re
-    from urllib.parse import urlparse
-    parsed = urlparse(url)
-    path_parts = [p for p in parsed.path.split('/') if p]
-    if path_parts:
-      # 마지막 경로 부분 사용
-      base_name = path_parts[-1]
-    else:
-      base_name = 'article'
-
-    # 파일명에 사용할 수 없는 문자 제거
-    base_name = re.sub(r'[^\w\-_\.]', '_', base_name)
-    filename = f"{base_name}.json"
-
-  # 파일 경로 생성
-  file_path = os.path.join(output_dir, filename)
-
-  # JSON 파일로 저장
-  with open(file_path, 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+  post_id = extract_post_id(url)
+  digest = hashlib.blake2b((post_id or url).encode('utf-8'), digest_size=8).hexdigest()
+  if post_id:
+    base_name = post_id
+  else:
+    # URL에서 파일명으로 사용할 수 있는 부분 추출 (마지막 경로, 사용할 수 없는 문자 제거)
+    path_parts = [p for p in urlparse(url).path.split('/') if p]
+    slug = re.sub(r'[^\w\-_\.]', '_', path_parts[-1]) if path_parts else 'article'
+    base_name = f'{slug}-{digest[:8]}'
+  depth = int(os.getenv('OUTPUT_SHARD_DEPTH', '1'))
+  shards = [digest[i * 2:i * 2 + 2] for i in range(depth)]
+  return os.path.join(output_dir, *shards, f"{base_name}.json{'.gz' if compress else ''}")
+
+
+def append_manifest(output_dir, url, file_path, size):
+  """
+  결과 파일 목록(manifest.jsonl)에 한 줄을 덧붙입니다 (한 번의 write라 여러 프로세스가 함께 써도 줄이 섞이지 않음).
+
+  같은 파일을 다시 쓰면 (예: 이미지 정보를 채워 다시 저장) 새 줄을 덧붙이고, iter_manifest는 마지막 기록을 씁니다.
+
+  Args:
+      output_dir: 출력 디렉토리 (manifest.jsonl 위치, path는 이 기준 상대 경로로 기록)
+      url: 기사 URL
+      file_path: 저장한 파일 경로
+      size: 파일 크기 (바이트)
+  """
+  entry = {'url': url, 'path': os.path.relpath(file_path, output_dir),
+           'bytes': size, 'saved_at': datetime.now().isoformat(timespec='seconds')}
+  line = _dumps(entry) + b'\n'
+  with _manifest_lock:
+    fd = os.open(os.path.join(output_dir, MANIFEST_FILENAME), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+      os.write(fd, line)
+    finally:
+      os.close(fd)
+
+
+def iter_manifest(output_dir=None):
+  """
+  manifest.jsonl의 결과 파일 항목을 파일별 최신 기록으로 내보냅니다 (listdir 없이 결과를 순회).
+
+  Returns:
+      {'url', 'path', 'bytes', 'saved_at'} 딕셔너리 이터레이터 (path는 output_dir 기준, 같은 파일을 다시 저장했으면 마지막 기록만)
+  """
+  if not output_dir:
+    output_dir = os.getenv('OUTPUT_DIR', 'output')
+  manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+  if not os.path.exists(manifest_path):
+    return
+  latest = {}
+  with open(manifest_path, 'r', encoding='utf-8') as f:
+    for line in f:
+      try:
+        entry = json.loads(line)
+      except ValueError:
+        continue  # 쓰는 중에 끊긴 마지막 줄
+      latest.pop(entry['path'], None)
+      latest[entry['path']] = entry
+  yield from latest.values()
 
-  return file_path
 
+def load_crawled_data(path):
+  """save_crawled_data로 저장한 파일을 읽습니다 (.gz 포함)."""
+  opener = gzip.open if str(path).endswith('.gz') else open
+  with opener(path, 'rb') as f:
+    return json.loads(f.read())
 
-def save_all_crawled_data(data_list: List[Dict], output_dir=None, filename='all_articles.json'):
+
+def save_crawled_data(data: Dict, output_dir=None, filename=None):
   """
-  여러 크롤링 데이터를 하나의 JSON 파일에 저장합니다.
+  크롤링한 데이터를 JSON 파일로 저장합니다.
+
+  output_path_for_url의 경로(post ID 해시로 나눈 하위 디렉토리)에 압축 형식으로 쓰고, 임시 파일 + os.replace로
+  바꿔 넣은 뒤 manifest.jsonl에 기록합니다. OUTPUT_COMPRESS=gzip이면 .json.gz로 저장합니다.
 
   Args:
-      data_list: 저장할 데이터 딕셔너리 리스트
+      data: 저장할 데이터 딕셔너리
       output_dir: 출력 디렉토리 (기본값: 환경 변수에서 읽음)
-      filename: 저장할 파일명
+      filename: 저장할 파일명 (지정하면 하위 디렉토리 없이 output_dir/filename에 저장)
 
   Returns:
       저장된 파일 경로
+
+  DEDUP=true이면 먼저 저장된 글과 거의 같은 글은 본문 대신 원본 참조로 저장합니다 (data도 같은 형태로 바뀜, dedup.py 참고).
   """
   if not output_dir:
     output_dir = os.getenv('OUTPUT_DIR', 'output')
 
+  url = data.get('url', 'unknown')
+  if filename:
+    file_path = os.path.join(output_dir, filename)
+  else:
+    file_path = output_path_for_url(url, output_dir)
+
   # 출력 디렉토리 생성
-  Path(output_dir).mkdir(parents=True, exist_ok=True)
+  Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
-  # 파일 경로 생성
-  file_path = os.path.join(output_dir, filename)
+  # 거의 같은 글이 이미 저장되어 있으면 본문 대신 원본 참조로 저장
+  from dedup import apply_dedup
+  apply_dedup(data, output_dir, file_path)
 
-  # JSON 파일로 저장
-  with open(file_path, 'w', encoding='utf-8') as f:
-    json.dump(data_list, f, ensure_ascii=False, indent=2)
+  size = write_json_atomic(file_path, data)
+  append_manifest(output_dir, url, file_path, size)
 
   return file_path
+
+
+class AllArticlesWriter:
+  """
+  실행 전체의 크롤링 결과를 all_articles.jsonl에 한 줄씩 바로 씁니다 (결과를 메모리에 모으지 않음).
+
+  실행 중에는 임시 파일에 쓰고 close()에서 os.replace로 바꿔 넣으므로, 이전 실행의 파일은 끝까지 온전히 남습니다.
+  """
+
+  def __init__(self, output_dir=None, filename='all_articles.jsonl'):
+    if not output_dir:
+      output_dir = os.getenv('OUTPUT_DIR', 'output')
+    self.path = os.path.join(output_dir, filename)
+    self.count = 0
+    self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+    self._file = None
+    self._lock = threading.Lock()
+
+  def write(self, data):
+    """결과 하나를 한 줄로 기록합니다 (여러 크롤링 스레드에서 호출 가능)."""
+    line = _dumps(data) + b'\n'
+    with self._lock:
+      if self._file is None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, 'wb')
+      self._file.write(line)
+      self.count += 1
+
+  def close(self):
+    """
+    파일을 닫고 제자리에 바꿔 넣습니다.
+
+    Returns:
+        저장된 파일 경로 (기록한 결과가 없으면 None)
+    """
+    with self._lock:
+      if self._file is None:
+        return None
+      self._file.close()
+      self._file = None
+      os.replace(self._tmp_path, self.path)
+      return self.path